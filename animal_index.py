@@ -0,0 +1,108 @@
+# animal_index.py
+import math
+import re
+import threading
+
+# Columns that can hold a species name, in lookup priority order
+NAME_COLUMNS = ['animal_type', 'species', 'common_name', 'name', 'animal', 'class']
+
+# CSV column -> key returned to callers
+COLUMN_MAPPING = {
+    'animal_type': 'species',
+    'conservation_status': 'conservation_status',
+    'estimated_population': 'population',
+    'habitat': 'habitat',
+    'lifespan': 'lifespan',
+    'health_recommendation_injured': 'care_injured',
+    'health_recommendation_malnourished': 'care_malnourished',
+    'health_recommendation': 'care_general',
+    'character_traits': 'character_traits'
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive key for a species name"""
+    if not isinstance(name, str):
+        return ''
+    return _WHITESPACE.sub(' ', name).strip().casefold()
+
+
+def _clean_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    # numpy scalars -> plain Python so the dicts are JSON-ready
+    return value.item() if hasattr(value, 'item') else value
+
+
+def clean_record(record):
+    """Map a raw CSV row to the info dict get_animal_info returns (None if nothing useful)"""
+    clean = {}
+    for original_key, value in record.items():
+        if original_key not in COLUMN_MAPPING:
+            continue
+        value = _clean_value(value)
+        if value is not None:
+            clean[COLUMN_MAPPING[original_key]] = value
+    return clean or None
+
+
+class AnimalInfoIndex:
+    """animal_data.csv compiled into {normalized name: info dict}.
+
+    Every name column is indexed as an alias. When two rows share a name, the same
+    precedence as the old pandas scan applies: earlier name columns win, then earlier rows.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self._lock = threading.Lock()
+        self.species_count = 0
+        self.columns = []
+        self.loaded_from = None
+
+    @staticmethod
+    def build(records, columns):
+        index = {}
+        cleaned = [clean_record(record) for record in records]
+        for col in [c for c in NAME_COLUMNS if c in columns]:
+            for record, info in zip(records, cleaned):
+                key = normalize_name(record.get(col))
+                if key and key not in index:
+                    index[key] = info
+        return index
+
+    def load_dataframe(self, df, source=None):
+        """Compile a DataFrame into a fresh index and swap it in atomically"""
+        records = df.to_dict('records')
+        columns = df.columns.tolist()
+        index = self.build(records, columns)
+        with self._lock:
+            # Readers never see a half-built index: a single reference assignment
+            self._index = index
+            self.species_count = len(records)
+            self.columns = columns
+            self.loaded_from = source
+        print(f"✅ Animal info index built: {len(index)} names for {len(records)} species")
+        return len(index)
+
+    def load_csv(self, path):
+        import pandas as pd
+        return self.load_dataframe(pd.read_csv(path), source=path)
+
+    def get(self, species_name):
+        """O(1) lookup. Returns a copy of the info dict, or None"""
+        info = self._index.get(normalize_name(species_name))
+        return dict(info) if info else None
+
+    def __len__(self):
+        return len(self._index)
+
+    def stats(self):
+        return {
+            'names_indexed': len(self._index),
+            'species_count': self.species_count,
+            'columns': self.columns,
+            'loaded_from': self.loaded_from
+        }
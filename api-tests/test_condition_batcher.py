@@ -0,0 +1,63 @@
+# test_condition_batcher.py
+# ConditionBatcher with a numpy stand-in for the model: row routing, timeouts, worker recovery.
+#
+#   pytest api-tests/test_condition_batcher.py
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from condition_batcher import ConditionBatcher  # noqa: E402
+
+
+def row_sums(batch):
+    return batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)
+
+
+def test_each_caller_gets_its_own_row():
+    batcher = ConditionBatcher(row_sums, max_wait_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.predict(np.full((1, 2, 2, 1), i, dtype=np.float32))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert {i: float(r[0][0]) for i, r in results.items()} == {i: 4.0 * i for i in range(8)}
+
+
+def test_timeout_does_not_break_later_calls():
+    slow = threading.Event()
+
+    def predict(batch):
+        if slow.is_set():
+            time.sleep(0.3)
+        return row_sums(batch)
+
+    batcher = ConditionBatcher(predict, timeout=0.1)
+    slow.set()
+    with pytest.raises(TimeoutError):
+        batcher.predict(np.ones((1, 2, 2, 1)))
+    slow.clear()
+    # The late result for the abandoned call must not kill the worker
+    time.sleep(0.3)
+    assert float(batcher.predict(np.ones((1, 2, 2, 1)))[0][0]) == 4.0
+    assert batcher.stats()['timeouts'] == 1
+
+
+def test_dead_worker_is_restarted():
+    batcher = ConditionBatcher(row_sums)
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    batcher._worker = dead
+    assert float(batcher.predict(np.ones((1, 2, 2, 1)))[0][0]) == 4.0
+    assert batcher.stats()['worker_restarts'] == 1
@@ -0,0 +1,95 @@
+# test_image_variants.py
+# VariantCache on generated images: resizing, width snapping, LRU eviction, coalesced generation,
+# and one byte budget shared by every process using the directory.
+#
+#   pytest api-tests/test_image_variants.py
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_variants import VariantCache  # noqa: E402
+
+
+def source_image(tmp_path, name='src.jpg', size=(600, 800)):
+    path = str(tmp_path / name)
+    noise = np.random.default_rng(0).integers(0, 255, (*size, 3), dtype=np.uint8)
+    cv2.imwrite(path, noise)
+    return path
+
+
+def test_variant_is_resized_snapped_and_cached(tmp_path):
+    cache = VariantCache(str(tmp_path / 'variants'), widths=(160, 320))
+    src = source_image(tmp_path)
+    width, fmt = cache.parse('300', 'webp')
+    assert (width, fmt) == (320, 'webp')
+
+    path = cache.get(src, 'etag-1', width, fmt)
+    assert path.endswith('.webp') and cv2.imread(path).shape[:2] == (240, 320)
+    assert cache.get(src, 'etag-1', width, fmt) == path
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    src = source_image(tmp_path)
+    probe = VariantCache(str(tmp_path / 'probe'), widths=(160,))
+    one_variant = os.path.getsize(probe.get(src, 'x', 160, 'png'))
+
+    cache = VariantCache(str(tmp_path / 'variants'), max_bytes=int(one_variant * 2.5), widths=(160,), touch_interval=0)
+    first = cache.get(src, 'a', 160, 'png')
+    second = cache.get(src, 'b', 160, 'png')
+    cache.get(src, 'a', 160, 'png')  # touch: 'b' is now the oldest
+    cache.get(src, 'c', 160, 'png')
+    assert os.path.exists(first) and not os.path.exists(second)
+    assert cache.evictions == 1
+
+
+def test_budget_is_shared_by_caches_on_one_directory(tmp_path):
+    # Two instances on one root stand in for two gunicorn workers
+    src = source_image(tmp_path)
+    probe = VariantCache(str(tmp_path / 'probe'), widths=(160,))
+    one_variant = os.path.getsize(probe.get(src, 'x', 160, 'png'))
+
+    root = str(tmp_path / 'variants')
+    budget = int(one_variant * 2.5)
+    first = VariantCache(root, max_bytes=budget, widths=(160,))
+    second = VariantCache(root, max_bytes=budget, widths=(160,))
+    oldest = first.get(src, 'a', 160, 'png')
+    first.get(src, 'b', 160, 'png')
+    second.get(src, 'c', 160, 'png')
+    assert not os.path.exists(oldest) and second.evictions == 1
+    assert first.stats()['bytes'] <= budget and first.stats()['entries'] == 2
+
+
+def test_concurrent_requests_share_one_generation(tmp_path):
+    cache = VariantCache(str(tmp_path / 'variants'), widths=(320,))
+    src = source_image(tmp_path, size=(1200, 1600))
+    started = threading.Event()
+    release = threading.Event()
+    original = cache._read_source
+
+    def slow_read(path):
+        started.set()
+        release.wait(5)
+        return original(path)
+
+    cache._read_source = slow_read
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(src, 'e', 320, 'jpg'))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.coalesced < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(set(results)) == 1 and cache.misses == 1 and cache.coalesced == 3
@@ -0,0 +1,87 @@
+# test_lazy_loading.py
+# LazyResource / Warmup: load once, concurrent first use, failures not retried, warmup steps.
+#
+#   pytest api-tests/test_lazy_loading.py
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lazy_loading import LazyResource, Warmup, startup_settings_from_env  # noqa: E402
+
+
+def test_loads_once_on_first_get():
+    calls = []
+    resource = LazyResource('model', lambda: calls.append(1) or 'value')
+    assert resource.state == 'not_loaded' and resource.peek() is None
+    assert resource.get() == 'value'
+    assert resource.get() == 'value'
+    assert calls == [1]
+    assert resource.ready and resource.load_seconds is not None
+
+
+def test_concurrent_first_use_loads_once():
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    resource = LazyResource('model', slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resource.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+
+
+def test_failure_is_not_retried_until_reset():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError('no weights')
+
+    resource = LazyResource('model', broken)
+    assert resource.get() is None
+    assert resource.get() is None
+    assert resource.state == 'failed' and resource.error == 'no weights'
+    assert calls == [1]
+
+    resource.reset()
+    assert resource.state == 'not_loaded'
+    resource.get()
+    assert calls == [1, 1]
+
+
+def test_warmup_runs_steps_and_records_failures():
+    order = []
+    warmup = Warmup([
+        ('a', lambda: order.append('a')),
+        ('b', lambda: 1 / 0),
+        ('c', lambda: order.append('c')),
+    ]).start()
+    assert warmup.wait(5)
+    assert order == ['a', 'c']
+    assert warmup.status['a'] == 'done'
+    assert warmup.status['b'].startswith('failed')
+    assert set(warmup.to_dict()['timings']) == {'a', 'b', 'c'}
+
+
+def test_warmup_without_steps_is_done():
+    assert Warmup([]).done
+
+
+def test_startup_settings(monkeypatch):
+    monkeypatch.setenv('MODEL_WARMUP', 'LAZY')
+    monkeypatch.setenv('FAST_START', 'true')
+    assert startup_settings_from_env() == {'model_warmup': 'lazy', 'fast_start': True}
+    monkeypatch.setenv('MODEL_WARMUP', 'sometimes')
+    monkeypatch.delenv('FAST_START')
+    assert startup_settings_from_env() == {'model_warmup': 'background', 'fast_start': False}
@@ -0,0 +1,81 @@
+# test_mail_queue.py
+# MailQueue against an in-memory SMTP stub: batching over one connection, retries, callbacks.
+#
+#   pytest api-tests/test_mail_queue.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mail_queue import MailQueue  # noqa: E402
+
+
+class StubMessage:
+    def __init__(self, recipient):
+        self.recipients = [recipient]
+
+
+class StubSMTP:
+    """Stands in for mail.connect(); fail_first makes the first N sends raise"""
+
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+        self.opened = 0
+        self.closed = 0
+        self.delivered = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        self.opened += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.closed += 1
+
+    def send(self, message):
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            raise ConnectionError("421 try again later")
+        self.delivered.append(message.recipients[0])
+
+
+def test_batch_reuses_one_connection():
+    smtp = StubSMTP()
+    mail_queue = MailQueue(smtp.connect, batch_size=10, idle_close_seconds=0.2)
+    results = []
+    for i in range(25):
+        mail_queue.submit(StubMessage(f"user{i}@example.com"), on_result=lambda ok, err: results.append(ok))
+
+    assert mail_queue.flush(timeout=5)
+    assert len(smtp.delivered) == 25
+    assert results == [True] * 25
+    assert smtp.opened == 1
+    mail_queue.stop()
+
+
+def test_retries_with_backoff_then_succeeds():
+    smtp = StubSMTP(fail_first=2)
+    mail_queue = MailQueue(smtp.connect, max_retries=3, backoff_seconds=0.01, idle_close_seconds=0.2)
+    outcome = []
+    mail_queue.submit(StubMessage("retry@example.com"), on_result=lambda ok, err: outcome.append((ok, err)))
+
+    assert mail_queue.flush(timeout=5)
+    assert outcome == [(True, None)]
+    assert mail_queue.stats()['retries'] == 2
+    # A failed send drops the connection, so each retry reconnects
+    assert smtp.opened == 3
+    mail_queue.stop()
+
+
+def test_gives_up_after_max_retries():
+    smtp = StubSMTP(fail_first=100)
+    mail_queue = MailQueue(smtp.connect, max_retries=2, backoff_seconds=0.01, idle_close_seconds=0.2)
+    outcome = []
+    mail_queue.submit(StubMessage("down@example.com"), on_result=lambda ok, err: outcome.append((ok, err)))
+
+    assert mail_queue.flush(timeout=5)
+    assert outcome == [(False, "421 try again later")]
+    assert mail_queue.stats()['failed'] == 1
+    mail_queue.stop()
@@ -0,0 +1,140 @@
+# test_query_counts.py
+# Guards against N+1 regressions on the listing endpoints.
+#
+# By default the backend is imported in-process on a throwaway sqlite database
+# (DATABASE_URL) with QUERY_COUNT_HEADER=true, seeded with several rows per table, and
+# every endpoint is called through app.test_client():
+#   pytest api-tests/test_query_counts.py
+#
+# To check a running backend instead (started with QUERY_COUNT_HEADER=true), set API_BASE_URL:
+#   API_BASE_URL=http://localhost:3001 pytest api-tests/test_query_counts.py
+#   (or: python api-tests/test_query_counts.py)
+#
+# TEST_USER_ID overrides the default user. The bounds do not depend on how many
+# reports or notifications exist, which is the point: more rows must not mean more queries.
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+API_BASE_URL = os.getenv("API_BASE_URL")
+TEST_USER_ID = int(os.getenv("TEST_USER_ID", 1))
+
+# endpoint -> max SQL statements per request
+QUERY_BUDGETS = {
+    # reports page + admin_history SELECT ... IN
+    "/api/user-reports": 2,
+    # same, plus the total estimate
+    "/api/user-reports?limit=20": 3,
+    # user + reports (sighting joined) + admin_history SELECT ... IN
+    f"/api/user/{TEST_USER_ID}/reports": 3,
+    # Notification lists load related rows with one IN query per table (hydrate_notifications)
+    # instead of one joined query, so the budget is a few statements higher than a joinedload
+    # but each row is fetched once and the page query stays on the pagination index.
+    # user + notifications + reports IN + sightings IN + unread count
+    f"/api/user/notifications?user_id={TEST_USER_ID}": 5,
+    f"/api/user/{TEST_USER_ID}/notifications": 5,
+    f"/api/user/{TEST_USER_ID}/notifications?limit=20": 5,
+    # user + new notifications + reports IN + sightings IN (unread count is a column)
+    f"/api/user/notifications/feed?user_id={TEST_USER_ID}&since_id=0": 5,
+    # notifications + reports IN + sightings IN + users IN
+    "/api/admin/notifications": 4,
+    "/api/admin/notifications?limit=20": 4,
+}
+
+
+def seed(backend, users=3, reports_per_user=4):
+    """A few rows per table, so a per-row query would exceed every budget"""
+    db = backend.db
+    db.drop_all()
+    db.create_all()
+    for u in range(users):
+        user = backend.User(username=f"user{u}", email=f"user{u}@example.org", password_hash="x")
+        user.id = TEST_USER_ID + u
+        user.unread_notification_count = reports_per_user
+        db.session.add(user)
+        for r in range(reports_per_user):
+            sighting = backend.Sighting(user_id=user.id, species=f"Species {r}", confidence=0.9,
+                                        image_path=f"img_{u}_{r}.jpg")
+            report = backend.Report(user_id=user.id, sighting=sighting, title="Sighting", description="-",
+                                    report_type="sighting", evidence_images=[])
+            db.session.add_all([sighting, report])
+            db.session.flush()
+            for action in ("created", "reviewed"):
+                db.session.add(backend.AdminHistory(report_id=report.id, admin_name="admin", action=action))
+            db.session.add(backend.UserNotification(user_id=user.id, report_id=report.id, message="Update"))
+    db.session.commit()
+
+
+@pytest.fixture(scope="module")
+def query_count():
+    """Call an endpoint and return how many SQL statements it ran"""
+    if API_BASE_URL:
+        import requests
+
+        def fetch(path):
+            try:
+                response = requests.get(f"{API_BASE_URL}{path}", timeout=30)
+            except requests.ConnectionError:
+                pytest.skip(f"No backend at {API_BASE_URL}")
+            assert response.status_code == 200, f"{path} -> {response.status_code}: {response.text[:200]}"
+            header = response.headers.get("X-Query-Count")
+            if header is None:
+                pytest.skip("X-Query-Count missing - start the backend with QUERY_COUNT_HEADER=true")
+            return int(header)
+        yield fetch
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(temp_dir, 'query_counts.sqlite')}",
+            "QUERY_COUNT_HEADER": "true",
+            "MODEL_WARMUP": "lazy",
+            "FAST_START": "false",
+            "UPLOAD_RETENTION_ENABLED": "false",
+            "MAIL_QUEUE_ENABLED": "false",
+        })
+        try:
+            import app as backend
+        except ImportError as e:
+            pytest.skip(f"Backend dependencies not installed: {e}")
+
+        with backend.app.app_context():
+            seed(backend)
+        client = backend.app.test_client()
+
+        def fetch(path):
+            response = client.get(path)
+            assert response.status_code == 200, f"{path} -> {response.status_code}: {response.get_data(as_text=True)[:200]}"
+            return int(response.headers["X-Query-Count"])
+        yield fetch
+        with backend.app.app_context():
+            backend.db.engine.dispose()
+
+
+@pytest.mark.parametrize("path,budget", QUERY_BUDGETS.items())
+def test_query_budget(query_count, path, budget):
+    count = query_count(path)
+    assert count <= budget, f"{path} ran {count} queries (budget {budget})"
+
+
+if __name__ == "__main__":
+    import requests
+
+    base_url = API_BASE_URL or "http://localhost:3001"
+    failed = 0
+    for path, budget in QUERY_BUDGETS.items():
+        try:
+            response = requests.get(f"{base_url}{path}", timeout=30)
+            count = int(response.headers.get("X-Query-Count", -1))
+        except Exception as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        ok = 0 <= count <= budget
+        failed += 0 if ok else 1
+        print(f"{'✅' if ok else '❌'} {path}: {count} queries (budget {budget})")
+    raise SystemExit(1 if failed else 0)
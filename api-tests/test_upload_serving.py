@@ -0,0 +1,62 @@
+# test_upload_serving.py
+# send_upload on a throwaway Flask app: ETags, immutable caching, 304s and byte ranges.
+#
+#   pytest api-tests/test_upload_serving.py
+import os
+import sys
+
+import pytest
+from flask import Flask, abort
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upload_serving import send_upload  # noqa: E402
+from upload_store import UploadStore  # noqa: E402
+
+VIDEO = b'\x00\x00\x00\x18ftypmp42' + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def served(tmp_path):
+    store = UploadStore(str(tmp_path))
+    name, _ = store.put_bytes(VIDEO, 'mp4', 'video')
+    (tmp_path / 'legacy.jpg').write_bytes(b'\xff\xd8\xff' + b'\x00' * 100)
+    app = Flask(__name__)
+
+    @app.route('/u/<filename>')
+    def serve(filename):
+        return send_upload(store.path_for(filename), filename) or abort(404)
+
+    return app.test_client(), name
+
+
+def test_content_names_are_immutable_with_sha_etag(served):
+    client, name = served
+    response = client.get(f'/u/{name}')
+    assert response.status_code == 200 and response.data == VIDEO
+    assert response.headers['ETag'] == f'"{name[:-4]}"'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+
+def test_if_none_match_returns_304(served):
+    client, name = served
+    etag = client.get(f'/u/{name}').headers['ETag']
+    response = client.get(f'/u/{name}', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.data == b''
+
+    legacy_etag = client.get('/u/legacy.jpg').headers['ETag']
+    assert client.get('/u/legacy.jpg', headers={'If-None-Match': legacy_etag}).status_code == 304
+
+
+def test_range_request_returns_partial_content(served):
+    client, name = served
+    response = client.get(f'/u/{name}', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.data == VIDEO[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(VIDEO)}'
+
+
+def test_missing_upload_is_404(served):
+    client, _ = served
+    assert client.get('/u/' + 'a' * 64 + '.jpg').status_code == 404
@@ -0,0 +1,59 @@
+# test_upload_store.py
+# UploadStore on a temp directory: content names, sharding, dedup, index listings, legacy files.
+#
+#   pytest api-tests/test_upload_store.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upload_store import UploadStore  # noqa: E402
+from upload_streaming import StagingFile, UploadPolicy  # noqa: E402
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\x01' * 200
+POLICY = UploadPolicy('frame', ('jpg',), 1024 * 1024)
+
+
+def staged(tmp_path, data):
+    staging = tmp_path / '.staging'
+    staging.mkdir(exist_ok=True)
+    upload = StagingFile(str(staging), POLICY)
+    upload.write(data)
+    return upload
+
+
+def test_identical_frames_are_stored_once(tmp_path):
+    store = UploadStore(str(tmp_path))
+    first, first_dup = store.put_staged(staged(tmp_path, JPEG), 'jpg', 'realtime')
+    second, second_dup = store.put_staged(staged(tmp_path, JPEG), 'jpg', 'realtime')
+
+    assert first == second and (first_dup, second_dup) == (False, True)
+    assert first.startswith('realtime_') and first.endswith('.jpg')
+    path = store.path_for(first)
+    sha = first[len('realtime_'):-len('.jpg')]
+    assert path == os.path.join(str(tmp_path), sha[:2], sha[2:4], f"{sha}.jpg")
+    assert open(path, 'rb').read() == JPEG
+    assert os.listdir(tmp_path / '.staging') == []
+
+
+def test_shared_blob_survives_until_last_name_is_deleted(tmp_path):
+    store = UploadStore(str(tmp_path))
+    realtime, _ = store.put_staged(staged(tmp_path, JPEG), 'jpg', 'realtime')
+    image, _ = store.put_bytes(JPEG, 'jpg', 'image')
+
+    assert store.path_for(realtime) == store.path_for(image)
+    assert store.delete(realtime) == 0 and store.exists(image)
+    assert store.delete(image) == len(JPEG) and not store.exists(image)
+
+
+def test_listing_comes_from_the_index_including_legacy_files(tmp_path):
+    (tmp_path / 'realtime_1234.jpg').write_bytes(b'old')
+    store = UploadStore(str(tmp_path))
+    assert store.index_legacy_files() == 1
+    assert store.index_legacy_files() == 0
+
+    name, _ = store.put_bytes(JPEG, 'jpg', 'thumb')
+    assert [row['name'] for row in store.recent(2)] == [name, 'realtime_1234.jpg']
+    assert store.lookup('realtime_1234.jpg')['kind'] == 'realtime'
+    assert store.path_for('realtime_1234.jpg') == str(tmp_path / 'realtime_1234.jpg')
+    assert store.stats()['names'] == 2
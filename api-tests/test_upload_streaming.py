@@ -0,0 +1,78 @@
+# test_upload_streaming.py
+# upload_streaming on a throwaway Flask app: files stream to staging, caps and content checks
+# reject early, and nothing is left behind in the staging directory.
+#
+#   pytest api-tests/test_upload_streaming.py
+import base64
+import io
+import os
+import sys
+
+import pytest
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import upload_streaming  # noqa: E402
+from upload_streaming import (UploadRejected, commit_upload, install_streaming_uploads,  # noqa: E402
+                              reject_response, stage_base64, staged_file, streamed_upload)
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\x00' * 2044
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('UPLOAD_MAX_FRAME_MB', str(4096 / upload_streaming.MB))
+    app = Flask(__name__)
+    install_streaming_uploads(app, str(tmp_path))
+
+    @app.route('/frame', methods=['POST'])
+    @streamed_upload('frame')
+    def frame():
+        staged = staged_file(request.files['file'])
+        commit_upload(request.files['file'], str(tmp_path / 'kept.jpg'))
+        return jsonify(size=staged.size, media=staged.media, sha256=staged.sha256, note=request.form.get('note'))
+
+    @app.route('/base64', methods=['POST'])
+    def from_base64():
+        try:
+            staged = stage_base64(request.get_json()['image_data'], 'frame')
+        except UploadRejected as e:
+            return reject_response(e)
+        staged.commit(str(tmp_path / 'decoded.jpg'))
+        return jsonify(size=staged.size)
+
+    app.staging = tmp_path / '.staging'
+    return app.test_client()
+
+
+def test_frame_is_streamed_hashed_and_committed(client, tmp_path):
+    response = client.post('/frame', data={'note': 'hi', 'file': (io.BytesIO(JPEG), 'f.jpg', 'image/jpeg')})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['size'] == len(JPEG) and body['media'] == 'jpg' and body['note'] == 'hi'
+    assert (tmp_path / 'kept.jpg').read_bytes() == JPEG
+    assert os.listdir(client.application.staging) == []
+
+
+@pytest.mark.parametrize('payload,content_type,status', [
+    (JPEG * 3, 'image/jpeg', 413),
+    (b'not an image at all', 'image/jpeg', 415),
+    (JPEG, 'text/plain', 415),
+])
+def test_rejected_uploads_leave_nothing_behind(client, payload, content_type, status):
+    response = client.post('/frame', data={'file': (io.BytesIO(payload), 'f.jpg', content_type)})
+    assert response.status_code == status
+    assert os.listdir(client.application.staging) == []
+
+
+def test_base64_data_url_is_decoded_to_disk(client, tmp_path):
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(JPEG).decode()
+    response = client.post('/base64', json={'image_data': data_url})
+    assert response.get_json()['size'] == len(JPEG)
+    assert (tmp_path / 'decoded.jpg').read_bytes() == JPEG
+
+
+def test_base64_over_cap_is_refused_before_decoding(client):
+    response = client.post('/base64', json={'image_data': base64.b64encode(JPEG * 3).decode()})
+    assert response.status_code == 413
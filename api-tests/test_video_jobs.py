@@ -0,0 +1,82 @@
+# test_video_jobs.py
+# VideoJobQueue with trivial worker functions: results, failures, recovery after a worker dies,
+# and job state shared between queues (gunicorn workers) through one sqlite file.
+#
+#   pytest api-tests/test_video_jobs.py
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_jobs import QueueFullError, VideoJobQueue  # noqa: E402
+
+
+def echo(progress, value):
+    progress(1, 1)
+    return {'value': value}
+
+
+def crash(progress, value):
+    if value == 'die':
+        os.kill(os.getpid(), signal.SIGKILL)
+    if value == 'fail':
+        raise ValueError('bad video')
+    return {'value': value}
+
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['finished_at']:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def slow(progress, value):
+    time.sleep(0.3)
+    return {'value': value}
+
+
+def test_job_result_is_kept_for_polling(tmp_path):
+    queue = VideoJobQueue(echo, str(tmp_path / 'jobs.sqlite'), nice=0)
+    job = wait_for(queue, queue.submit(value=7)['job_id'])
+    assert job['status'] == 'completed' and job['result'] == {'value': 7}
+
+
+def test_pool_is_replaced_after_a_worker_dies(tmp_path):
+    queue = VideoJobQueue(crash, str(tmp_path / 'jobs.sqlite'), nice=0)
+    failed = wait_for(queue, queue.submit(value='fail')['job_id'])
+    assert failed['status'] == 'failed' and failed['error'] == 'bad video'
+
+    died = wait_for(queue, queue.submit(value='die')['job_id'])
+    assert died['status'] == 'failed'
+
+    job = wait_for(queue, queue.submit(value='ok')['job_id'])
+    assert job['status'] == 'completed' and job['result'] == {'value': 'ok'}
+    assert queue.stats()['pool_restarts'] == 1
+
+
+def test_jobs_and_limits_are_shared_between_web_workers(tmp_path):
+    # Two queues on one file stand in for two gunicorn workers
+    path = str(tmp_path / 'jobs.sqlite')
+    first = VideoJobQueue(slow, path, max_workers=1, max_pending=2, nice=0)
+    second = VideoJobQueue(slow, path, max_workers=1, max_pending=2, nice=0)
+
+    a = first.submit(value='a')['job_id']
+    b = second.submit(value='b')['job_id']
+    with pytest.raises(QueueFullError):
+        second.submit(value='c')
+
+    # Polled through the worker that did not accept it
+    job_a, job_b = wait_for(second, a), wait_for(first, b)
+    assert job_a['result'] == {'value': 'a'} and job_b['result'] == {'value': 'b'}
+    # max_workers=1 holds across both pools: the runs did not overlap
+    first_done, second_started = sorted([job_a, job_b], key=lambda j: j['started_at'])
+    assert second_started['started_at'] >= first_done['finished_at'] - 0.05
+    assert first.stats()['jobs_by_status'] == {'completed': 2}
@@ -10,12 +10,17 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from datetime import datetime
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 import logging
 from datetime import datetime, timedelta 
 import json
+import time
 from sqlalchemy import text
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from flask_sqlalchemy.record_queries import get_recorded_queries
 import ssl
+import importlib.util
 
 # NEW ADD UPDATE
 import string
@@ -23,11 +28,6 @@ import random
 from flask_mail import Mail, Message
 
 
-# FIXED TensorFlow imports
-import tensorflow as tf
-# Use tf.keras instead of tensorflow.keras
-load_model = tf.keras.models.load_model
-
 # Add cv2 import if not already there
 try:
     import cv2
@@ -36,10 +36,6 @@ except ImportError:
     print("⚠️ OpenCV not installed. Run: pip install opencv-python")
     CV2_AVAILABLE = False
 
-# Clean TensorFlow imports
-import tensorflow as tf
-print(f"✅ TensorFlow version: {tf.__version__}")
-
 from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
@@ -47,28 +43,40 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
-# Only use try-except for optional packages
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("❌ ultralytics not installed. Run: pip install ultralytics")
-
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import load_model # type: ignore
-    from tensorflow.keras.preprocessing import image # type: ignore
-    from tensorflow.keras.utils import img_to_array # type: ignore
-    
-    # Set a flag to indicate TensorFlow is available
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    print("❌ tensorflow not installed. Run: pip install tensorflow")
-    TENSORFLOW_AVAILABLE = False
-    # Define fallbacks to avoid unbound errors
-    tf = None
-    load_model = None
-    image = None
-    img_to_array = None
+# ultralytics (and torch behind it) is imported by the model registry when the first model loads
+from model_registry import registry_from_env
+from video_sampler import VideoFrameSampler, client_sampling, sampler_limits_from_env, sampler_settings_from_env
+from video_jobs import QueueFullError, queue_from_env
+from frame_preprocess import prepare_image, prepare_image_file, batch_tensor
+from condition_engine import load_condition_engine
+from condition_batcher import batcher_from_env
+from animal_index import AnimalInfoIndex
+from event_bus import event_bus_from_env
+from mail_queue import mail_queue_from_env
+from email_templates import render_email, render_bulk
+from upload_streaming import (UploadRejected, check_content_length, commit_upload, install_streaming_uploads,
+                              reject_response, stage_base64, staged_file, streamed_upload)
+from upload_store import upload_store_from_env
+from upload_retention import upload_sweeper_from_env
+from upload_serving import not_modified, send_upload, upload_etag
+from image_variants import VariantError, variant_cache_from_env
+from lazy_loading import LazyResource, Warmup, startup_settings_from_env
+from report_pagination import InvalidPageRequest, encode_cursor, decode_cursor, parse_limit, parse_date, parse_report_filters
+
+# TensorFlow is only needed by the Keras fallback of the condition CNN, so it is imported
+# the first time that fallback runs instead of at boot (see import_tensorflow)
+TENSORFLOW_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+tf = None
+if not TENSORFLOW_AVAILABLE:
+    print("ℹ️  tensorflow not installed - the condition model needs its ONNX export")
+
+def import_tensorflow():
+    global tf
+    if tf is None and TENSORFLOW_AVAILABLE:
+        import tensorflow
+        tf = tensorflow
+        print(f"✅ TensorFlow version: {tf.__version__}")
+    return tf
 
 # ================= FLASK APP =================
 app = Flask(__name__)
@@ -79,17 +87,22 @@ load_dotenv()
 
 # ================= DATABASE CONFIGURATION =================
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'fallback-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = (
+# DATABASE_URL overrides the DB_* settings (api-tests/test_query_counts.py runs on sqlite)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or (
     f"mysql+pymysql://{os.environ.get('DB_USERNAME')}:{os.environ.get('DB_PASSWORD')}"
     f"@{os.environ.get('DB_HOST', 'localhost')}/{os.environ.get('DB_NAME')}"
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Adds an X-Query-Count header to every response (used by api-tests/test_query_counts.py)
+QUERY_COUNT_HEADER = os.getenv('QUERY_COUNT_HEADER', 'false').lower() in ('1', 'true', 'yes')
+app.config['SQLALCHEMY_RECORD_QUERIES'] = QUERY_COUNT_HEADER
 
 # NEW UPDATE
 # ================= MAILER CONFIGURATION =================
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
+# MAIL_SERVER / MAIL_PORT / MAIL_USE_TLS can point at a local SMTP stub for testing
+app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
+app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
 app.config['MAIL_USERNAME'] = os.getenv('EMAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('EMAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = (
@@ -103,104 +116,56 @@ db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
 # NEW UPDATE
 mail = Mail(app)
-
-
-# ================= EMAIL FUNCTION FOR ADMIN UPDATES =================
-def send_admin_update_email(user_email, user_name, report_species, admin_message, report_status=None, report_details=None):
-    """Send email notification to user about admin update on their report"""
+# Emails go through a background worker with a reused SMTP connection and retries.
+# MAIL_QUEUE_ENABLED=false sends inline inside the request, as before.
+MAIL_QUEUE_ENABLED = os.getenv('MAIL_QUEUE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+mail_queue = mail_queue_from_env(mail.connect, app_context=app.app_context)
+
+def deliver_email(msg, on_result=None):
+    """Queue a message for the mail worker (or send it now when the queue is disabled)"""
+    if MAIL_QUEUE_ENABLED:
+        mail_queue.submit(msg, on_result=on_result)
+        return True
+    
     try:
-        print(f"📧 Preparing to send email to {user_email} for {report_species} report")
-        
-        # Create message
-        msg = Message(
-            subject=f"📢 AnimalCare+ Update: Your {report_species} Report",
-            recipients=[user_email],
-            sender=app.config['MAIL_DEFAULT_SENDER']
-        )
-        
-        # Prepare admin message HTML-safe
-        admin_message_html = admin_message.replace('\n', '<br>')
-
-        # Create HTML email
-        msg.html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #4CAF50, #2E7D32); color: white; padding: 30px; text-align: center; }}
-                .content {{ padding: 30px; }}
-                .message-box {{ background-color: #f9f9f9; border-left: 4px solid #4CAF50; padding: 20px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🐾 AnimalCare+ Report Update</h1>
-                </div>
-                
-                <div class="content">
-                    <h2>Hello {user_name},</h2>
-                    <p>Your wildlife report has been updated by our admin team.</p>
-                    
-                    <h3 style="color: #2E7D32;">Report: {report_species}</h3>
-                    
-                    {f"<p><strong>Status:</strong> {report_status.replace('_', ' ').title()}</p>" if report_status else ""}
-                    
-                    <div class="message-box">
-                        <h4 style="margin-top: 0; color: #2E7D32;">Admin Message:</h4>
-                        <p>{admin_message_html}</p>
-                    </div>
-                    
-                    {f'<p><strong>Details:</strong><br>{report_details}</p>' if report_details else ''}
-                    
-                    <p>You can view your report and check for updates by logging into your AnimalCare+ dashboard.</p>
-                    
-                    <p>Thank you for helping protect wildlife!</p>
-                </div>
-                
-                <div class="footer">
-                    <p>This is an automated message from AnimalCare+ Wildlife Monitoring System.</p>
-                    <p>📍 Wildlife Conservation Center | 🌍 Protecting Endangered Species</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Plain text version
-        msg.body = f"""
-AnimalCare+ Report Update
-
-Hello {user_name},
-
-Your wildlife report for {report_species} has been updated by our admin team.
-
-Admin Message:
-{admin_message}
-
-{("Status: " + report_status.replace('_', ' ').title()) if report_status else ""}
+        mail.send(msg)
+        success, error = True, None
+    except Exception as e:
+        print(f"❌ Failed to send email to {', '.join(msg.recipients)}: {e}")
+        success, error = False, str(e)
+    if on_result:
+        on_result(success, error)
+    return success
 
-You can view your report and check for updates by logging into your AnimalCare+ dashboard.
 
-Thank you for helping protect wildlife!
+# ================= EMAIL FUNCTION FOR ADMIN UPDATES =================
+def build_admin_update_email(user_email, user_name, report_species, admin_message, report_status=None, report_details=None):
+    """Build the email telling a user about an admin update on their report.
 
-Best regards,
-The AnimalCare+ Team
+    report_details is a list of detail lines (or a plain string); all user text is escaped.
+    """
+    print(f"📧 Preparing email to {user_email} for {report_species} report")
+    
+    rendered = render_email(
+        'admin_update',
+        user_name=user_name,
+        report_species=report_species,
+        admin_message=admin_message,
+        report_status=report_status,
+        report_details=report_details
+    )
+    return message_from_rendered(rendered, [user_email])
 
-This is an automated message. Please do not reply to this email.
-"""
-        
-        # Send the email
-        mail.send(msg)
-        print(f"✅ Email sent successfully to {user_email}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Failed to send email to {user_email}: {e}")
-        return False
+def message_from_rendered(rendered, recipients):
+    """Wrap an email_templates.RenderedEmail in a Flask-Mail Message"""
+    msg = Message(
+        subject=rendered.subject,
+        recipients=recipients,
+        sender=app.config['MAIL_DEFAULT_SENDER']
+    )
+    msg.html = rendered.html
+    msg.body = rendered.text
+    return msg
 
 # ================= FIXED DATABASE MODELS =================
 class User(db.Model):
@@ -214,6 +179,8 @@ class User(db.Model):
     email_verification_token = db.Column(db.String(6), nullable=True) 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Maintained by bump_unread_count(); NULL means "recount on next read"
+    unread_notification_count = db.Column(db.Integer, nullable=True)
     
     sightings = db.relationship('Sighting', backref='user', lazy=True)
     
@@ -328,6 +295,8 @@ class AdminHistory(db.Model):
 
 class Report(db.Model):
     __tablename__ = 'report'
+    # Keyset pagination for the admin report list walks (created_at, id) newest-first
+    __table_args__ = (db.Index('ix_report_created_at_id', 'created_at', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     sighting_id = db.Column(db.Integer, db.ForeignKey('sighting.id'), nullable=True)
@@ -394,8 +363,7 @@ class Report(db.Model):
             detailed_data = self.detailed_sighting_data
         
         # Get admin history for this report
-        admin_history = AdminHistory.query.filter_by(report_id=self.id).all()
-        admin_history_data = [history.to_dict() for history in admin_history]
+        admin_history_data = [history.to_dict() for history in self.admin_histories]
         
         return {
             'id': self.id,
@@ -421,6 +389,11 @@ class Report(db.Model):
 
 class UserNotification(db.Model):
     __tablename__ = 'user_notification'
+    # Keyset pagination walks (created_at, id) newest-first: per user, and across users for admins
+    __table_args__ = (
+        db.Index('ix_user_notification_user_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_user_notification_created_at_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     report_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=False)
@@ -548,6 +521,8 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    if QUERY_COUNT_HEADER:
+        response.headers['X-Query-Count'] = str(len(get_recorded_queries()))
     return response
 
 # ================= RELATIVE PATHS =================
@@ -557,12 +532,36 @@ print(f"📁 Our project folder is: {BASE_DIR}")
 MODEL_DIR = os.path.join(BASE_DIR, "public", "models", "onnx_models")
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 CONDITION_MODEL_PATH = os.path.join(BASE_DIR, "public", "models", "conditions_models", "cnn_final_model.h5")
+# Exported by converts/export_condition_onnx.py; preferred over the .h5 when present
+CONDITION_ONNX_PATH = os.path.join(BASE_DIR, "public", "models", "conditions_models", "cnn_final_model.onnx")
 ANIMAL_DATA_PATH = os.path.join(BASE_DIR, "animal_data.csv")
 
+# ================= INFERENCE SETTINGS =================
+# "memory" hands decoded numpy frames straight to the models.
+# "disk" keeps the old temp-JPEG round-trip (useful when debugging what the model saw).
+FRAME_INFERENCE_MODE = os.getenv('FRAME_INFERENCE_MODE', 'memory').lower()
+# Sampled video frames are sent to each model in batches of this size
+VIDEO_BATCH_SIZE = int(os.getenv('VIDEO_BATCH_SIZE', 8))
+# Run the models of a multi-model choice (e.g. model_choice=all) concurrently on a thread pool
+PARALLEL_MODEL_INFERENCE = os.getenv('PARALLEL_MODEL_INFERENCE', 'true').lower() in ('1', 'true', 'yes')
+
 # ================= AUTOMATIC DIRECTORY CREATION =================
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 print(f"✅ Created uploads folder: {UPLOAD_DIR}")
 
+# Multipart uploads stream to UPLOAD_DIR/.staging with per-endpoint caps (UPLOAD_MAX_*_MB)
+install_streaming_uploads(app, UPLOAD_DIR)
+# Kept uploads are named by content hash and sharded under UPLOAD_DIR (see upload_store.py)
+upload_store = upload_store_from_env(UPLOAD_DIR)
+# Resized copies for ?width= requests, LRU-bounded under UPLOAD_DIR/.variants (one budget per host)
+variant_cache = variant_cache_from_env(UPLOAD_DIR)
+
+def store_upload(file, ext, kind):
+    """Keep a @streamed_upload file in the upload store. Returns (name, path)"""
+    name, deduplicated = upload_store.put_staged(staged_file(file), ext, kind)
+    print(f"💾 Stored {kind}: {name}{' (duplicate, reused existing file)' if deduplicated else ''}")
+    return name, upload_store.path_for(name)
+
 # ================= BETTER ERROR HANDLING =================
 print("🔄 Checking if all model files exist...")
 
@@ -579,149 +578,192 @@ for file_name, file_path in required_files.items():
     else:
         print(f"❌ {file_name}: MISSING - {file_path}")
 
-# ================= LOAD MODELS WITH ERROR HANDLING =================
-print("\n🔄 Loading AI models...")
-
-models = {}
-condition_model = None
+# ================= LOAD MODELS (LAZILY) =================
+# Nothing heavy is loaded at import: each model loads on first use or on the warmup thread.
+#   MODEL_WARMUP=background (default) - boot immediately, warm models on a background thread
+#   MODEL_WARMUP=eager                - load everything before serving (the old behaviour)
+#   MODEL_WARMUP=lazy                 - load each model only when a request needs it
+#   FAST_START=true                   - also run database initialization on the warmup thread
+STARTUP = startup_settings_from_env()
+print(f"\n🔄 Registering AI models (warmup: {STARTUP['model_warmup']}{', fast start' if STARTUP['fast_start'] else ''})...")
+
+# Long-lived YOLO sessions: loaded once and reused, bounded by
+# MODEL_IDLE_UNLOAD_SECONDS / MODEL_MAX_LOADED instead of being torn down per frame
+model_registry = registry_from_env()
 animal_data_df = None
+animal_info_index = AnimalInfoIndex()
 condition_labels = ["Healthy", "Injured", "Malnourished"]
 
 try:
-    models = {
-        "mammals": [YOLO(os.path.join(MODEL_DIR, "best.onnx"), task='detect')],
-        "birds": [YOLO(os.path.join(MODEL_DIR, "best2.onnx"), task='detect')],
-    }
-    print("✅ YOLO models loaded successfully!")
+    model_registry.register("mammals", os.path.join(MODEL_DIR, "best.onnx"), task='detect')
+    model_registry.register("birds", os.path.join(MODEL_DIR, "best2.onnx"), task='detect')
+    model_registry.register_group("mammals", ["mammals"])
+    model_registry.register_group("birds", ["birds"])
+    # model_choice=all runs every loaded model (in parallel, see PARALLEL_MODEL_INFERENCE)
+    model_registry.register_group("all", ["mammals", "birds"])
+    model_registry.start_idle_reaper()
+    print("✅ YOLO models registered (loaded on first use or by warmup)")
     
     print("\n🔍 Model Loading Debug Info:")
-    for model_type, model_list in models.items():
-        print(f"  {model_type}: {len(model_list)} models loaded")
-        for i, model in enumerate(model_list):
-            print(f"    Model 1: {model}")
+    for model_type, model_names in model_registry.groups.items():
+        print(f"  {model_type}: {len(model_names)} models registered -> {model_names}")
             
 except Exception as e:
-    print(f"❌ Failed to load YOLO models: {e}")
+    print(f"❌ Failed to register YOLO models: {e}")
 
 
-try:
-    if TENSORFLOW_AVAILABLE:
-        print(f"🔄 Loading condition model from: {CONDITION_MODEL_PATH}")
+def load_keras_condition_model():
+    """Keras fallback loader for the condition CNN (TensorFlow is only needed here)"""
+    condition_model = None
+    try:
+        if TENSORFLOW_AVAILABLE:
+            import_tensorflow()
+            print(f"🔄 Loading condition model from: {CONDITION_MODEL_PATH}")
         
-        if not os.path.exists(CONDITION_MODEL_PATH):
-            print(f"❌ Model file not found!")
-            condition_model = None
-        else:
-            # WORKAROUND 1: Try loading with custom objects first
-            print("🔄 Attempting to load with batch_shape workaround...")
-            
-            from tensorflow.keras.layers import InputLayer
-            
-            # Create a custom InputLayer that handles batch_shape parameter
-            class CompatibleInputLayer(InputLayer):
-                def __init__(self, *args, **kwargs):
-                    # Check if batch_shape is in kwargs (this is the problematic parameter)
-                    if 'batch_shape' in kwargs:
-                        print(f"⚠️  Detected batch_shape parameter: {kwargs['batch_shape']}")
-                        # Convert batch_shape to input_shape
-                        batch_shape_val = kwargs.pop('batch_shape')
-                        if batch_shape_val and len(batch_shape_val) == 4:
-                            # batch_shape is (None, 150, 150, 3)
-                            # input_shape should be (150, 150, 3)
-                            kwargs['input_shape'] = batch_shape_val[1:]
-                            print(f"✅ Converted batch_shape to input_shape: {kwargs['input_shape']}")
+            if not os.path.exists(CONDITION_MODEL_PATH):
+                print(f"❌ Model file not found!")
+                condition_model = None
+            else:
+                # WORKAROUND 1: Try loading with custom objects first
+                print("🔄 Attempting to load with batch_shape workaround...")
+            
+                from tensorflow.keras.layers import InputLayer
+            
+                # Create a custom InputLayer that handles batch_shape parameter
+                class CompatibleInputLayer(InputLayer):
+                    def __init__(self, *args, **kwargs):
+                        # Check if batch_shape is in kwargs (this is the problematic parameter)
+                        if 'batch_shape' in kwargs:
+                            print(f"⚠️  Detected batch_shape parameter: {kwargs['batch_shape']}")
+                            # Convert batch_shape to input_shape
+                            batch_shape_val = kwargs.pop('batch_shape')
+                            if batch_shape_val and len(batch_shape_val) == 4:
+                                # batch_shape is (None, 150, 150, 3)
+                                # input_shape should be (150, 150, 3)
+                                kwargs['input_shape'] = batch_shape_val[1:]
+                                print(f"✅ Converted batch_shape to input_shape: {kwargs['input_shape']}")
                     
-                    # Call parent constructor
-                    super().__init__(*args, **kwargs)
+                        # Call parent constructor
+                        super().__init__(*args, **kwargs)
             
-            try:
-                # Method 1: Try with custom objects
-                condition_model = tf.keras.models.load_model(
-                    CONDITION_MODEL_PATH,
-                    custom_objects={'InputLayer': CompatibleInputLayer},
-                    compile=False
-                )
-                print("✅ Condition model loaded successfully with batch_shape workaround!")
-            except Exception as e1:
-                print(f"⚠️  Method 1 failed: {e1}")
-                
-                # Method 2: Try loading just the architecture and weights separately
-                print("🔄 Trying alternative loading method...")
                 try:
-                    # Load model without custom objects first
+                    # Method 1: Try with custom objects
                     condition_model = tf.keras.models.load_model(
                         CONDITION_MODEL_PATH,
+                        custom_objects={'InputLayer': CompatibleInputLayer},
                         compile=False
                     )
-                    print("✅ Condition model loaded (simple method worked!)")
-                except:
-                    # Method 3: Try to rebuild the model
-                    print("🔄 Attempting to rebuild model architecture...")
+                    print("✅ Condition model loaded successfully with batch_shape workaround!")
+                except Exception as e1:
+                    print(f"⚠️  Method 1 failed: {e1}")
+                
+                    # Method 2: Try loading just the architecture and weights separately
+                    print("🔄 Trying alternative loading method...")
                     try:
-                        # Based on your model's input shape (150, 150, 3) and 3 output classes
-                        from tensorflow.keras.models import Sequential
-                        from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
+                        # Load model without custom objects first
+                        condition_model = tf.keras.models.load_model(
+                            CONDITION_MODEL_PATH,
+                            compile=False
+                        )
+                        print("✅ Condition model loaded (simple method worked!)")
+                    except:
+                        # Method 3: Try to rebuild the model
+                        print("🔄 Attempting to rebuild model architecture...")
+                        try:
+                            # Based on your model's input shape (150, 150, 3) and 3 output classes
+                            from tensorflow.keras.models import Sequential
+                            from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
                         
-                        # Build a model with similar architecture
-                        model = Sequential([
-                            Conv2D(32, (3, 3), activation='relu', input_shape=(150, 150, 3)),
-                            MaxPooling2D(2, 2),
-                            Conv2D(64, (3, 3), activation='relu'),
-                            MaxPooling2D(2, 2),
-                            Conv2D(128, (3, 3), activation='relu'),
-                            MaxPooling2D(2, 2),
-                            Flatten(),
-                            Dense(512, activation='relu'),
-                            Dropout(0.5),
-                            Dense(3, activation='softmax')
-                        ])
+                            # Build a model with similar architecture
+                            model = Sequential([
+                                Conv2D(32, (3, 3), activation='relu', input_shape=(150, 150, 3)),
+                                MaxPooling2D(2, 2),
+                                Conv2D(64, (3, 3), activation='relu'),
+                                MaxPooling2D(2, 2),
+                                Conv2D(128, (3, 3), activation='relu'),
+                                MaxPooling2D(2, 2),
+                                Flatten(),
+                                Dense(512, activation='relu'),
+                                Dropout(0.5),
+                                Dense(3, activation='softmax')
+                            ])
                         
-                        # Try to load weights
-                        model.load_weights(CONDITION_MODEL_PATH)
-                        condition_model = model
-                        print("✅ Model rebuilt and weights loaded!")
-                    except Exception as e3:
-                        print(f"❌ All loading methods failed: {e3}")
-                        condition_model = None
-            
-            if condition_model:
-                # Print model details
-                print(f"📋 Model details:")
-                print(f"   Input shape: {condition_model.input_shape}")
-                print(f"   Output shape: {condition_model.output_shape}")
-                
-                # Test prediction
-                try:
-                    import numpy as np
-                    # Create dummy input matching the model's expected input shape
-                    dummy_input = np.random.random((1, 150, 150, 3)).astype(np.float32)
-                    prediction = condition_model.predict(dummy_input, verbose=0)
-                    print(f"✅ Model test passed!")
-                    print(f"   Output shape: {prediction.shape}")
-                    print(f"   Sample output: {prediction[0]}")
-                except Exception as test_error:
-                    print(f"⚠️ Model test warning: {test_error}")
+                            # Try to load weights
+                            model.load_weights(CONDITION_MODEL_PATH)
+                            condition_model = model
+                            print("✅ Model rebuilt and weights loaded!")
+                        except Exception as e3:
+                            print(f"❌ All loading methods failed: {e3}")
+                            condition_model = None
+            
+        else:
+            print("❌ TensorFlow not available")
+            condition_model = None
         
-    else:
-        print("❌ TensorFlow not available")
+    except Exception as e:
+        print(f"❌ Failed to load condition model: {e}")
+        import traceback
+        traceback.print_exc()
         condition_model = None
-        
-except Exception as e:
-    print(f"❌ Failed to load condition model: {e}")
-    import traceback
-    traceback.print_exc()
-    condition_model = None
 
-try:
-    if os.path.exists(ANIMAL_DATA_PATH):
-        animal_data_df = pd.read_csv(ANIMAL_DATA_PATH)
-        print(f"✅ Animal data loaded: {len(animal_data_df)} species")
-        print(f"📊 Sample species: {animal_data_df['animal_type'].head(3).tolist()}")
-        print(f"🔍 Animal data columns: {animal_data_df.columns.tolist()}")
-    else:
+    return condition_model
+
+def load_condition_model():
+    """Condition CNN through onnxruntime (Keras fallback), test-predicted once to warm the session"""
+    condition_model = load_condition_engine(CONDITION_ONNX_PATH, keras_loader=load_keras_condition_model)
+    
+    if condition_model:
+        # Print model details
+        print(f"📋 Model details ({condition_model.backend_name}):")
+        print(f"   Input shape: {condition_model.input_shape}")
+        print(f"   Output shape: {condition_model.output_shape}")
+        
+        # Test prediction
+        try:
+            # Create dummy input matching the model's expected input shape
+            dummy_input = np.random.random((1, 150, 150, 3)).astype(np.float32)
+            prediction = condition_model.predict(dummy_input, verbose=0)
+            print(f"✅ Model test passed!")
+            print(f"   Output shape: {prediction.shape}")
+            print(f"   Sample output: {prediction[0]}")
+        except Exception as test_error:
+            print(f"⚠️ Model test warning: {test_error}")
+    return condition_model
+
+condition_model_resource = LazyResource('condition', load_condition_model)
+
+def get_condition_model():
+    """The condition CNN, loading it on first use. None if it could not be loaded"""
+    return condition_model_resource.get()
+
+def load_animal_data():
+    global animal_data_df
+    if not os.path.exists(ANIMAL_DATA_PATH):
         print("ℹ️  No animal_data.csv found - running without animal info")
-except Exception as e:
-    print(f"❌ Failed to load animal data: {e}")
+        return None
+    df = pd.read_csv(ANIMAL_DATA_PATH)
+    animal_info_index.load_dataframe(df, source=ANIMAL_DATA_PATH)
+    animal_data_df = df
+    print(f"✅ Animal data loaded: {len(animal_data_df)} species")
+    print(f"📊 Sample species: {animal_data_df['animal_type'].head(3).tolist()}")
+    print(f"🔍 Animal data columns: {animal_data_df.columns.tolist()}")
+    return df
+
+animal_data = LazyResource('animal_data', load_animal_data)
+
+# Concurrent /detect and /detect-frame calls share condition-model forward passes
+condition_batcher = batcher_from_env(lambda batch: get_condition_model().predict(batch, verbose=0))
+
+# ================= PUSH EVENTS (SSE) =================
+# Set EVENT_BUS_BACKEND=redis when running more than one worker
+event_bus = event_bus_from_env()
+SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID.
+# Each open stream holds one gunicorn thread (see Procfile), so keep streams well under
+# the worker timeout and size GUNICORN_THREADS for the expected number of open tabs.
+GUNICORN_TIMEOUT = float(os.getenv('GUNICORN_TIMEOUT', 120))
+SSE_MAX_STREAM_SECONDS = min(float(os.getenv('SSE_MAX_STREAM_SECONDS', 60)),
+                             GUNICORN_TIMEOUT - 2 * SSE_HEARTBEAT_SECONDS)
 
 print("🚀 Backend initialization complete!")
 
@@ -761,6 +803,42 @@ def initialize_database():
             except Exception as e:
                 print(f"⚠️ Email fields: {e}")
             
+            try:
+                result = db.session.execute(text("DESCRIBE `user`"))
+                columns = [row[0] for row in result]
+                if 'unread_notification_count' not in columns:
+                    print("🔄 Adding unread_notification_count column...")
+                    db.session.execute(text("ALTER TABLE `user` ADD COLUMN unread_notification_count INT NULL"))
+                    db.session.commit()
+                    print("✅ Added unread_notification_count column to user table")
+            except Exception as e:
+                print(f"⚠️ Unread counter column: {e}")
+            
+            # create_all() only builds indexes for new tables
+            try:
+                result = db.session.execute(text("SHOW INDEX FROM report WHERE Key_name = 'ix_report_created_at_id'"))
+                if not result.fetchone():
+                    print("🔄 Creating index ix_report_created_at_id on report(created_at, id)...")
+                    db.session.execute(text("CREATE INDEX ix_report_created_at_id ON report (created_at, id)"))
+                    db.session.commit()
+                    print("✅ Created report pagination index")
+            except Exception as e:
+                print(f"⚠️ Report pagination index: {e}")
+            
+            for index_name, columns in (
+                ('ix_user_notification_user_created_at_id', 'user_id, created_at, id'),
+                ('ix_user_notification_created_at_id', 'created_at, id'),
+            ):
+                try:
+                    result = db.session.execute(text(f"SHOW INDEX FROM user_notification WHERE Key_name = '{index_name}'"))
+                    if not result.fetchone():
+                        print(f"🔄 Creating index {index_name} on user_notification({columns})...")
+                        db.session.execute(text(f"CREATE INDEX {index_name} ON user_notification ({columns})"))
+                        db.session.commit()
+                        print("✅ Created notification pagination index")
+                except Exception as e:
+                    print(f"⚠️ Notification pagination index: {e}")
+            
         except Exception as e:
             print(f"❌ Database initialization failed: {e}")   
             
@@ -859,47 +937,73 @@ def fix_database_schema():
         except Exception as e:
             print(f"⚠️ Could not fix database schema: {e}")
 
-# Initialize database and fix schema
-initialize_database()
-fix_database_schema()
+def initialize_database_schema():
+    """Initialize database and fix schema (both idempotent)"""
+    initialize_database()
+    fix_database_schema()
+    return True
+
+database_ready = LazyResource('database', initialize_database_schema)
+
+# ================= STARTUP / WARMUP =================
+warmup_steps = []
+if STARTUP['fast_start']:
+    # Serve immediately; a request racing a first-ever schema migration may see a missing column
+    warmup_steps.append(('database', database_ready.get))
+else:
+    database_ready.get()
+if STARTUP['model_warmup'] != 'lazy':
+    warmup_steps += [
+        ('animal_data', animal_data.get),
+        ('condition', get_condition_model),
+        ('yolo', model_registry.load_all),
+    ]
+warmup = Warmup(warmup_steps)
+if STARTUP['model_warmup'] == 'eager':
+    warmup.run()
+elif warmup_steps:
+    warmup.start()
 
 # ================= HELPER FUNCTIONS =================
 def analyze_condition(img_path: str):
     """Analyze animal condition using your trained CNN model"""
-    if condition_model is None:
+    if get_condition_model() is None:
         print("⚠️ Condition model not available!")
         return {"label": "Unknown", "confidence": 0.0}
     
     try:
         print(f"🔍 Analyzing condition for: {os.path.basename(img_path)}")
         
-        import cv2
-        import numpy as np
-        
         # 1. Load image with OpenCV
-        img = cv2.imread(img_path)
-        if img is None:
+        prepared = prepare_image_file(img_path)
+        if prepared is None:
             print(f"❌ Could not read image")
             return {"label": "Unknown", "confidence": 0.0}
         
-        print(f"✅ Image loaded: {img.shape}")
-        
-        # 2. Convert BGR to RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        
-        # 3. Resize to 150x150 (MATCHES YOUR CNN TRAINING SIZE!)
-        img_resized = cv2.resize(img_rgb, (150, 150))
+        print(f"✅ Image loaded: {prepared.shape}")
+        return analyze_condition_array(prepared)
         
-        # 4. Normalize to [0, 1]
-        img_normalized = img_resized.astype(np.float32) / 255.0
-        
-        # 5. Add batch dimension: (1, 150, 150, 3)
-        img_batch = np.expand_dims(img_normalized, axis=0)
+    except Exception as e:
+        print(f"❌ Condition analysis error: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"label": "Unknown", "confidence": 0.0}
+
+def analyze_condition_array(img):
+    """Analyze animal condition from a decoded BGR frame or a PreparedImage (no disk round-trip)"""
+    if get_condition_model() is None:
+        print("⚠️ Condition model not available!")
+        return {"label": "Unknown", "confidence": 0.0}
+    
+    try:
+        # 2-5. RGB -> 150x150 (MATCHES YOUR CNN TRAINING SIZE!) -> [0, 1] -> (1, 150, 150, 3)
+        # The RGB array is shared with the YOLO preprocessing of the same request
+        img_batch = prepare_image(img).condition_input()
         
         print(f"✅ Preprocessed shape: {img_batch.shape}")
         
-        # 6. Get prediction from your CNN model
-        preds = condition_model.predict(img_batch, verbose=0)[0]
+        # 6. Get prediction from your CNN model (micro-batched with concurrent requests)
+        preds = condition_batcher.predict(img_batch)[0]
         
         # 7. Apply softmax (your model already has softmax, but for safety)
         exp_preds = np.exp(preds - np.max(preds))
@@ -937,124 +1041,81 @@ def analyze_condition(img_path: str):
         return {"label": "Unknown", "confidence": 0.0}
 
 def get_animal_info(species_name: str):
-    # Fixed: Check if animal_data_df is not None and is a DataFrame
-    if animal_data_df is None or not isinstance(animal_data_df, pd.DataFrame):
-        return None
-    
+    """O(1) species lookup in the index compiled from animal_data.csv at load time"""
     try:
-        possible_columns = ['animal_type', 'species', 'common_name', 'name', 'animal', 'class']
-        found_data = None
-        
-        for col in possible_columns:
-            if col in animal_data_df.columns:
-                animal_data_df[col] = animal_data_df[col].fillna('')
-                match = animal_data_df[animal_data_df[col].str.lower() == species_name.lower()]
-                if not match.empty:
-                    # Fixed: Ensure we're working with a proper pandas Series, not bytes
-                    row_data = match.iloc[0]
-                    if hasattr(row_data, 'to_dict'):
-                        found_data = row_data.to_dict()
-                    else:
-                        # Fallback: manually create dict if to_dict() fails
-                        found_data = {}
-                        for key in match.columns:
-                            found_data[key] = row_data[key] if key in row_data else None
-                    break
-        
-        if found_data:
-            clean_data = {}
-            column_mapping = {
-                'animal_type': 'species',
-                'conservation_status': 'conservation_status', 
-                'estimated_population': 'population',
-                'habitat': 'habitat',
-                'lifespan': 'lifespan',
-                'health_recommendation_injured': 'care_injured',
-                'health_recommendation_malnourished': 'care_malnourished',
-                'health_recommendation': 'care_general',
-                'character_traits': 'character_traits'  # ADDED: Character traits mapping
-            }
-            
-            for original_key, value in found_data.items():
-                # Fixed: Properly check for NaN/None values
-                if value is not None and not (isinstance(value, float) and np.isnan(value)) and original_key in column_mapping:
-                    new_key = column_mapping[original_key]
-                    clean_data[new_key] = value
-            
-            return clean_data if clean_data else None
-        
-        return None
+        animal_data.get()
+        return animal_info_index.get(species_name)
     except Exception as e:
         print(f"⚠️  Error looking up animal info for {species_name}: {e}")
         return None
 
-def process_frame(frame, model_choice):
+def animal_data_available():
+    """True when species info is loaded or can still be loaded on first lookup.
+
+    In lazy/background startup the CSV may not be read yet; that is not "unavailable".
+    """
+    if animal_data_df is not None or animal_data.ready:
+        return True
+    return animal_data.state != 'failed' and os.path.exists(ANIMAL_DATA_PATH)
+
+def reload_animal_data():
+    """Re-read animal_data.csv and swap the lookup index in atomically"""
+    global animal_data_df
+    df = pd.read_csv(ANIMAL_DATA_PATH)
+    animal_info_index.load_dataframe(df, source=ANIMAL_DATA_PATH)
+    animal_data_df = df
+    return animal_info_index.stats()
+
+def process_frame(frame, model_choice, in_memory=None):
+    """Run the selected YOLO models on a decoded BGR frame (or a PreparedImage).
+
+    With in_memory (the default, see FRAME_INFERENCE_MODE) the frame is letterboxed into
+    a 640x640 tensor once and every selected model reuses it, skipping the JPEG
+    encode -> disk -> decode round-trip and the per-model resize.
+    """
+    if in_memory is None:
+        in_memory = FRAME_INFERENCE_MODE != 'disk'
+    
+    prepared = prepare_image(frame)
+    temp_path = None
     try:
-        temp_path = os.path.join(UPLOAD_DIR, f"temp_frame_{uuid.uuid4()}.jpg")
-        cv2.imwrite(temp_path, frame)
+        if in_memory:
+            source = prepared.tensor()
+        else:
+            temp_path = os.path.join(UPLOAD_DIR, f"temp_frame_{uuid.uuid4()}.jpg")
+            cv2.imwrite(temp_path, prepared.bgr)
+            source = temp_path
         
         aggregated = {}
-        selected_models = models.get(model_choice, [])
-        print(f"🔍 Using {len(selected_models)} models for {model_choice}")
+        selected_models = model_registry.group(model_choice)
+        print(f"🔍 Using {len(selected_models)} models for {model_choice} ({'memory' if in_memory else 'disk'})")
+        
+        def run_model(model_name, model):
+            # Warm session from the registry - no per-frame teardown / gc.collect()
+            return model.predict(
+                source, 
+                conf=0.25,
+                verbose=False,  # Reduce output noise
+                imgsz=640,
+                max_det=10  # Limit max detections per frame
+            )
         
-        for i, model in enumerate(selected_models):
+        model_runs = model_registry.map_models(selected_models, run_model, parallel=PARALLEL_MODEL_INFERENCE)
+        
+        for i, (model_name, results, error) in enumerate(model_runs):
             try:
-                print(f"🔍 Running model {i+1}...")
-                
-                # FIX: Add cleanup for ONNX runtime between predictions
-                if hasattr(model, '_session'):
-                    try:
-                        # Release ONNX session resources
-                        import gc
-                        del model._session
-                        gc.collect()
-                    except:
-                        pass
-                
-                # FIX: Use smaller batch size and explicit cleanup
-                results = model.predict(
-                    temp_path, 
-                    conf=0.25,
-                    verbose=False,  # Reduce output noise
-                    imgsz=640,
-                    max_det=10  # Limit max detections per frame
-                )
+                if error:
+                    raise error
                 
                 print(f"🔍 Model {i+1} returned {len(results)} results")
-                
-                for r in results:
-                    if hasattr(r, 'boxes') and r.boxes is not None:
-                        print(f"🔍 Model {i+1} found {len(r.boxes)} boxes")
-                        for box in r.boxes:
-                            cls_name = r.names[int(box.cls)]
-                            conf = float(box.conf)
-                            print(f"🎯 Detected: {cls_name} ({conf:.2f})")
-                            
-                            if cls_name not in aggregated or conf > aggregated[cls_name]["confidence"]:
-                                animal_info = get_animal_info(cls_name)
-                                aggregated[cls_name] = {
-                                    "class": cls_name, 
-                                    "confidence": conf,
-                                    "animal_info": animal_info
-                                }
-                
-                # FIX: Force cleanup after each model
-                if hasattr(model, '_session'):
-                    try:
-                        import gc
-                        del model
-                        gc.collect()
-                    except:
-                        pass
+                # Same merge as process_frames_batch, so single and batched frames agree
+                merge_detections(aggregated, results)
                         
             except Exception as e:
                 print(f"❌ Model {i+1} error in frame processing: {e}")
                 import traceback
                 traceback.print_exc()
                 continue
-        
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
             
         return list(aggregated.values())
     except Exception as e:
@@ -1062,6 +1123,79 @@ def process_frame(frame, model_choice):
         import traceback
         traceback.print_exc()
         return []
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def merge_detections(aggregated, results):
+    """Fold ultralytics results into the class -> max-confidence aggregation"""
+    for r in results:
+        if hasattr(r, 'boxes') and r.boxes is not None:
+            for box in r.boxes:
+                cls_name = r.names[int(box.cls)]
+                conf = float(box.conf)
+                
+                if cls_name not in aggregated or conf > aggregated[cls_name]["confidence"]:
+                    aggregated[cls_name] = {
+                        "class": cls_name,
+                        "confidence": conf,
+                        "animal_info": get_animal_info(cls_name)
+                    }
+    return aggregated
+
+def process_frames_batch(frames, model_choice):
+    """Run the selected YOLO models over a batch of decoded BGR frames (or PreparedImages).
+
+    Each model gets the whole batch in one predict() call, built from tensors that are
+    letterboxed once and shared by all models. Returns one detection list per frame,
+    in the same order as `frames`. Models exported with a static batch size of 1 fail
+    the batched call once and are then fed frame by frame.
+    """
+    per_frame = [{} for _ in frames]
+    if not frames:
+        return []
+    
+    prepared_frames = [prepare_image(frame) for frame in frames]
+    stacked = batch_tensor(prepared_frames) if len(prepared_frames) > 1 else None
+    predict_kwargs = dict(conf=0.25, verbose=False, imgsz=640, max_det=10)
+    
+    def run_model(model_name, model):
+        entry = model_registry.entries[model_name]
+        results = None
+        if stacked is not None and entry.supports_batch is not False:
+            try:
+                results = model.predict(stacked, **predict_kwargs)
+                entry.supports_batch = True
+            except Exception as batch_error:
+                entry.supports_batch = False
+                print(f"⚠️ Model {model_name} rejected batch of {len(frames)} ({batch_error}) - falling back to single frames")
+        
+        if results is None:
+            results = []
+            for prepared in prepared_frames:
+                results.extend(model.predict(prepared.tensor(), **predict_kwargs))
+        return results
+    
+    model_runs = model_registry.map_models(
+        model_registry.group(model_choice), run_model, parallel=PARALLEL_MODEL_INFERENCE
+    )
+    
+    for model_name, results, error in model_runs:
+        try:
+            if error:
+                raise error
+            
+            print(f"🔍 Model {model_name} processed {len(frames)} frames")
+            for aggregated, result in zip(per_frame, results):
+                merge_detections(aggregated, [result])
+                
+        except Exception as e:
+            print(f"❌ Model {model_name} error in batch processing: {e}")
+            import traceback
+            traceback.print_exc()
+            continue
+    
+    return [list(aggregated.values()) for aggregated in per_frame]
 
 # ================= UPDATED DATABASE FUNCTIONS =================
 def create_sighting_record(user_id, detection_data, condition_result, image_filename, detection_type, location_data=None, sighting_details=None):
@@ -1227,7 +1361,9 @@ def create_report_record(user_id, sighting_id, image_filename, detection_type, s
         return None
 
 # ✅ ADDED: Function to create admin history record
-def create_admin_history(report_id, admin_name, action, notes=None, previous_status=None, new_status=None):
+def create_admin_history(report_id, admin_name, action, notes=None, previous_status=None, new_status=None, commit=True):
+    """Record an admin action. commit=False leaves the row in the caller's transaction
+    (errors are raised instead of rolled back here)."""
     try:
         history = AdminHistory()
         history.report_id = report_id
@@ -1238,18 +1374,124 @@ def create_admin_history(report_id, admin_name, action, notes=None, previous_sta
         history.new_status = new_status
         
         db.session.add(history)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         print(f"✅ Admin history recorded for report {report_id}: {action}")
         return history
     except Exception as e:
         print(f"❌ Error creating admin history: {e}")
+        if not commit:
+            raise
         db.session.rollback()
         return None
 
+# ================= UNREAD NOTIFICATION COUNTER =================
+def bump_unread_count(user_id, delta):
+    """Adjust a user's unread counter inside the caller's transaction.
+
+    Counters that are NULL (never computed / invalidated) are left alone and
+    recounted lazily by get_unread_count().
+    """
+    User.query.filter(
+        User.id == user_id,
+        User.unread_notification_count.isnot(None)
+    ).update({
+        User.unread_notification_count: db.func.greatest(User.unread_notification_count + delta, 0)
+    }, synchronize_session=False)
+
+def invalidate_unread_count(user_id):
+    """Force a recount, e.g. after notifications were deleted in bulk"""
+    User.query.filter(User.id == user_id).update(
+        {User.unread_notification_count: None}, synchronize_session=False
+    )
+
+def get_unread_count(user):
+    """Unread notifications for a user, from the counter column (recounted if unknown)"""
+    if user.unread_notification_count is not None:
+        return user.unread_notification_count
+    
+    # One statement: the count is taken under the user row lock, so a bump from a concurrent
+    # notification either waits for it or is included, never overwritten
+    unread = db.select(db.func.count(UserNotification.id)).where(
+        UserNotification.user_id == user.id,
+        UserNotification.is_read.is_(False)
+    ).scalar_subquery()
+    try:
+        User.query.filter(
+            User.id == user.id,
+            User.unread_notification_count.is_(None)
+        ).update({User.unread_notification_count: unread}, synchronize_session=False)
+        db.session.commit()
+        return db.session.query(User.unread_notification_count).filter(User.id == user.id).scalar() or 0
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Could not store unread counter for user {user.id}: {e}")
+        return UserNotification.query.filter_by(user_id=user.id, is_read=False).count()
+
+# ================= EMAIL DELIVERY WRITEBACK =================
+def record_notification_email(notification_id):
+    """on_result callback for the mail queue: store the outcome on the notification row"""
+    def on_result(success, error):
+        try:
+            UserNotification.query.filter_by(id=notification_id).update({
+                'email_sent': success,
+                'email_error': None if success else (error or 'Email sending failed')[:1000]
+            }, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Could not record email result for notification {notification_id}: {e}")
+    return on_result
+
+# ================= PUSH EVENT HELPERS =================
+def publish_event(user_id, event_type, data):
+    """Push an event to one user's SSE stream (after the change is committed)"""
+    try:
+        event_bus.publish(f"user:{user_id}", event_type, data)
+    except Exception as e:
+        print(f"⚠️ Could not publish {event_type} event for user {user_id}: {e}")
+
+def publish_notification(notification):
+    """Push a committed notification to the user's SSE stream"""
+    publish_event(notification.user_id, 'notification', notification.to_dict())
+
+def report_status_event(report, previous_status):
+    return {
+        'report_id': report.id,
+        'previous_status': previous_status,
+        'status': report.status,
+        'updated_at': report.updated_at.isoformat() if report.updated_at else None
+    }
+
+def publish_report_status(report, previous_status):
+    """Push a committed report status change to the report owner's SSE stream"""
+    if report.status == previous_status:
+        return
+    publish_event(report.user_id, 'report_status', report_status_event(report, previous_status))
+
 # ================= AUTO-NOTIFICATION FOR REPORT STATUS CHANGES =================
-def create_auto_notification(report_id, status_change=False):
-    """Automatically create notifications when report status changes"""
+def auto_notification_message(report, status_change=False):
+    """The user-facing text for an automatic report notification"""
+    species = report.sighting.species if report.sighting else 'Reported Wildlife'
+    
+    # Determine message based on status
+    if status_change:
+        status_messages = {
+            'under_review': f'Your {species} report is now under review by our wildlife team.',
+            'resolved': f'Your {species} report has been resolved. Thank you for your contribution!',
+            'dismissed': f'Your {species} report has been reviewed and dismissed.',
+            'pending': f'Your {species} report has been reopened for review.'
+        }
+        return status_messages.get(report.status, f'Status updated for your {species} report.')
+    return f'We have received your {species} report and it is currently pending review.'
+
+def create_auto_notification(report_id, status_change=False, commit=True):
+    """Automatically create notifications when report status changes.
+
+    With commit=False the notification joins the caller's transaction; the caller
+    commits and then calls publish_notification() on the returned row.
+    """
     try:
         report = Report.query.get(report_id)
         if not report:
@@ -1258,35 +1500,28 @@ def create_auto_notification(report_id, status_change=False):
         user_id = report.user_id
         species = report.sighting.species if report.sighting else 'Reported Wildlife'
         
-        # Determine message based on status
-        if status_change:
-            status_messages = {
-                'under_review': f'Your {species} report is now under review by our wildlife team.',
-                'resolved': f'Your {species} report has been resolved. Thank you for your contribution!',
-                'dismissed': f'Your {species} report has been reviewed and dismissed.',
-                'pending': f'Your {species} report has been reopened for review.'
-            }
-            message = status_messages.get(report.status, f'Status updated for your {species} report.')
-        else:
-            message = f'We have received your {species} report and it is currently pending review.'
-        
         # Create notification
         notification = UserNotification(
             user_id=user_id,
             report_id=report_id,
-            message=message,
+            message=auto_notification_message(report, status_change),
             status=report.status
         )
         
         db.session.add(notification)
-        db.session.commit()
+        bump_unread_count(user_id, 1)
+        if commit:
+            db.session.commit()
+            publish_notification(notification)
         
         print(f"✅ Auto-notification created for user {user_id}: {species}")
         return notification
         
     except Exception as e:
-        db.session.rollback()
         print(f"❌ Error creating auto-notification: {e}")
+        if not commit:
+            raise
+        db.session.rollback()
         return None
 
 # ================= ROUTES =================
@@ -1300,35 +1535,12 @@ def generate_token(length=6):
 # MAILER
 from flask_mail import Message
 
-def send_verification_email(email, token):
-    msg = Message(
-        subject="Verify Your Email",
-        recipients=[email]
-    )
+def build_verification_email(email, token):
+    return message_from_rendered(render_email('verification', token=token), [email])
 
-    # ✅ HTML email (BIG + BOLD TOKEN)
-    msg.html = f"""
-    <div style="font-family: Arial, sans-serif; line-height: 1.6;">
-        <h2>Email Verification</h2>
-        <p>Thank you for registering.</p>
-        <p>Your verification code is:</p>
-
-        <div style="
-            font-size: 32px;
-            font-weight: bold;
-            letter-spacing: 5px;
-            color: #16a34a;
-            margin: 20px 0;
-        ">
-            {token}
-        </div>
-
-        <p>This code will expire soon.</p>
-        <p>If you did not request this, please ignore this email.</p>
-    </div>
-    """
-
-    mail.send(msg)
+def send_verification_email(email, token):
+    """Hand the verification code email to the mail queue"""
+    return deliver_email(build_verification_email(email, token))
 
 
 
@@ -1473,20 +1685,55 @@ def debug_sightings():
 @app.route('/api/uploaded-images/<filename>')
 def get_uploaded_image(filename):
     try:
-        if '..' in filename or filename.startswith('/'):
+        if '..' in filename or filename.startswith('/') or '\\' in filename:
             return jsonify({'error': 'Invalid filename'}), 400
             
-        file_path = os.path.join(UPLOAD_DIR, filename)
+        file_path = upload_store.path_for(filename)
+        
+        # ?width=320[&format=webp] serves a cached resized variant (first frame for videos)
+        if request.args.get('width') or request.args.get('w'):
+            return send_image_variant(filename, file_path)
+        
+        # ETag / immutable Cache-Control / 304 / Range handling live in upload_serving.py
+        response = send_upload(file_path, filename)
         
-        if not os.path.exists(file_path):
-            print(f"❌ Image not found: {file_path}")
+        if response is None:
+            print(f"❌ Image not found: {filename}")
             return jsonify({'error': 'Image not found'}), 404
             
-        return send_from_directory(UPLOAD_DIR, filename)
+        return response
     except Exception as e:
         print(f"❌ Error serving image {filename}: {e}")
         return jsonify({'error': 'Image not found'}), 404
 
+def send_image_variant(filename, file_path):
+    try:
+        width, fmt = variant_cache.parse(request.args.get('width') or request.args.get('w'), request.args.get('format'))
+    except VariantError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        print(f"❌ Image not found: {filename}")
+        return jsonify({'error': 'Image not found'}), 404
+
+    etag = f"{upload_etag(filename, stat)}-w{width}.{fmt}"
+    if request.if_none_match.contains(etag):
+        return not_modified(etag, filename)
+
+    variant_path = variant_cache.get(file_path, etag, width, fmt)
+    if variant_path is None:
+        return jsonify({'error': 'Could not decode image for resizing'}), 415
+
+    response = send_upload(variant_path, filename, etag=etag)
+    # Evicted between generation and sending (another request filled the cache) - serve the original
+    return response or send_upload(file_path, filename)
+
+@app.route('/api/uploads/variants', methods=['GET'])
+def get_variant_cache_stats():
+    return jsonify(variant_cache.stats())
+
 @app.route('/uploads/<filename>')
 def serve_uploaded_image(filename):
     return get_uploaded_image(filename)
@@ -1494,20 +1741,23 @@ def serve_uploaded_image(filename):
 @app.route('/api/debug-images', methods=['GET'])
 def debug_images():
     try:
-        files = os.listdir(UPLOAD_DIR)
-        image_files = [f for f in files if f.lower().endswith(('.jpg', '.jpeg', '.png', '.mp4'))]
+        # Served from the upload index - no directory scan
+        stats = upload_store.stats()
         
         return jsonify({
             'upload_dir': UPLOAD_DIR,
-            'total_files': len(files),
-            'image_files': len(image_files),
-            'recent_images': image_files[-10:] if image_files else []
+            'total_files': stats['names'],
+            'image_files': stats['names'],
+            'total_bytes': stats['bytes'],
+            'by_kind': stats['by_kind'],
+            'recent_images': [row['name'] for row in upload_store.recent(10)]
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # ================= FIXED DETECTION ROUTES - NO AUTO SAVING =================
 @app.route('/detect', methods=['POST'])
+@streamed_upload('image')
 def detect():
     try:
         print("📨 Received IMAGE detection request")
@@ -1538,38 +1788,35 @@ def detect():
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
 
-        unique_filename = f"{uuid.uuid4()}.jpg"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        file.save(file_path)
-        print(f"💾 Saved image: {unique_filename}")
+        unique_filename, file_path = store_upload(file, 'jpg', 'image')
 
+        # Decode + letterbox once; every model and the condition CNN reuse it
+        prepared = prepare_image_file(file_path)
+        if prepared is None:
+            return jsonify({"error": "Could not read image"}), 400
+        source = prepared.tensor()
+        
         aggregated = {}
-        selected_models = models.get(model_choice, [])
+        selected_models = model_registry.group(model_choice)
         print(f"🔍 Using {len(selected_models)} models for {model_choice}")
         
-        for i, model in enumerate(selected_models):
+        model_runs = model_registry.map_models(
+            selected_models,
+            lambda model_name, model: model.predict(source, conf=0.25),
+            parallel=PARALLEL_MODEL_INFERENCE
+        )
+        
+        for i, (model_name, results, error) in enumerate(model_runs):
             try:
-                results = model.predict(file_path, conf=0.25)
-                
-                for r in results:
-                    if hasattr(r, 'boxes') and r.boxes is not None:
-                        for box in r.boxes:
-                            cls_name = r.names[int(box.cls)]
-                            conf = float(box.conf)
-                            
-                            if cls_name not in aggregated or conf > aggregated[cls_name]["confidence"]:
-                                animal_info = get_animal_info(cls_name)
-                                aggregated[cls_name] = {
-                                    "class": cls_name, 
-                                    "confidence": conf,
-                                    "animal_info": animal_info
-                                }
+                if error:
+                    raise error
+                merge_detections(aggregated, results)
             except Exception as e:
                 print(f"❌ Model {i+1} error: {e}")
                 continue
 
         detections = list(aggregated.values())
-        condition_result = analyze_condition(file_path)
+        condition_result = analyze_condition_array(prepared)
 
         # ✅ FIXED: REMOVED automatic database storage
         # Detection results are returned but NOT automatically saved to database
@@ -1580,7 +1827,7 @@ def detect():
             "detections": detections,
             "condition": condition_result,
             "model_used": model_choice,
-            "animal_data_available": animal_data_df is not None,
+            "animal_data_available": animal_data_available(),
             "detection_type": "image",
             "image_path": unique_filename,
             "report_created": False,  # ✅ Always false now - no auto-saving
@@ -1595,7 +1842,123 @@ def detect():
         print(f"💥 Image detection error: {e}")
         return jsonify({"error": f"Image detection failed: {str(e)}"}), 500
 
+class VideoOpenError(Exception):
+    """Raised when OpenCV cannot open an uploaded video"""
+
+def run_video_detection(video_path, unique_filename, model_choice, sampling=None, batch_size=None, progress=None):
+    """Decode + YOLO + condition pipeline for one saved video. Returns the /detect-video payload.
+
+    Runs inside the request for synchronous calls and inside a worker process for
+    job mode; `progress(done, total)` is called after every batch when given.
+    """
+    sampling = sampling or sampler_settings_from_env()
+    batch_size = batch_size or VIDEO_BATCH_SIZE
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise VideoOpenError(f"Could not open video file: {unique_filename}")
+
+    all_detections = []
+    sampler = VideoFrameSampler(cap, **sampling)
+    
+    condition_result = {"label": "Unknown", "confidence": 0}
+    frame_detections = []
+    pending_frames = []
+    
+    def flush_batch():
+        nonlocal frame_detections, condition_result
+        if not pending_frames:
+            return
+        print(f"📊 Processing batch of {len(pending_frames)} frames...")
+        batch_detections = process_frames_batch(pending_frames, model_choice)
+        
+        for frame, detections in zip(pending_frames, batch_detections):
+            all_detections.extend(detections)
+            
+            # Analyze condition on the first frame that has detections
+            if detections and not frame_detections:
+                frame_detections = detections
+                try:
+                    condition_result = analyze_condition_array(frame)
+                    print(f"✅ Condition analyzed: {condition_result}")
+                except Exception as e:
+                    print(f"⚠️ Condition analysis failed for video frame: {e}")
+                    condition_result = {"label": "Unknown", "confidence": 0}
+        pending_frames.clear()
+        
+        if progress:
+            progress(sampler.frames_analyzed, sampler.max_frames)
+    
+    for frame_index, timestamp, frame in sampler:
+        pending_frames.append(prepare_image(frame))
+        if len(pending_frames) >= batch_size:
+            flush_batch()
+    
+    flush_batch()
+    print(f"📊 Video sampling: {sampler.stats()}")
+
+    cap.release()
+    
+    # ✅ FIXED: DO NOT DELETE THE VIDEO FILE!
+    # The video file must stay in uploads so it can be used when creating reports
+    
+    # ✅ ADDED: Create a thumbnail for video preview
+    thumbnail_filename = None
+    try:
+        # Extract first frame as thumbnail
+        cap = cv2.VideoCapture(video_path)
+        if cap.isOpened():
+            ret, thumbnail_frame = cap.read()
+            if ret:
+                encoded, thumbnail_jpeg = cv2.imencode('.jpg', thumbnail_frame)
+                if encoded:
+                    thumbnail_filename, _ = upload_store.put_bytes(thumbnail_jpeg.tobytes(), 'jpg', 'thumb')
+                    print(f"✅ Created video thumbnail: {thumbnail_filename}")
+            cap.release()
+    except Exception as e:
+        print(f"⚠️ Could not create video thumbnail: {e}")
+    
+    # ✅ FIXED: REMOVED automatic database storage
+    best_detection = max(all_detections, key=lambda x: x["confidence"]) if all_detections else None
+    
+    response = {
+        "filename": unique_filename,
+        "thumbnail": thumbnail_filename,  # ✅ ADDED: Thumbnail for preview
+        "detections": [best_detection] if best_detection else [],
+        "condition": condition_result,
+        "model_used": model_choice,
+        "frames_processed": sampler.frames_analyzed,
+        "sampling": sampler.stats(),
+        "animal_data_available": animal_data_available(),
+        "detection_type": "video",
+        "report_created": False,  # ✅ Always false now - no auto-saving
+        "report_data": None,  # ✅ No report data since nothing is saved
+        "can_create_report": bool(best_detection)  # ✅ Indicate that user CAN create report manually
+    }
+    
+    print(f"✅ Video processing complete: {1 if best_detection else 0} detections - Video file preserved: {unique_filename}")
+    return response
+
+def _init_video_worker():
+    """Runs in each video job process right after fork"""
+    model_registry.reset_after_fork()
+    condition_batcher.reset_after_fork()
+    # ONNX Runtime sessions are not fork-safe either - reopen the condition session on first use
+    condition_model = condition_model_resource.peek()
+    if condition_model is None or condition_model.backend_name == 'onnxruntime':
+        condition_model_resource.reset()
+    # The parent's warmup thread may have been mid-load (holding the lock) when we forked
+    if not animal_data.ready:
+        animal_data.reset()
+
+# Bounded process pool for /detect-video?async=true (VIDEO_JOB_WORKERS / VIDEO_JOB_MAX_PENDING).
+# Job records live in a sqlite file next to the upload index, so every gunicorn worker sees
+# every job and the limits hold per host rather than per worker.
+video_job_queue = queue_from_env(run_video_detection, os.path.join(UPLOAD_DIR, '.video_jobs.sqlite'),
+                                 initializer=_init_video_worker)
+
 @app.route('/detect-video', methods=['POST'])
+@streamed_upload('video')
 def detect_video():
     try:
         print("🎞 Received VIDEO detection request")
@@ -1626,113 +1989,65 @@ def detect_video():
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
 
-        unique_filename = f"{uuid.uuid4()}.mp4"
-        video_path = os.path.join(UPLOAD_DIR, unique_filename)
-        file.save(video_path)
-        print(f"💾 Saved video: {unique_filename}")
+        # Sampling: N frames per second of video, max_frames counts analyzed frames only.
+        # Clients may lower the budget but not raise it past VIDEO_SAMPLE_FPS_LIMIT / VIDEO_MAX_FRAMES_LIMIT
+        try:
+            sampling = client_sampling(
+                sampler_settings_from_env(),
+                sampler_limits_from_env(),
+                sample_fps=request.form.get('sample_fps'),
+                max_frames=request.form.get('max_frames')
+            )
+        except ValueError as e:
+            return jsonify({"error": f"Invalid sampling parameters: {e}"}), 400
+
+        unique_filename, video_path = store_upload(file, 'mp4', 'video')
         
         # ✅ ADDED: Verify the video was saved successfully
         if os.path.exists(video_path):
             file_size = os.path.getsize(video_path)
             print(f"✅ Video file verified: {unique_filename} ({file_size} bytes)")
         else:
-            print(f"❌ ERROR: Video file was not saved!")
-            return jsonify({"error": "Failed to save video file"}), 500
-
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            # Don't delete the video file if it can't be opened
-            print(f"❌ Could not open video file: {unique_filename}")
-            return jsonify({"error": "Could not open video file"}), 400
-
-        all_detections = []
-        frame_count = 0
-        sample_rate = 30  # Increased to process fewer frames
-        max_frames = 50   # Limit total frames processed
-        
-        condition_result = {"label": "Unknown", "confidence": 0}
-        frame_detections = []
-        
-        # FIX: Initialize model once at the beginning
-        selected_models = models.get(model_choice, [])
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret or frame_count >= max_frames:
-                break
-                
-            frame_count += 1
-            if frame_count % sample_rate != 0:
-                continue
-                
-            print(f"📊 Processing frame {frame_count}...")
-            
-            detections = process_frame(frame, model_choice)
-            all_detections.extend(detections)
-            
-            # Save a frame for condition analysis if we have detections
-            if detections and not frame_detections:
-                frame_detections = detections
-                # Save frame for condition analysis
-                temp_condition_path = os.path.join(UPLOAD_DIR, f"temp_condition_{uuid.uuid4()}.jpg")
-                cv2.imwrite(temp_condition_path, frame)
-                
-                try:
-                    condition_result = analyze_condition(temp_condition_path)
-                    print(f"✅ Condition analyzed: {condition_result}")
-                except Exception as e:
-                    print(f"⚠️ Condition analysis failed for video frame: {e}")
-                    condition_result = {"label": "Unknown", "confidence": 0}
-                
-                # Clean up temp file
-                if os.path.exists(temp_condition_path):
-                    os.remove(temp_condition_path)
-            
-            # FIX: Explicit garbage collection after each frame
-            import gc
-            gc.collect()
+            print(f"❌ ERROR: Video file was not saved!")
+            return jsonify({"error": "Failed to save video file"}), 500
 
-        cap.release()
-        
-        # ✅ FIXED: DO NOT DELETE THE VIDEO FILE!
-        # The video file must stay in uploads so it can be used when creating reports
-        # if os.path.exists(video_path):
-        #     os.remove(video_path)  # ❌ REMOVED THIS LINE!
-        
-        # ✅ ADDED: Create a thumbnail for video preview
-        thumbnail_filename = None
         try:
-            # Extract first frame as thumbnail
-            cap = cv2.VideoCapture(video_path)
-            if cap.isOpened():
-                ret, thumbnail_frame = cap.read()
-                if ret:
-                    thumbnail_filename = f"thumb_{unique_filename.replace('.mp4', '.jpg')}"
-                    thumbnail_path = os.path.join(UPLOAD_DIR, thumbnail_filename)
-                    cv2.imwrite(thumbnail_path, thumbnail_frame)
-                    print(f"✅ Created video thumbnail: {thumbnail_filename}")
-                cap.release()
-        except Exception as e:
-            print(f"⚠️ Could not create video thumbnail: {e}")
+            batch_size = max(1, int(request.form.get('batch_size', VIDEO_BATCH_SIZE)))
+        except ValueError:
+            batch_size = VIDEO_BATCH_SIZE
+        
+        job_kwargs = dict(
+            video_path=video_path,
+            unique_filename=unique_filename,
+            model_choice=model_choice,
+            sampling=sampling,
+            batch_size=batch_size
+        )
         
-        # ✅ FIXED: REMOVED automatic database storage
-        best_detection = max(all_detections, key=lambda x: x["confidence"]) if all_detections else None
+        # ✅ Job mode: hand the video to the worker pool and let the client poll
+        if request.form.get('async', '').lower() in ('1', 'true', 'yes'):
+            try:
+                job = video_job_queue.submit(**job_kwargs)
+            except QueueFullError as e:
+                print(f"⚠️ {e}")
+                return jsonify({"error": str(e), "filename": unique_filename}), 429
+            
+            print(f"📥 Queued video job {job['job_id']} for {unique_filename}")
+            return jsonify({
+                "job_id": job['job_id'],
+                "status": job['status'],
+                "status_url": f"/api/video-jobs/{job['job_id']}",
+                "filename": unique_filename,
+                "detection_type": "video"
+            }), 202
         
-        response = {
-            "filename": unique_filename,
-            "thumbnail": thumbnail_filename,  # ✅ ADDED: Thumbnail for preview
-            "detections": [best_detection] if best_detection else [],
-            "condition": condition_result,
-            "model_used": model_choice,
-            "frames_processed": frame_count,
-            "animal_data_available": animal_data_df is not None,
-            "detection_type": "video",
-            "report_created": False,  # ✅ Always false now - no auto-saving
-            "report_data": None,  # ✅ No report data since nothing is saved
-            "can_create_report": bool(best_detection)  # ✅ Indicate that user CAN create report manually
-        }
+        try:
+            response = run_video_detection(**job_kwargs)
+        except VideoOpenError as e:
+            # Don't delete the video file if it can't be opened
+            print(f"❌ {e}")
+            return jsonify({"error": "Could not open video file"}), 400
         
-        print(f"✅ Video processing complete: {1 if best_detection else 0} detections - Video file preserved: {unique_filename}")
         return jsonify(response)
 
     except Exception as e:
@@ -1741,7 +2056,20 @@ def detect_video():
         traceback.print_exc()
         return jsonify({"error": f"Video processing failed: {str(e)}"}), 500
 
+@app.route('/api/video-jobs/<job_id>', methods=['GET'])
+def get_video_job(job_id):
+    """Poll an asynchronous video detection job"""
+    job = video_job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/video-jobs', methods=['GET'])
+def get_video_job_stats():
+    return jsonify(video_job_queue.stats())
+
 @app.route('/detect-frame', methods=['POST'])
+@streamed_upload('frame')
 def detect_frame():
     try:
         print("🎥 Received REAL-TIME frame detection request")
@@ -1759,47 +2087,28 @@ def detect_frame():
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
 
-        # ✅ FIXED: Read the file data and save it IMMEDIATELY
-        file_data = file.read()
-        nparr = np.frombuffer(file_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # ✅ FIXED: ALWAYS save the frame when there's a detection request
+        # This ensures we have a file to reference when creating reports.
+        # The upload was streamed to disk, so keeping it is a rename (no re-encode),
+        # and an identical frame sent again reuses the stored file
+        permanent_filename, permanent_path = store_upload(file, 'jpg', 'realtime')
+        frame = cv2.imread(permanent_path, cv2.IMREAD_COLOR)
         
         if frame is None:
             print(f"❌ Could not decode frame from uploaded data")
+            upload_store.delete(permanent_filename)
             return jsonify({"error": "Failed to process frame"}), 500
         
-        # ✅ FIXED: ALWAYS save the frame when there's a detection request
-        # This ensures we have a file to reference when creating reports
-        permanent_filename = f"realtime_{uuid.uuid4()}.jpg"
-        permanent_path = os.path.join(UPLOAD_DIR, permanent_filename)
-        cv2.imwrite(permanent_path, frame)
-        print(f"💾 Saved frame as: {permanent_filename}")
-        
-        # Process the frame for detection
-        temp_path = None
+        # Process the frame for detection (in memory - no temp files)
+        prepared = prepare_image(frame)
+        detections = process_frame(prepared, model_choice)
+        
+        # Analyze condition for the frame (reuses the decoded RGB array)
         try:
-            # Create a temporary file for condition analysis
-            temp_filename = f"temp_frame_{uuid.uuid4()}.jpg"
-            temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-            
-            # Save temporarily for condition analysis
-            cv2.imwrite(temp_path, frame)
-            
-            # Get detections
-            detections = process_frame(frame, model_choice)
-            
-            # Analyze condition for the frame
-            try:
-                condition_result = analyze_condition(temp_path)
-            except Exception as e:
-                print(f"⚠️ Condition analysis failed for real-time frame: {e}")
-                condition_result = {"label": "Unknown", "confidence": 0}
-                
-        finally:
-            # Clean up temporary file (but keep permanent file)
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
-                print(f"🗑️  Cleaned up temporary frame: {os.path.basename(temp_path)}")
+            condition_result = analyze_condition_array(prepared)
+        except Exception as e:
+            print(f"⚠️ Condition analysis failed for real-time frame: {e}")
+            condition_result = {"label": "Unknown", "confidence": 0}
 
         # Find best detection
         best_detection = max(detections, key=lambda x: x["confidence"]) if detections else None
@@ -1809,7 +2118,7 @@ def detect_frame():
             "detections": detections,
             "condition": condition_result,
             "model_used": model_choice,
-            "animal_data_available": animal_data_df is not None,
+            "animal_data_available": animal_data_available(),
             "detection_type": "real-time",
             "image_saved": True,  # ✅ Always true now
             "filename": permanent_filename,  # ✅ CRITICAL: Include filename
@@ -1833,6 +2142,12 @@ def create_report():
     try:
         if not request.is_json:
             return jsonify({"error": "Content-Type must be application/json"}), 400
+
+        # A real-time frame arrives base64-encoded in the JSON; refuse oversized bodies unread
+        try:
+            check_content_length('frame', encoded_ratio=4 / 3)
+        except UploadRejected as e:
+            return reject_response(e)
             
         data = request.get_json()
         if not data:
@@ -1856,29 +2171,19 @@ def create_report():
         # Check if we need to save a base64 image (for real-time frames)
         if image_data and not image_filename:
             try:
-                import base64
                 print("🔍 Processing base64 image data for real-time frame...")
                 
-                # Handle data URL format (e.g., "data:image/jpeg;base64,/9j/4AAQSkZ...")
-                if ',' in image_data:
-                    # Extract the base64 part after the comma
-                    header, image_data = image_data.split(',', 1)
-                    print(f"🔍 Extracted base64 data from data URL, header: {header[:50]}...")
-                
-                # Decode base64 to image bytes
-                image_bytes = base64.b64decode(image_data)
-                print(f"🔍 Decoded base64 to {len(image_bytes)} bytes")
-                
-                # Generate unique filename and save to uploads folder
-                unique_filename = f"realtime_{uuid.uuid4()}.jpg"
-                file_path = os.path.join(UPLOAD_DIR, unique_filename)
-                
-                with open(file_path, 'wb') as f:
-                    f.write(image_bytes)
+                # Handles data URLs ("data:image/jpeg;base64,/9j/4AAQSkZ...") and decodes in
+                # chunks straight to a staging file, with the same cap/content check as /detect-frame
+                staged = stage_base64(image_data, 'frame')
+                print(f"🔍 Decoded base64 to {staged.size} bytes")
                 
-                image_filename = unique_filename
-                print(f"💾 Saved real-time frame as: {image_filename}")
+                # Content-addressed: the same frame already kept by /detect-frame is reused
+                image_filename, deduplicated = upload_store.put_staged(staged, 'jpg', 'realtime')
+                print(f"💾 Saved real-time frame as: {image_filename}{' (duplicate)' if deduplicated else ''}")
                 
+            except UploadRejected as e:
+                return reject_response(e)
             except Exception as e:
                 print(f"❌ Failed to save base64 image: {e}")
                 import traceback
@@ -2006,15 +2311,14 @@ def create_report():
             print(f"   - Contact: {sighting.user_contact}")
             print(f"   - Urgency: {sighting.urgency_level}")
         
+        # Unit of work: sighting and report are flushed and committed together.
+        # The report references the sighting object, so no ID round-trip or re-query is needed.
         db.session.add(sighting)
-        db.session.commit()
-        
-        print(f"✅ Sighting saved with COMPLETE detailed info: {sighting.species} (ID: {sighting.id})")
         
         # Create report record
         report = Report()
         report.user_id = int(user_id)
-        report.sighting_id = sighting.id
+        report.sighting = sighting
         
         # Set report title based on detection type
         if detection_type == 'realtime':
@@ -2082,7 +2386,7 @@ def create_report():
         db.session.add(report)
         db.session.commit()
         
-        print(f"✅ Report created with detailed data for sighting {sighting.id}")
+        print(f"✅ Sighting saved with COMPLETE detailed info: {sighting.species} (ID: {sighting.id})")
         print(f"✅ Manual report created: {sighting.species} (Sighting ID: {sighting.id}, Report ID: {report.id})")
         
         return jsonify({
@@ -2382,101 +2686,206 @@ def report_sighting():
         return jsonify({"error": str(e)}), 500
 
 # ================= ADMIN REPORT ROUTES =================
+def serialize_admin_report(report, user, sighting):
+    """One row of the admin report list (report + submitter + detection data)"""
+    report_data = {
+        'id': report.id,
+        'user_id': report.user_id,
+        'user_name': user.username,
+        'user_email': user.email,
+        'sighting_id': report.sighting_id,
+        'title': report.title,
+        'description': report.description,
+        'report_type': report.report_type,
+        'urgency': report.urgency,
+        'status': report.status,
+        'location_lat': report.location_lat,
+        'location_lng': report.location_lng,
+        'evidence_images': report.evidence_images or [],
+        'created_at': report.created_at.isoformat(),
+        'updated_at': report.updated_at.isoformat(),
+        'is_manual_report': report.sighting_id is None,
+        'detailed_sighting_data': report.detailed_sighting_data or {},
+        'admin_notes': report.admin_notes,
+        # ✅ FIXED: Include admin history
+        'admin_history': [history.to_dict() for history in report.admin_histories]
+    }
+
+    if sighting:
+        report_data.update({
+            'species': sighting.species,
+            'confidence': sighting.confidence,
+            'condition': sighting.condition,
+            'condition_confidence': sighting.condition_confidence,
+            'image_path': sighting.image_path,
+            'detection_type': sighting.detection_type,
+            'conservation_status': sighting.conservation_status,
+            'habitat': sighting.habitat,
+            'lifespan': sighting.lifespan,
+            'population': sighting.population,
+            'recommended_care': sighting.recommended_care,
+            'character_traits': sighting.character_traits,  # ADDED: Character traits
+            'sighting_date': sighting.sighting_date.isoformat() if sighting.sighting_date else None,
+            'specific_location': sighting.specific_location,
+            'number_of_animals': sighting.number_of_animals,
+            'behavior_observed': sighting.behavior_observed,
+            'observer_notes': sighting.observer_notes,
+            'user_contact': sighting.user_contact,
+            'urgency_level': sighting.urgency_level,
+            'detection_created_at': sighting.created_at.isoformat() if sighting.created_at else None
+        })
+    else:
+        report_data.update({
+            'species': 'Unknown Species',
+            'confidence': 0,
+            'condition': 'Unknown',
+            'condition_confidence': 0,
+            'image_path': None,
+            'detection_type': 'manual_report',
+            'conservation_status': None,
+            'habitat': None,
+            'lifespan': None,
+            'population': None,
+            'recommended_care': None,
+            'character_traits': None,  # ADDED: Character traits
+        })
+    
+    return report_data
+
+def apply_report_filters(query, filters):
+    """Push the /api/user-reports filters into SQL"""
+    if 'status' in filters:
+        query = query.filter(Report.status == filters['status'])
+    if 'urgency' in filters:
+        query = query.filter(Report.urgency == filters['urgency'])
+    if 'species' in filters:
+        query = query.filter(db.func.lower(Sighting.species) == filters['species'].lower())
+    if 'detection_type' in filters:
+        if filters['detection_type'] == 'manual_report':
+            query = query.filter(Report.sighting_id.is_(None))
+        else:
+            query = query.filter(Sighting.detection_type == filters['detection_type'])
+    if 'date_from' in filters:
+        query = query.filter(Report.created_at >= filters['date_from'])
+    if 'date_to' in filters:
+        query = query.filter(Report.created_at <= filters['date_to'])
+    return query
+
+def exclude_duplicate_reports(query):
+    """Drop duplicate submissions in SQL, keeping the newest copy.
+
+    A duplicate is a report by the same user with the same created_at and either the
+    same sighting species + detection_type or, for manual reports, the same title and
+    first 50 characters of the description. Doing this in the query (instead of after
+    fetching) keeps keyset pages full and collapses copies that straddle a page boundary.
+    """
+    other = aliased(Report)
+    other_sighting = aliased(Sighting)
+    same_content = db.or_(
+        db.and_(
+            Report.sighting_id.isnot(None),
+            other_sighting.species.is_not_distinct_from(Sighting.species),
+            other_sighting.detection_type.is_not_distinct_from(Sighting.detection_type)
+        ),
+        db.and_(
+            Report.sighting_id.is_(None),
+            other.sighting_id.is_(None),
+            other.title.is_not_distinct_from(Report.title),
+            db.func.substr(other.description, 1, 50) == db.func.substr(Report.description, 1, 50)
+        )
+    )
+    newer_copy = db.select(other.id)\
+        .outerjoin(other_sighting, other.sighting_id == other_sighting.id)\
+        .where(
+            other.user_id == Report.user_id,
+            other.created_at == Report.created_at,
+            other.id > Report.id,
+            same_content
+        )
+    return query.filter(~newer_copy.exists())
+
+def estimate_report_count(query, filters):
+    """Cheap total for the report list.
+
+    Unfiltered lists use InnoDB's table statistics (no scan); filtered lists
+    run a COUNT over the same indexed query the page uses.
+    """
+    if not filters and db.engine.dialect.name == 'mysql':
+        try:
+            estimate = db.session.execute(text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'report'"
+            )).scalar()
+            if estimate is not None:
+                return int(estimate), True
+        except Exception as e:
+            print(f"⚠️ Could not read report table statistics: {e}")
+    return query.order_by(None).count(), False
+
 @app.route('/api/user-reports', methods=['GET'])
 def get_all_user_reports():
+    """Admin report list, newest first.
+
+    Pass ?limit= and/or ?cursor= for keyset pages on (created_at, id); without them
+    the full filtered list is returned as before. Filters: status, urgency, species,
+    detection_type, date_from, date_to.
+    """
     try:
-        reports = db.session.query(Report, User, Sighting)\
+        try:
+            filters = parse_report_filters(request.args)
+            paginated = 'limit' in request.args or 'cursor' in request.args
+            limit = parse_limit(request.args.get('limit')) if paginated else None
+            cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        
+        base_query = db.session.query(Report, User, Sighting)\
             .join(User, Report.user_id == User.id)\
-            .outerjoin(Sighting, Report.sighting_id == Sighting.id)\
-            .order_by(Report.created_at.desc())\
-            .all()
+            .outerjoin(Sighting, Report.sighting_id == Sighting.id)
+        base_query = exclude_duplicate_reports(apply_report_filters(base_query, filters))
+        
+        query = base_query
+        if cursor:
+            cursor_created_at, cursor_id = cursor
+            query = query.filter(db.or_(
+                Report.created_at < cursor_created_at,
+                db.and_(Report.created_at == cursor_created_at, Report.id < cursor_id)
+            ))
+        # admin_history for the whole page in one extra SELECT ... IN instead of one per report
+        query = query.order_by(Report.created_at.desc(), Report.id.desc())\
+            .options(selectinload(Report.admin_histories))
+        
+        if paginated:
+            # One extra row tells us whether another page exists
+            rows = query.limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            rows = query.all()
+            has_more = False
         
-        seen_reports = set()
-        formatted_reports = []
+        formatted_reports = [serialize_admin_report(report, user, sighting) for report, user, sighting in rows]
         
-        for report, user, sighting in reports:
-            if sighting:
-                time_key = report.created_at.strftime('%Y-%m-%d %H:%M:%S') if report.created_at else 'unknown'
-                unique_key = f"{sighting.species}_{user.id}_{sighting.detection_type}_{time_key}"
-            else:
-                time_key = report.created_at.strftime('%Y-%m-%d %H:%M:%S') if report.created_at else 'unknown'
-                unique_key = f"{report.title}_{user.id}_{report.description[:50]}_{time_key}"
-            
-            if unique_key in seen_reports:
-                continue
-                
-            seen_reports.add(unique_key)
-            
-            report_data = {
-                'id': report.id,
-                'user_id': report.user_id,
-                'user_name': user.username,
-                'user_email': user.email,
-                'sighting_id': report.sighting_id,
-                'title': report.title,
-                'description': report.description,
-                'report_type': report.report_type,
-                'urgency': report.urgency,
-                'status': report.status,
-                'location_lat': report.location_lat,
-                'location_lng': report.location_lng,
-                'evidence_images': report.evidence_images or [],
-                'created_at': report.created_at.isoformat(),
-                'updated_at': report.updated_at.isoformat(),
-                'is_manual_report': report.sighting_id is None,
-                'detailed_sighting_data': report.detailed_sighting_data or {},
-                'admin_notes': report.admin_notes,
-                # ✅ FIXED: Include admin history
-                'admin_history': [history.to_dict() for history in report.admin_histories]
-            }
-            
-            if sighting:
-                report_data.update({
-                    'species': sighting.species,
-                    'confidence': sighting.confidence,
-                    'condition': sighting.condition,
-                    'condition_confidence': sighting.condition_confidence,
-                    'image_path': sighting.image_path,
-                    'detection_type': sighting.detection_type,
-                    'conservation_status': sighting.conservation_status,
-                    'habitat': sighting.habitat,
-                    'lifespan': sighting.lifespan,
-                    'population': sighting.population,
-                    'recommended_care': sighting.recommended_care,
-                    'character_traits': sighting.character_traits,  # ADDED: Character traits
-                    'sighting_date': sighting.sighting_date.isoformat() if sighting.sighting_date else None,
-                    'specific_location': sighting.specific_location,
-                    'number_of_animals': sighting.number_of_animals,
-                    'behavior_observed': sighting.behavior_observed,
-                    'observer_notes': sighting.observer_notes,
-                    'user_contact': sighting.user_contact,
-                    'urgency_level': sighting.urgency_level,
-                    'detection_created_at': sighting.created_at.isoformat() if sighting.created_at else None
-                })
-            else:
-                report_data.update({
-                    'species': 'Unknown Species',
-                    'confidence': 0,
-                    'condition': 'Unknown',
-                    'condition_confidence': 0,
-                    'image_path': None,
-                    'detection_type': 'manual_report',
-                    'conservation_status': None,
-                    'habitat': None,
-                    'lifespan': None,
-                    'population': None,
-                    'recommended_care': None,
-                    'character_traits': None,  # ADDED: Character traits
-                })
-            
-            formatted_reports.append(report_data)
+        response = {
+            'reports': formatted_reports,
+            'total': len(formatted_reports)
+        }
+        
+        if paginated:
+            last_report = rows[-1][0] if rows else None
+            total_estimate, from_statistics = estimate_report_count(base_query, filters)
+            response.update({
+                'limit': limit,
+                'has_more': has_more,
+                'next_cursor': encode_cursor(last_report.created_at, last_report.id) if has_more and last_report and last_report.created_at else None,
+                'total_estimate': total_estimate,
+                'total_is_estimate': from_statistics,
+                'filters': {key: value.isoformat() if isinstance(value, datetime) else value for key, value in filters.items()}
+            })
         
         print(f"✅ Filtered reports with detailed data: {len(formatted_reports)} unique reports")
         
-        return jsonify({
-            'reports': formatted_reports,
-            'total': len(formatted_reports)
-        })
+        return jsonify(response)
         
     except Exception as e:
         print(f"❌ Error in get_user_reports: {e}")
@@ -2576,10 +2985,12 @@ def update_report_admin(report_id):
                 action='status_update' if status else 'notes_update',
                 notes=action_notes or admin_notes,
                 previous_status=previous_status,
-                new_status=status
+                new_status=status,
+                commit=False
             )
         
         db.session.commit()
+        publish_report_status(report, previous_status)
         
         return jsonify({
             'success': True,
@@ -2620,6 +3031,65 @@ def get_all_sightings():
         return jsonify({'error': str(e)}), 500
 
 # ================= NOTIFICATION ROUTES =================
+def hydrate_notifications(notifications, include_users=False):
+    """Load the reports, sightings (and optionally users) behind a page of notifications.
+
+    One IN query per table instead of a Report/User lookup per row. The rows are
+    attached to the relationships with set_committed_value, so notification.report,
+    report.sighting and notification.user (and to_dict()) no longer touch the database.
+    """
+    report_ids = {n.report_id for n in notifications if n.report_id}
+    reports = {report.id: report for report in Report.query.filter(Report.id.in_(report_ids)).all()} if report_ids else {}
+    
+    sighting_ids = {r.sighting_id for r in reports.values() if r.sighting_id}
+    sightings = {sighting.id: sighting for sighting in Sighting.query.filter(Sighting.id.in_(sighting_ids)).all()} if sighting_ids else {}
+    
+    for report in reports.values():
+        set_committed_value(report, 'sighting', sightings.get(report.sighting_id))
+    for notification in notifications:
+        set_committed_value(notification, 'report', reports.get(notification.report_id))
+    
+    if include_users:
+        user_ids = {n.user_id for n in notifications if n.user_id}
+        users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
+        for notification in notifications:
+            set_committed_value(notification, 'user', users.get(notification.user_id))
+    
+    return notifications
+
+def paginate_notifications(query):
+    """Apply ?limit= / ?cursor= (older pages) and ?since= (only newer) to a notification query.
+
+    Without limit/cursor the full list is returned, as before. Returns (notifications, page_info).
+    """
+    since = parse_date(request.args.get('since'), 'since')
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    limit = parse_limit(request.args.get('limit')) if paginated else None
+    cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    
+    if since:
+        query = query.filter(UserNotification.created_at > since)
+    if cursor:
+        cursor_created_at, cursor_id = cursor
+        query = query.filter(db.or_(
+            UserNotification.created_at < cursor_created_at,
+            db.and_(UserNotification.created_at == cursor_created_at, UserNotification.id < cursor_id)
+        ))
+    query = query.order_by(UserNotification.created_at.desc(), UserNotification.id.desc())
+    
+    if not paginated:
+        return query.all(), {}
+    
+    notifications = query.limit(limit + 1).all()
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    last = notifications[-1] if notifications else None
+    return notifications, {
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_cursor(last.created_at, last.id) if has_more and last and last.created_at else None
+    }
+
 @app.route('/api/user/notifications', methods=['GET'])
 def get_user_notifications():
     try:
@@ -2637,15 +3107,19 @@ def get_user_notifications():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        notifications = UserNotification.query.filter_by(
-            user_id=user_id
-        ).order_by(UserNotification.created_at.desc()).all()
+        try:
+            notifications, page_info = paginate_notifications(
+                UserNotification.query.filter_by(user_id=user_id)
+            )
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        hydrate_notifications(notifications)
         
         notifications_data = []
         for notification in notifications:
             notification_data = notification.to_dict()
             
-            report = Report.query.get(notification.report_id)
+            report = notification.report
             if report and report.sighting:
                 sighting = report.sighting
                 notification_data.update({
@@ -2662,15 +3136,13 @@ def get_user_notifications():
             
             notifications_data.append(notification_data)
         
-        unread_count = UserNotification.query.filter_by(
-            user_id=user_id, 
-            is_read=False
-        ).count()
+        unread_count = get_unread_count(user)
         
         return jsonify({
             'notifications': notifications_data,
             'total': len(notifications_data),
-            'unread_count': unread_count
+            'unread_count': unread_count,
+            **page_info
         })
         
     except Exception as e:
@@ -2690,15 +3162,19 @@ def mark_notification_read(notification_id):
         except ValueError:
             return jsonify({'error': 'Invalid user ID'}), 400
         
-        notification = UserNotification.query.filter_by(
-            id=notification_id, 
-            user_id=user_id
-        ).first()
+        # Conditional update: of two concurrent requests only the one that flips is_read decrements
+        marked = UserNotification.query.filter_by(
+            id=notification_id,
+            user_id=user_id,
+            is_read=False
+        ).update({UserNotification.is_read: True}, synchronize_session=False)
         
-        if not notification:
+        if marked:
+            bump_unread_count(user_id, -1)
+        elif not db.session.query(
+            UserNotification.query.filter_by(id=notification_id, user_id=user_id).exists()
+        ).scalar():
             return jsonify({'error': 'Notification not found'}), 404
-        
-        notification.is_read = True
         db.session.commit()
         
         return jsonify({
@@ -2711,6 +3187,187 @@ def mark_notification_read(notification_id):
         print(f"❌ Error in mark_notification_read: {e}")
         return jsonify({'error': 'Failed to mark notification as read'}), 500
 
+@app.route('/api/user/notifications/feed', methods=['GET'])
+def get_notification_feed():
+    """Delta sync for notification polling.
+
+    ?since_id= (or ?since= ISO timestamp) returns only notifications created after
+    the client's last poll, oldest first; pass the returned last_id on the next poll.
+    Without a cursor the newest ?limit= notifications are returned to seed the client.
+    unread_count comes from the per-user counter, so a poll costs O(new items).
+    """
+    try:
+        user_id = request.args.get('user_id')
+        
+        if not user_id:
+            return jsonify({'error': 'User ID is required'}), 400
+        
+        try:
+            since = parse_date(request.args.get('since'), 'since')
+            limit = parse_limit(request.args.get('limit'))
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            user_id = int(user_id)
+            since_id = int(request.args['since_id']) if request.args.get('since_id') else None
+        except ValueError:
+            return jsonify({'error': 'Invalid user ID or since_id'}), 400
+        
+        user = User.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        query = UserNotification.query.filter_by(user_id=user_id)
+        if since_id is not None:
+            query = query.filter(UserNotification.id > since_id)
+        if since:
+            query = query.filter(UserNotification.created_at > since)
+        
+        if since_id is None and since is None:
+            # Initial sync: newest page, returned oldest first like every other feed response
+            notifications = query.order_by(UserNotification.id.desc()).limit(limit).all()[::-1]
+            has_more = False
+        else:
+            notifications = query.order_by(UserNotification.id.asc()).limit(limit + 1).all()
+            has_more = len(notifications) > limit
+            notifications = notifications[:limit]
+        
+        hydrate_notifications(notifications)
+        
+        return jsonify({
+            'notifications': [notification.to_dict() for notification in notifications],
+            'count': len(notifications),
+            'last_id': notifications[-1].id if notifications else since_id,
+            'has_more': has_more,
+            'unread_count': get_unread_count(user)
+        })
+        
+    except Exception as e:
+        print(f"❌ Error in get_notification_feed: {e}")
+        return jsonify({'error': 'Failed to fetch notification feed'}), 500
+
+@app.route('/api/user/<int:user_id>/events', methods=['GET'])
+def stream_user_events(user_id):
+    """Server-Sent Events stream of new notifications and report status changes.
+
+    Event types: notification (id: = notification id), report_status, resync.
+    On reconnect the browser sends Last-Event-ID and any notifications created in
+    between are replayed from the database first. resync means events were dropped
+    for a slow client - refetch /api/user/notifications/feed.
+    """
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    missed = []
+    if last_event_id and last_event_id.isdigit():
+        missed = UserNotification.query.filter(
+            UserNotification.user_id == user_id,
+            UserNotification.id > int(last_event_id)
+        ).order_by(UserNotification.id.asc()).limit(100).all()
+        hydrate_notifications(missed)
+        missed = [notification.to_dict() for notification in missed]
+    
+    # Subscribe before the replay is sent so nothing published in between is lost
+    subscription = event_bus.subscribe(f"user:{user_id}")
+    # Release the DB connection; the stream can stay open for minutes
+    db.session.remove()
+    
+    def format_event(event_type, data, event_id=None):
+        lines = [f"event: {event_type}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"data: {json.dumps(data, default=str)}")
+        return "\n".join(lines) + "\n\n"
+    
+    def generate():
+        started = time.monotonic()
+        try:
+            yield "retry: 5000\n\n"
+            for notification in missed:
+                yield format_event('notification', notification, notification['id'])
+            
+            while True:
+                remaining = SSE_MAX_STREAM_SECONDS - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                event = subscription.get(timeout=min(SSE_HEARTBEAT_SECONDS, remaining))
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield format_event('resync', {'reason': 'events dropped'})
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                event_id = event['data'].get('id') if event['type'] == 'notification' else None
+                yield format_event(event['type'], event['data'], event_id)
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/mail-queue/stats', methods=['GET'])
+def get_mail_queue_stats():
+    return jsonify({'enabled': MAIL_QUEUE_ENABLED, **mail_queue.stats()})
+
+@app.route('/api/events/stats', methods=['GET'])
+def get_event_stats():
+    return jsonify(event_bus.stats())
+
+# ================= UPLOAD RETENTION =================
+def referenced_uploads(names):
+    """The subset of upload names still shown somewhere: Sighting.image_path, Report.evidence_images,
+    or the image_path / evidence_images snapshot in UserNotification.report_data"""
+    wanted = set(names)
+    in_use = {path for (path,) in db.session.query(Sighting.image_path).filter(Sighting.image_path.in_(wanted))}
+    # JSON columns: match their text, then confirm on the decoded value
+    evidence_text = db.cast(Report.evidence_images, db.Text)
+    reports = db.session.query(Report.evidence_images).filter(
+        db.or_(*[evidence_text.contains(name, autoescape=True) for name in wanted])
+    )
+    for (images,) in reports:
+        images = images if isinstance(images, list) else [images]
+        in_use.update(name for name in images if name in wanted)
+    # Notification history keeps its own copy, which outlives the report and sighting
+    snapshot_text = db.cast(UserNotification.report_data, db.Text)
+    snapshots = db.session.query(UserNotification.report_data).filter(
+        db.or_(*[snapshot_text.contains(name, autoescape=True) for name in wanted])
+    )
+    for (snapshot,) in snapshots:
+        if not isinstance(snapshot, dict):
+            continue
+        images = [snapshot.get('image_path'), *(snapshot.get('evidence_images') or [])]
+        in_use.update(name for name in images if name in wanted)
+    return in_use
+
+# Deletes uploads nothing references once idle for UPLOAD_RETENTION_GRACE_HOURS
+# (only reports them until UPLOAD_RETENTION_DRY_RUN=false)
+upload_sweeper = upload_sweeper_from_env(upload_store, referenced_uploads, app_context=app.app_context)
+
+@app.route('/api/uploads/retention', methods=['GET'])
+def get_upload_retention_stats():
+    try:
+        return jsonify({'sweeper': upload_sweeper.stats(), 'store': upload_store.stats()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/uploads/retention/run', methods=['POST'])
+def run_upload_retention():
+    """Run one sweep now; ?dry_run=true lists what would be deleted without deleting it.
+    Without the parameter the sweeper's mode (UPLOAD_RETENTION_DRY_RUN) applies."""
+    try:
+        dry_run = request.args.get('dry_run')
+        dry_run = dry_run.lower() in ('1', 'true', 'yes') if dry_run is not None else None
+        return jsonify(upload_sweeper.run_once(dry_run=dry_run))
+    except Exception as e:
+        print(f"❌ Upload retention run failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/user/<int:user_id>/notifications', methods=['GET'])
 def get_user_notifications_by_id(user_id):
     try:
@@ -2718,15 +3375,19 @@ def get_user_notifications_by_id(user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        notifications = UserNotification.query.filter_by(
-            user_id=user_id
-        ).order_by(UserNotification.created_at.desc()).all()
+        try:
+            notifications, page_info = paginate_notifications(
+                UserNotification.query.filter_by(user_id=user_id)
+            )
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        hydrate_notifications(notifications)
         
         notifications_data = []
         for notification in notifications:
             notification_data = notification.to_dict()
             
-            report = Report.query.get(notification.report_id)
+            report = notification.report
             if report:
                 if report.sighting:
                     sighting = report.sighting
@@ -2756,15 +3417,13 @@ def get_user_notifications_by_id(user_id):
             
             notifications_data.append(notification_data)
         
-        unread_count = UserNotification.query.filter_by(
-            user_id=user_id, 
-            is_read=False
-        ).count()
+        unread_count = get_unread_count(user)
         
         return jsonify({
             'notifications': notifications_data,
             'total': len(notifications_data),
-            'unread_count': unread_count
+            'unread_count': unread_count,
+            **page_info
         })
         
     except Exception as e:
@@ -2784,10 +3443,12 @@ def mark_all_notifications_read():
         except ValueError:
             return jsonify({'error': 'Invalid user ID'}), 400
         
-        UserNotification.query.filter_by(
+        marked = UserNotification.query.filter_by(
             user_id=user_id,
             is_read=False
         ).update({'is_read': True})
+        # Subtract what was marked rather than resetting to 0, which could drop a concurrent bump
+        bump_unread_count(user_id, -marked)
         
         db.session.commit()
         
@@ -2831,14 +3492,20 @@ def update_report_status_only(report_id):
             action='status_update',
             notes=f"Status changed from {previous_status} to {new_status}",
             previous_status=previous_status,
-            new_status=new_status
+            new_status=new_status,
+            commit=False
         )
         
         # Send auto-notification if status changed
+        notification = None
         if previous_status != new_status:
-            create_auto_notification(report_id, status_change=True)
+            notification = create_auto_notification(report_id, status_change=True, commit=False)
         
+        # Report, history and notification land in one commit
         db.session.commit()
+        if notification:
+            publish_notification(notification)
+        publish_report_status(report, previous_status)
         
         return jsonify({
             'success': True,
@@ -2864,8 +3531,10 @@ def get_user_reports_api(user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get reports for this user with admin history
-        user_reports = Report.query.filter_by(user_id=user_id).all()
+        # Get reports for this user with admin history and sighting preloaded
+        user_reports = Report.query\
+            .options(joinedload(Report.sighting), selectinload(Report.admin_histories))\
+            .filter_by(user_id=user_id).all()
         
         formatted_reports = []
         
@@ -2981,7 +3650,7 @@ def notify_user(report_id):
         report_status = data.get('status')
         
         # Get report details for email
-        report_details = ""
+        report_details = []
         if report.sighting:
             sighting = report.sighting
             details = []
@@ -2996,13 +3665,13 @@ def notify_user(report_id):
             if sighting.character_traits:
                 details.append(f"Character Traits: {sighting.character_traits}")
             
-            if details:
-                report_details = "<br>".join(details)
+            # Escaped and <br>-joined by the email template
+            report_details = details
         
-        # ✅ FIXED: Send email notification FIRST
-        email_sent = False
+        # Build the email now; it is queued once the notification row is committed
+        email_msg = None
         try:
-            email_sent = send_admin_update_email(
+            email_msg = build_admin_update_email(
                 user_email=user_email,
                 user_name=user_name,
                 report_species=report_species,
@@ -3010,9 +3679,8 @@ def notify_user(report_id):
                 report_status=report_status,
                 report_details=report_details
             )
-            print(f"✅ Email sending attempt completed: {'Success' if email_sent else 'Failed'}")
         except Exception as email_error:
-            print(f"⚠️ Email sending error (will continue with app notification): {email_error}")
+            print(f"⚠️ Could not build email (will continue with app notification): {email_error}")
         
         # ✅ FIXED: Get COMPLETE sighting data including detailed information
         sighting_data = {}
@@ -3063,26 +3731,33 @@ def notify_user(report_id):
             report_data=sighting_data
         )
         
-        # Add email tracking fields if they exist
-        if hasattr(notification, 'email_sent'):
-            notification.email_sent = email_sent
-        if hasattr(notification, 'email_error') and not email_sent:
-            notification.email_error = "Email sending failed"
+        # email_sent / email_error are written back by the mail worker
+        notification.email_sent = False
+        if email_msg is None:
+            notification.email_error = "Email could not be built"
         
         # ✅ FIXED: Also update the report with admin notes
         if data.get('admin_notes'):
             report.admin_notes = data.get('admin_notes')
         
+        previous_status = report.status
         if data.get('status'):
             report.status = data.get('status')
         
         report.updated_at = datetime.utcnow()
         
         db.session.add(notification)
+        bump_unread_count(user_id, 1)
         db.session.commit()
+        publish_notification(notification)
+        publish_report_status(report, previous_status)
+        
+        email_queued = False
+        if email_msg is not None:
+            email_queued = deliver_email(email_msg, on_result=record_notification_email(notification.id))
         
         print(f"✅ Notification processed for user {user_name} (ID: {user_id})")
-        print(f"✅ Email sent: {email_sent}")
+        print(f"✅ Email {'queued' if MAIL_QUEUE_ENABLED else 'sent'}: {email_queued}")
         print(f"✅ App notification created: {notification.id}")
         
         return jsonify({
@@ -3090,7 +3765,9 @@ def notify_user(report_id):
             'message': 'Notification sent to user',
             'notification_id': notification.id,
             'species': sighting_data['species'],
-            'email_sent': email_sent,
+            # With the queue on, delivery is confirmed later via the notification's email_sent
+            'email_sent': email_queued and not MAIL_QUEUE_ENABLED,
+            'email_queued': email_queued and MAIL_QUEUE_ENABLED,
             'user_notified': user_name,
             'user_email': user_email
         })
@@ -3107,24 +3784,25 @@ def get_admin_notifications():
     try:
         report_id = request.args.get('report_id')
         
+        notifications_query = UserNotification.query
         if report_id:
-            notifications = UserNotification.query.filter_by(
-                report_id=report_id
-            ).order_by(UserNotification.created_at.desc()).all()
-        else:
-            notifications = UserNotification.query.order_by(
-                UserNotification.created_at.desc()
-            ).all()
+            notifications_query = notifications_query.filter_by(report_id=report_id)
+        
+        try:
+            notifications, page_info = paginate_notifications(notifications_query)
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        hydrate_notifications(notifications, include_users=True)
         
         notifications_data = []
         for notification in notifications:
             notification_dict = notification.to_dict()
             
-            user = User.query.get(notification.user_id)
+            user = notification.user
             notification_dict['user_name'] = user.username if user else 'Unknown User'
             notification_dict['user_email'] = user.email if user else 'Unknown Email'
             
-            report = Report.query.get(notification.report_id)
+            report = notification.report
             if report:
                 if report.sighting:
                     sighting = report.sighting
@@ -3145,7 +3823,8 @@ def get_admin_notifications():
         return jsonify({
             'notifications': notifications_data,
             'total': len(notifications_data),
-            'filtered_by_report': report_id is not None
+            'filtered_by_report': report_id is not None,
+            **page_info
         })
         
     except Exception as e:
@@ -3180,6 +3859,7 @@ def get_notification_stats():
         return jsonify({'error': 'Failed to fetch notification stats'}), 500
     
 @app.route('/test-condition-detection', methods=['POST'])
+@streamed_upload('image')
 def test_condition_detection():
     """Test endpoint for condition detection"""
     try:
@@ -3193,7 +3873,7 @@ def test_condition_detection():
         # Save temporary file
         temp_filename = f"test_condition_{uuid.uuid4()}.jpg"
         temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-        file.save(temp_path)
+        commit_upload(file, temp_path)
         
         # Analyze condition
         result = analyze_condition(temp_path)
@@ -3481,13 +4161,18 @@ def update_report_status(report_id):
                 action='status_change',
                 notes=notes or f"Status changed from {old_status} to {new_status}",
                 previous_status=old_status,
-                new_status=new_status
+                new_status=new_status,
+                commit=False
             )
         
+        notification = None
         if old_status != new_status:
-            create_auto_notification(report_id, status_change=True)
+            notification = create_auto_notification(report_id, status_change=True, commit=False)
         
         db.session.commit()
+        if notification:
+            publish_notification(notification)
+        publish_report_status(report, old_status)
         
         return jsonify({
             'message': 'Report status updated successfully',
@@ -3499,6 +4184,171 @@ def update_report_status(report_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Upper bound on report IDs per bulk request (one transaction holds row locks on all of them)
+BULK_REPORT_LIMIT = int(os.getenv('BULK_REPORT_LIMIT', 500))
+
+@app.route('/api/reports/bulk-status', methods=['POST'])
+def bulk_update_report_status():
+    """Change the status of many reports in one transaction.
+
+    Body: {report_ids: [...], status, admin_name?, notes?, notify? (default true),
+    send_email? (default false), message? (email text, defaults to the auto-notification)}.
+    AdminHistory and UserNotification rows are bulk-inserted; emails are delivered after commit
+    (email_sent / email_queued per report, as in notify_user). Each report gets an outcome:
+    updated, unchanged or not_found.
+    """
+    try:
+        data = request.get_json() or {}
+        new_status = data.get('status')
+        admin_name = data.get('admin_name', 'Admin')
+        notes = data.get('notes')
+        notify = data.get('notify', True)
+        send_email = data.get('send_email', False)
+        
+        if not new_status:
+            return jsonify({'error': 'Status is required'}), 400
+        
+        try:
+            report_ids = list(dict.fromkeys(int(report_id) for report_id in data.get('report_ids') or []))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'report_ids must be a list of integers'}), 400
+        if not report_ids:
+            return jsonify({'error': 'report_ids is required'}), 400
+        if len(report_ids) > BULK_REPORT_LIMIT:
+            return jsonify({'error': f'At most {BULK_REPORT_LIMIT} reports per request'}), 400
+        
+        # One locked read for every report, with the sighting (for messages) and user (for emails)
+        reports = {
+            report.id: report for report in Report.query.options(
+                joinedload(Report.sighting), joinedload(Report.user)
+            ).filter(Report.id.in_(report_ids)).with_for_update().all()
+        }
+        
+        now = datetime.utcnow()
+        results = []
+        histories = []
+        notifications = []
+        changed = []
+        unread_increments = {}
+        
+        for report_id in report_ids:
+            report = reports.get(report_id)
+            if not report:
+                results.append({'report_id': report_id, 'outcome': 'not_found'})
+                continue
+            
+            previous_status = report.status
+            if previous_status == new_status:
+                results.append({'report_id': report_id, 'outcome': 'unchanged', 'status': new_status})
+                continue
+            
+            report.status = new_status
+            report.updated_at = now
+            changed.append((report, previous_status))
+            results.append({
+                'report_id': report_id,
+                'outcome': 'updated',
+                'previous_status': previous_status,
+                'status': new_status
+            })
+            
+            histories.append({
+                'report_id': report_id,
+                'admin_name': admin_name,
+                'action': 'bulk_status_change',
+                'notes': notes or f"Status changed from {previous_status} to {new_status}",
+                'previous_status': previous_status,
+                'new_status': new_status,
+                'created_at': now
+            })
+            
+            if notify:
+                notification = UserNotification(
+                    user_id=report.user_id,
+                    report_id=report_id,
+                    message=auto_notification_message(report, status_change=True),
+                    status=new_status,
+                    admin_notes=notes
+                )
+                notification.created_at = now
+                notification.is_read = False
+                notification.email_sent = False
+                # Already loaded with the report; to_dict() below needs no query
+                set_committed_value(notification, 'report', report)
+                notifications.append(notification)
+                unread_increments[report.user_id] = unread_increments.get(report.user_id, 0) + 1
+        
+        if histories:
+            db.session.bulk_insert_mappings(AdminHistory, histories)
+        if notifications:
+            db.session.add_all(notifications)
+            for user_id, count in unread_increments.items():
+                bump_unread_count(user_id, count)
+            # Assigns the new notification ids before commit
+            db.session.flush()
+        
+        # Everything published or emailed after commit is read now: commit expires the
+        # loaded rows, and touching them afterwards would cost a refresh SELECT per report
+        status_events = [
+            (report.user_id, report_status_event(report, previous_status))
+            for report, previous_status in changed
+        ]
+        created = [{
+            'id': notification.id,
+            'report_id': notification.report_id,
+            'payload': notification.to_dict(),
+            'email': notification.report.user.email,
+            'context': {
+                'user_name': notification.report.user.username,
+                'report_species': notification.report.sighting.species if notification.report.sighting else 'Reported Wildlife',
+                'admin_message': data.get('message') or notification.message,
+                'report_status': new_status,
+                'report_details': None
+            }
+        } for notification in notifications]
+        
+        db.session.commit()
+        print(f"✅ Bulk status update to '{new_status}': {len(changed)} of {len(report_ids)} reports changed")
+        
+        for user_id, event in status_events:
+            publish_event(user_id, 'report_status', event)
+        for notification in created:
+            publish_event(notification['payload']['user_id'], 'notification', notification['payload'])
+        
+        if send_email and created:
+            rendered_emails = render_bulk('admin_update', [notification['context'] for notification in created])
+            for notification, rendered in zip(created, rendered_emails):
+                # True = queued (or, with MAIL_QUEUE_ENABLED=false, actually sent inline)
+                notification['email_delivered'] = deliver_email(
+                    message_from_rendered(rendered, [notification['email']]),
+                    on_result=record_notification_email(notification['id'])
+                )
+        
+        created_by_report = {notification['report_id']: notification for notification in created}
+        for result in results:
+            notification = created_by_report.get(result['report_id'])
+            if result['outcome'] == 'updated':
+                result['notification_id'] = notification['id'] if notification else None
+                delivered = bool(notification and notification.get('email_delivered'))
+                result['email_sent'] = delivered and not MAIL_QUEUE_ENABLED
+                result['email_queued'] = delivered and MAIL_QUEUE_ENABLED
+        
+        summary = {}
+        for result in results:
+            summary[result['outcome']] = summary.get(result['outcome'], 0) + 1
+        
+        return jsonify({
+            'success': True,
+            'status': new_status,
+            'summary': summary,
+            'results': results
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error in bulk_update_report_status: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/reports/submit', methods=['POST'])
 def submit_report():
     try:
@@ -3543,19 +4393,33 @@ def submit_report():
 
 @app.route('/debug-condition-model', methods=['GET'])
 def debug_condition_model():
-    """Debug endpoint to check condition model status"""
+    """Debug endpoint to check condition model status (does not trigger a load)"""
     try:
+        condition_model = condition_model_resource.peek()
         return jsonify({
             "condition_model_loaded": condition_model is not None,
+            "condition_backend": condition_model.backend_name if condition_model else None,
+            "condition_state": condition_model_resource.to_dict(),
             "condition_model_path": CONDITION_MODEL_PATH,
             "file_exists": os.path.exists(CONDITION_MODEL_PATH),
-            "tensorflow_version": tf.__version__,
+            "onnx_model_path": CONDITION_ONNX_PATH,
+            "onnx_file_exists": os.path.exists(CONDITION_ONNX_PATH),
+            "tensorflow_version": tf.__version__ if tf else None,
+            "batching": condition_batcher.stats(),
             "model_input_shape": str(condition_model.input_shape) if condition_model else "None",
             "model_output_shape": str(condition_model.output_shape) if condition_model else "None"
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/debug-models', methods=['GET'])
+def debug_models():
+    """Debug endpoint to check YOLO session reuse (warm hits vs reloads)"""
+    try:
+        return jsonify(model_registry.stats())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/reports/stats', methods=['GET'])
 def get_report_stats():
     try:
@@ -3599,6 +4463,7 @@ def delete_sighting(sighting_id):
         if report:
             # Delete notifications for this report first
             UserNotification.query.filter_by(report_id=report.id).delete()
+            invalidate_unread_count(report.user_id)
             db.session.delete(report)
         
         db.session.delete(sighting)
@@ -3627,6 +4492,7 @@ def delete_report(report_id):
         
         # Delete notifications for this report first
         UserNotification.query.filter_by(report_id=report_id).delete()
+        invalidate_unread_count(report.user_id)
         
         db.session.delete(report)
         db.session.commit()
@@ -3669,6 +4535,15 @@ def get_animal_info_endpoint(species_name):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/admin/animal-data/reload', methods=['POST'])
+def reload_animal_data_endpoint():
+    try:
+        stats = reload_animal_data()
+        return jsonify({'success': True, 'message': 'Animal data reloaded', 'index': stats})
+    except Exception as e:
+        print(f"❌ Error reloading animal data: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # ================= DEBUG ENDPOINTS =================
 @app.route('/api/debug-report/<int:report_id>', methods=['GET'])
 def debug_report(report_id):
@@ -3741,13 +4616,29 @@ def debug_animal_info(species_name):
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    models_loaded = len(models) > 0 and condition_model is not None
+    # Per-model readiness; nothing here triggers a load
+    models = model_registry.readiness()
+    models['condition'] = condition_model_resource.to_dict()
+    models_loaded = all(info['ready'] for info in models.values())
     animal_data_loaded = animal_data_df is not None
     
+    if any(info['state'] == 'failed' for info in models.values()):
+        status, message = "degraded", "Some models failed to load"
+    elif models_loaded:
+        status, message = "healthy", "All systems ready!"
+    elif not warmup.done:
+        status, message = "warming_up", "Models are loading in the background"
+    else:
+        status, message = "healthy", "Models load on first use"
+    
     return jsonify({
-        "status": "healthy" if models_loaded else "degraded",
-        "message": "All systems ready!" if models_loaded else "Some models failed to load",
+        "status": status,
+        "message": message,
         "models_loaded": models_loaded,
+        "models": models,
+        "database": database_ready.to_dict(),
+        "warmup": warmup.to_dict(),
+        "startup": STARTUP,
         "animal_data_loaded": animal_data_loaded,
         "animal_entries": len(animal_data_df) if animal_data_df is not None else 0,
         "endpoints_available": [
@@ -3762,6 +4653,12 @@ def health_check():
         ]
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """200 once startup warmup has finished (for load balancer / orchestrator readiness probes), else 503"""
+    ready = warmup.done and database_ready.ready
+    return jsonify({"ready": ready, "warmup": warmup.to_dict()}), 200 if ready else 503
+
 # ================= DEBUG DATABASE SCHEMA =================
 @app.route('/api/debug-db-schema', methods=['GET'])
 def debug_db_schema():
@@ -420,13 +420,14 @@ function SlideOverPanel({
   };
 
   // ✅ FIXED: Use dynamic API URL instead of hardcoded one
-  const getMediaUrl = (filename: string | null) => {
+  // width asks the backend for a resized, cached copy (images only)
+  const getMediaUrl = (filename: string | null, width?: number) => {
     if (!filename) return null;
     if (filename.startsWith('http')) return filename;
     
     // Use currentAPI if available, otherwise fallback to the first API URL
     const baseUrl = currentAPI || API_URLS[0];
-    return `${baseUrl}/api/uploaded-images/${filename}`;
+    return `${baseUrl}/api/uploaded-images/${filename}${width ? `?width=${width}` : ''}`;
   };
 
   const isVideoFile = (filename: string | null) => {
@@ -515,7 +516,7 @@ function SlideOverPanel({
                     />
                   ) : (
                     <ImageWithFallback 
-                      src={getMediaUrl(report.image_path)!}
+                      src={getMediaUrl(report.image_path, 640)!}
                       alt={`Detection of ${report.species}`}
                       className="w-full h-48 object-cover rounded-md"
                     />
@@ -960,7 +961,7 @@ export default function UserReports() {
       setSelectedReportForNotification(null);
       
       // Show success message with email status
-      const emailStatus = responseData.email_sent ? 'Email and ' : '';
+      const emailStatus = (responseData.email_sent || responseData.email_queued) ? 'Email and ' : '';
       alert(`${emailStatus}Notification sent successfully!`);
     } else {
       console.error('❌ Notification failed:', responseData);
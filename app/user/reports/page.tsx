@@ -387,6 +387,13 @@ export default function UserReportsHistory() {
     return `${API_BASE_URL}/api/uploaded-images/${filename}`;
   };
 
+  // Card previews only need a small image - the backend resizes and caches it
+  const getThumbnailUrl = (filename: string | null, width = 480) => {
+    const url = getMediaUrl(filename);
+    if (!url || !url.includes('/api/uploaded-images/')) return url;
+    return `${url}?width=${width}`;
+  };
+
   // ✅ FIXED: Improved video file detection
   const isVideoFile = (filename: string | null) => {
     if (!filename) return false;
@@ -1144,7 +1151,7 @@ export default function UserReportsHistory() {
           return (
             <div className="relative group">
               <ImageWithFallback 
-                src={mediaUrl}
+                src={getThumbnailUrl(firstEvidence) || mediaUrl}
                 alt={`Evidence of ${sighting.species}`}
                 className="w-full h-40 object-cover rounded-xl group-hover:scale-105 transition-transform duration-300"
               />
@@ -1182,7 +1189,7 @@ export default function UserReportsHistory() {
       return (
         <div className="relative group">
           <ImageWithFallback 
-            src={mediaUrl}
+            src={getThumbnailUrl(mediaPath) || mediaUrl}
             alt={`Detection of ${sighting.species}`}
             className="w-full h-40 object-cover rounded-xl group-hover:scale-105 transition-transform duration-300"
           />
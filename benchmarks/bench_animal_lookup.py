@@ -0,0 +1,79 @@
+# bench_animal_lookup.py
+# Compare the old pandas-scan get_animal_info with the precompiled AnimalInfoIndex.
+#
+# Usage:
+#   python benchmarks/bench_animal_lookup.py [--rounds 200]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from animal_index import AnimalInfoIndex, COLUMN_MAPPING, NAME_COLUMNS  # noqa: E402
+
+ANIMAL_DATA_PATH = os.path.join(BASE_DIR, "animal_data.csv")
+
+
+def legacy_get_animal_info(animal_data_df, species_name):
+    """The previous implementation: fillna + lower() scan over the DataFrame per call"""
+    found_data = None
+    for col in NAME_COLUMNS:
+        if col in animal_data_df.columns:
+            animal_data_df[col] = animal_data_df[col].fillna('')
+            match = animal_data_df[animal_data_df[col].str.lower() == species_name.lower()]
+            if not match.empty:
+                found_data = match.iloc[0].to_dict()
+                break
+
+    if not found_data:
+        return None
+
+    clean_data = {}
+    for original_key, value in found_data.items():
+        if value is not None and not (isinstance(value, float) and np.isnan(value)) and original_key in COLUMN_MAPPING:
+            clean_data[COLUMN_MAPPING[original_key]] = value
+    return clean_data or None
+
+
+def time_lookups(fn, names, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            fn(name)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(names)) * 1e6  # microseconds per lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Species info lookup benchmark")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    df = pd.read_csv(ANIMAL_DATA_PATH)
+    index = AnimalInfoIndex()
+    index.load_dataframe(df.copy(), source=ANIMAL_DATA_PATH)
+
+    hits = df['animal_type'].dropna().tolist()
+    names = hits + [name.upper() for name in hits] + ["Unknown Species", "Not A Real Animal"]
+
+    # Same answers before comparing speed
+    mismatches = [n for n in names if legacy_get_animal_info(df, n) != index.get(n)]
+    print(f"{'✅' if not mismatches else '❌'} Results match on {len(names) - len(mismatches)}/{len(names)} names")
+    for name in mismatches[:5]:
+        print(f"   mismatch: {name}")
+
+    print(f"🧪 {len(names)} names x {args.rounds} rounds")
+    legacy_us = time_lookups(lambda n: legacy_get_animal_info(df, n), names, max(1, args.rounds // 20))
+    index_us = time_lookups(index.get, names, args.rounds)
+    print(f"   pandas scan  {legacy_us:10.2f} µs/lookup")
+    print(f"   index        {index_us:10.2f} µs/lookup")
+    print(f"✅ Index lookup is {legacy_us / index_us:.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# bench_email_render.py
+# Compare the old per-call f-string email HTML with the precompiled email_templates renderer.
+#
+# Usage:
+#   python benchmarks/bench_email_render.py [--count 500] [--rounds 5]
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from email_templates import render_bulk, render_email  # noqa: E402
+
+
+def legacy_admin_update_html(user_name, report_species, admin_message, report_status=None, report_details=None):
+    """The previous send_admin_update_email HTML assembly (no escaping)"""
+    admin_message_html = admin_message.replace('\n', '<br>')
+    return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                .header {{ background: linear-gradient(135deg, #4CAF50, #2E7D32); color: white; padding: 30px; text-align: center; }}
+                .content {{ padding: 30px; }}
+                .message-box {{ background-color: #f9f9f9; border-left: 4px solid #4CAF50; padding: 20px; margin: 20px 0; }}
+                .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; color: #666; font-size: 12px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>🐾 AnimalCare+ Report Update</h1>
+                </div>
+                <div class="content">
+                    <h2>Hello {user_name},</h2>
+                    <p>Your wildlife report has been updated by our admin team.</p>
+                    <h3 style="color: #2E7D32;">Report: {report_species}</h3>
+                    {f"<p><strong>Status:</strong> {report_status.replace('_', ' ').title()}</p>" if report_status else ""}
+                    <div class="message-box">
+                        <h4 style="margin-top: 0; color: #2E7D32;">Admin Message:</h4>
+                        <p>{admin_message_html}</p>
+                    </div>
+                    {f'<p><strong>Details:</strong><br>{report_details}</p>' if report_details else ''}
+                    <p>You can view your report and check for updates by logging into your AnimalCare+ dashboard.</p>
+                    <p>Thank you for helping protect wildlife!</p>
+                </div>
+                <div class="footer">
+                    <p>This is an automated message from AnimalCare+ Wildlife Monitoring System.</p>
+                    <p>📍 Wildlife Conservation Center | 🌍 Protecting Endangered Species</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+
+def make_contexts(count):
+    return [{
+        'user_name': f"user{i}",
+        'report_species': "Philippine Eagle",
+        'admin_message': f"Your report #{i} has been resolved.\nThe rescue team reached the site.",
+        'report_status': 'resolved',
+        'report_details': ["Condition: Injured", "Detection Type: image", f"Location: Site {i} & trail"],
+    } for i in range(count)]
+
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email template render benchmark")
+    parser.add_argument("--count", type=int, default=500, help="emails per round (e.g. a batch of resolved reports)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    contexts = make_contexts(args.count)
+    legacy_contexts = [dict(c, report_details="<br>".join(c['report_details'])) for c in contexts]
+
+    print(f"🧪 Rendering {args.count} admin update emails x {args.rounds} rounds")
+    legacy_best, _ = best_of(args.rounds, lambda: [legacy_admin_update_html(**c) for c in legacy_contexts])
+    single_best, _ = best_of(args.rounds, lambda: [render_email('admin_update', **c) for c in contexts])
+    bulk_best, _ = best_of(args.rounds, lambda: render_bulk('admin_update', contexts))
+
+    per_email = lambda total: total / args.count * 1e6  # noqa: E731
+    # The f-string baseline builds the HTML part only and escapes nothing
+    print(f"   legacy f-string, html only       {per_email(legacy_best):8.1f} µs/email")
+    print(f"   render_email, subject+html+text  {per_email(single_best):8.1f} µs/email")
+    print(f"   render_bulk, subject+html+text   {per_email(bulk_best):8.1f} µs/email")
+    print(f"   {args.count} emails via render_bulk: {bulk_best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
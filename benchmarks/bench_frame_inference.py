@@ -0,0 +1,103 @@
+# bench_frame_inference.py
+# Compare per-frame YOLO latency of the two process_frame modes (FRAME_INFERENCE_MODE):
+# temp-JPEG disk round-trip vs the in-memory letterboxed tensor from frame_preprocess.
+#
+# Usage:
+#   python benchmarks/bench_frame_inference.py [image_or_video] [--runs 30]
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from frame_preprocess import prepare_image  # noqa: E402
+
+MODEL_DIR = os.path.join(BASE_DIR, "public", "models", "onnx_models")
+DEFAULT_SOURCE = os.path.join(BASE_DIR, "api-tests", "test.jpg")
+
+
+def load_frames(source, limit):
+    """Load up to `limit` BGR frames from an image or a video file"""
+    frame = cv2.imread(source)
+    if frame is not None:
+        return [frame] * limit
+
+    frames = []
+    cap = cv2.VideoCapture(source)
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        print(f"❌ Could not read any frames from {source}")
+        sys.exit(1)
+    return frames
+
+
+def predict_from_disk(model, frame, temp_dir):
+    temp_path = os.path.join(temp_dir, f"temp_frame_{uuid.uuid4()}.jpg")
+    cv2.imwrite(temp_path, frame)
+    try:
+        return model.predict(temp_path, conf=0.25, verbose=False, imgsz=640, max_det=10)
+    finally:
+        os.remove(temp_path)
+
+
+def predict_in_memory(model, frame, temp_dir):
+    # As process_frame does it: the preprocessing (RGB, letterbox, normalize) is part of the timing
+    tensor = prepare_image(frame).tensor()
+    return model.predict(tensor, conf=0.25, verbose=False, imgsz=640, max_det=10)
+
+
+def run(label, fn, model, frames, temp_dir):
+    # Warm up so session creation is not counted
+    fn(model, frames[0], temp_dir)
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        fn(model, frame, temp_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"   {label:<10} mean {statistics.mean(timings):7.2f} ms | "
+          f"p50 {statistics.median(timings):7.2f} ms | "
+          f"p95 {np.percentile(timings, 95):7.2f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disk vs in-memory frame inference benchmark")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--model", default="best.onnx")
+    args = parser.parse_args()
+
+    model_path = os.path.join(MODEL_DIR, args.model)
+    print(f"🧪 Frame inference benchmark ({args.runs} frames)")
+    print(f"   Model:  {model_path}")
+    print(f"   Source: {args.source}")
+
+    model = YOLO(model_path, task='detect')
+    frames = load_frames(args.source, args.runs)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        disk_ms = run("disk", predict_from_disk, model, frames, temp_dir)
+        memory_ms = run("memory", predict_in_memory, model, frames, temp_dir)
+
+    saved = disk_ms - memory_ms
+    print(f"✅ In-memory path saves {saved:.2f} ms/frame ({saved / disk_ms * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_startup.py
+# Cold-start time of app.py under each startup mode: how long until the module is imported
+# (a gunicorn worker can accept requests) and how long until every model is warm.
+#
+# Each run is a fresh interpreter, so nothing is cached between runs except the OS page cache.
+#
+# Usage:
+#   python benchmarks/bench_startup.py [--runs 3] [--modes eager,background,lazy,fast]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# mode name -> environment overrides
+MODES = {
+    'eager': {'MODEL_WARMUP': 'eager', 'FAST_START': 'false'},
+    'background': {'MODEL_WARMUP': 'background', 'FAST_START': 'false'},
+    'lazy': {'MODEL_WARMUP': 'lazy', 'FAST_START': 'false'},
+    'fast': {'MODEL_WARMUP': 'background', 'FAST_START': 'true'},
+}
+
+# Runs inside the child interpreter; prints one JSON line
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter() - started
+app.warmup.wait()
+warm = time.perf_counter() - started
+# lazy mode: the first request pays for the loads instead
+first_use = None
+if app.STARTUP['model_warmup'] == 'lazy':
+    before = time.perf_counter()
+    app.get_condition_model()
+    app.model_registry.load_all()
+    first_use = time.perf_counter() - before
+print(json.dumps({
+    'import_s': imported,
+    'ready_s': warm,
+    'first_use_s': first_use,
+    'tensorflow_imported': 'tensorflow' in sys.modules,
+    'ultralytics_imported': 'ultralytics' in sys.modules,
+    'models': {name: info['state'] for name, info in app.model_registry.readiness().items()},
+}))
+"""
+
+
+def run_once(mode):
+    env = dict(os.environ, **MODES[mode], UPLOAD_RETENTION_ENABLED='false', PYTHONUNBUFFERED='1')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=BASE_DIR, env=env,
+                            capture_output=True, text=True, timeout=900)
+    lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"{mode}: exit {result.returncode}\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default=','.join(MODES), help=f"comma separated subset of {', '.join(MODES)}")
+    args = parser.parse_args()
+
+    print(f"🧪 Cold start of app.py, {args.runs} fresh interpreters per mode")
+    print(f"   {'mode':<11} {'import (s)':>11} {'all warm (s)':>13} {'1st use (s)':>12}  tensorflow  ultralytics")
+    for mode in args.modes.split(','):
+        samples = [run_once(mode) for _ in range(args.runs)]
+        median = lambda key: statistics.median(s[key] for s in samples)  # noqa: E731
+        first_use = [s['first_use_s'] for s in samples if s['first_use_s'] is not None]
+        last = samples[-1]
+        print(f"   {mode:<11} {median('import_s'):>11.2f} {median('ready_s'):>13.2f} "
+              f"{(statistics.median(first_use) if first_use else 0):>12.2f}  "
+              f"{'yes' if last['tensorflow_imported'] else 'no':>10}  {'yes' if last['ultralytics_imported'] else 'no':>11}")
+    print("   import = worker can serve requests; all warm = warmup thread finished")
+
+
+if __name__ == "__main__":
+    main()
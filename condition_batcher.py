@@ -0,0 +1,170 @@
+# condition_batcher.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import numpy as np
+
+
+class ConditionBatcher:
+    """Dynamic batching around the condition model.
+
+    Concurrent callers submit single (1, 150, 150, 3) inputs; a worker thread collects
+    them for up to max_wait_ms or max_batch_size items, runs one forward pass and hands
+    each caller its own row of the output.
+
+    Callers wait at most timeout seconds. If the worker thread dies it is restarted on
+    the next predict().
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=3.0, enabled=True, timeout=30.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.enabled = enabled
+        self.timeout = timeout
+        self._reset_state()
+
+    def _reset_state(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.batch_size_histogram = {}
+        self.worker_restarts = 0
+        self.timeouts = 0
+
+    def reset_after_fork(self):
+        """Worker threads do not survive fork(); start fresh in the child"""
+        self._reset_state()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            if self._worker is not None:
+                self.worker_restarts += 1
+                print("⚠️ Condition batcher worker had stopped - restarting it")
+            self._worker = threading.Thread(target=self._run, name='condition-batcher', daemon=True)
+            self._worker.start()
+
+    def predict(self, batch):
+        """Blocking call with the same contract as predict_fn for a (1, H, W, C) input"""
+        if not self.enabled:
+            self._record(1)
+            return self.predict_fn(batch)
+
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((batch, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # The worker skips (or ignores the result of) a cancelled item
+            future.cancel()
+            with self._stats_lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Condition model did not answer within {self.timeout:g}s")
+
+    def _collect(self):
+        items = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    @staticmethod
+    def _settle(future, result=None, error=None):
+        """Resolve a caller's future unless the caller already gave up on it"""
+        if future.done():
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        while True:
+            items = []
+            try:
+                items = [(batch, future) for batch, future in self._collect() if not future.done()]
+                if items:
+                    self._run_batch(items)
+            except Exception as e:
+                # Never let the worker die with callers waiting on it
+                print(f"❌ Condition batcher error: {e}")
+                for _, future in items:
+                    self._settle(future, error=e)
+
+    def _run_batch(self, items):
+        inputs = [batch for batch, _ in items]
+        futures = [future for _, future in items]
+        try:
+            outputs = self.predict_fn(np.concatenate(inputs, axis=0))
+            offset = 0
+            for batch, future in zip(inputs, futures):
+                self._settle(future, outputs[offset:offset + len(batch)])
+                offset += len(batch)
+            self._record(len(items))
+        except Exception as e:
+            if len(items) == 1:
+                self._settle(futures[0], error=e)
+                return
+            # e.g. a model exported with a static batch size - serve callers one by one
+            print(f"⚠️ Condition batch of {len(items)} failed ({e}) - running items individually")
+            for batch, future in items:
+                try:
+                    self._settle(future, self.predict_fn(batch))
+                except Exception as item_error:
+                    self._settle(future, error=item_error)
+                self._record(1)
+
+    def _record(self, size):
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.max_seen_batch = max(self.max_seen_batch, size)
+            self.batch_size_histogram[size] = self.batch_size_histogram.get(size, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+                'max_batch_seen': self.max_seen_batch,
+                'timeouts': self.timeouts,
+                'worker_restarts': self.worker_restarts,
+                'batch_size_histogram': dict(sorted(self.batch_size_histogram.items()))
+            }
+
+
+def batcher_from_env(predict_fn):
+    """Build a ConditionBatcher using CONDITION_BATCHING / CONDITION_BATCH_MAX_SIZE / CONDITION_BATCH_MAX_WAIT_MS /
+    CONDITION_BATCH_TIMEOUT_SECONDS"""
+    return ConditionBatcher(
+        predict_fn,
+        max_batch_size=int(os.getenv('CONDITION_BATCH_MAX_SIZE', 16)),
+        max_wait_ms=float(os.getenv('CONDITION_BATCH_MAX_WAIT_MS', 3)),
+        enabled=os.getenv('CONDITION_BATCHING', 'true').lower() in ('1', 'true', 'yes'),
+        timeout=float(os.getenv('CONDITION_BATCH_TIMEOUT_SECONDS', 30))
+    )
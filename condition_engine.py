@@ -0,0 +1,94 @@
+# condition_engine.py
+import os
+
+import numpy as np
+
+
+class OnnxConditionBackend:
+    """Condition CNN served by ONNX Runtime (no TensorFlow needed at runtime)"""
+
+    name = 'onnxruntime'
+
+    def __init__(self, onnx_path, intra_op_threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_shape = tuple(self.session.get_inputs()[0].shape)
+        self.output_shape = tuple(self.session.get_outputs()[0].shape)
+
+    def predict(self, batch):
+        return self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})[0]
+
+
+class KerasConditionBackend:
+    """Fallback: the original tf.keras model"""
+
+    name = 'keras'
+
+    def __init__(self, keras_model):
+        self.model = keras_model
+        self.input_shape = keras_model.input_shape
+        self.output_shape = keras_model.output_shape
+
+    def predict(self, batch):
+        # __call__ avoids most of predict()'s per-call setup for small batches
+        return np.asarray(self.model(batch, training=False))
+
+
+class ConditionEngine:
+    """Single entry point for condition inference, whichever backend is loaded.
+
+    predict() keeps the Keras-style signature so callers don't care about the backend.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @property
+    def backend_name(self):
+        return self.backend.name
+
+    @property
+    def input_shape(self):
+        return self.backend.input_shape
+
+    @property
+    def output_shape(self):
+        return self.backend.output_shape
+
+    def predict(self, batch, verbose=0):
+        return self.backend.predict(batch)
+
+
+def load_condition_engine(onnx_path, keras_loader=None, intra_op_threads=None):
+    """Load the condition model through onnxruntime, falling back to Keras.
+
+    keras_loader is only called when the ONNX model is missing or fails to load,
+    so TensorFlow never has to be touched on hosts that have the exported model.
+    """
+    if intra_op_threads is None:
+        intra_op_threads = int(os.getenv('CONDITION_ONNX_THREADS', 0))
+
+    if onnx_path and os.path.exists(onnx_path) and os.getenv('CONDITION_BACKEND', 'onnx') != 'keras':
+        try:
+            backend = OnnxConditionBackend(onnx_path, intra_op_threads=intra_op_threads)
+            print(f"✅ Condition model loaded with onnxruntime: {onnx_path}")
+            return ConditionEngine(backend)
+        except Exception as e:
+            print(f"⚠️ Could not load ONNX condition model ({e}) - falling back to Keras")
+    elif onnx_path:
+        print(f"ℹ️  No ONNX condition model at {onnx_path} - using Keras (run converts/export_condition_onnx.py)")
+
+    if keras_loader is None:
+        return None
+
+    keras_model = keras_loader()
+    if keras_model is None:
+        return None
+    return ConditionEngine(KerasConditionBackend(keras_model))
@@ -0,0 +1,146 @@
+# export_condition_onnx.py
+# Export the Keras condition CNN to ONNX, then check label/probability parity and latency.
+#
+# Usage:
+#   pip install tf2onnx
+#   python converts/export_condition_onnx.py [--keras cnn_final_model.h5] [--output cnn_final_model.onnx]
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "public", "models", "conditions_models")
+UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+
+
+def load_keras_model(path):
+    import tensorflow as tf
+    from tensorflow.keras.layers import InputLayer
+
+    # Same batch_shape workaround app.py uses for older .h5 files
+    class CompatibleInputLayer(InputLayer):
+        def __init__(self, *args, **kwargs):
+            batch_shape = kwargs.pop('batch_shape', None)
+            if batch_shape and len(batch_shape) == 4:
+                kwargs['input_shape'] = batch_shape[1:]
+            super().__init__(*args, **kwargs)
+
+    try:
+        return tf.keras.models.load_model(path, custom_objects={'InputLayer': CompatibleInputLayer}, compile=False)
+    except Exception as e:
+        print(f"⚠️  Load with batch_shape workaround failed ({e}), retrying plain load")
+        return tf.keras.models.load_model(path, compile=False)
+
+
+def export(keras_model, output_path, opset):
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, 150, 150, 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=opset, output_path=output_path)
+    print(f"✅ Exported ONNX model: {output_path}")
+
+
+def softmax(preds):
+    # app.py re-applies softmax to whatever the model returns; compare what users would see
+    exp = np.exp(preds - np.max(preds, axis=-1, keepdims=True))
+    return exp / np.sum(exp, axis=-1, keepdims=True)
+
+
+def parity_inputs(count):
+    """Real uploads (preprocessed like analyze_condition) plus random noise"""
+    import cv2
+
+    batches = []
+    # Content-addressed uploads live in UPLOAD_DIR/xx/yy/, older ones flat in UPLOAD_DIR;
+    # "**" does not descend into dot directories (.variants, .staging)
+    paths = glob.glob(os.path.join(UPLOAD_DIR, "**", "*.jpg"), recursive=True)
+    for path in sorted(paths)[:count]:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        img = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (150, 150))
+        batches.append(np.expand_dims(img.astype(np.float32) / 255.0, axis=0))
+
+    rng = np.random.default_rng(0)
+    while len(batches) < count:
+        batches.append(rng.random((1, 150, 150, 3), dtype=np.float32))
+    return batches
+
+
+def check_parity(keras_model, session, inputs, atol):
+    input_name = session.get_inputs()[0].name
+    max_diff = 0.0
+    label_mismatches = 0
+
+    for batch in inputs:
+        keras_probs = softmax(keras_model.predict(batch, verbose=0))[0]
+        onnx_probs = softmax(session.run(None, {input_name: batch})[0])[0]
+        max_diff = max(max_diff, float(np.max(np.abs(keras_probs - onnx_probs))))
+        if int(np.argmax(keras_probs)) != int(np.argmax(onnx_probs)):
+            label_mismatches += 1
+
+    ok = max_diff <= atol and label_mismatches == 0
+    print(f"{'✅' if ok else '❌'} Parity on {len(inputs)} inputs: "
+          f"max |Δp| = {max_diff:.2e} (tolerance {atol:.0e}), label mismatches = {label_mismatches}")
+    return ok
+
+
+def time_calls(label, fn, batch, runs):
+    fn(batch)  # warm up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    mean = statistics.mean(timings)
+    print(f"   {label:<22} mean {mean:7.2f} ms | p50 {statistics.median(timings):7.2f} ms")
+    return mean
+
+
+def compare_latency(keras_model, session, runs):
+    input_name = session.get_inputs()[0].name
+    batch = np.random.default_rng(1).random((1, 150, 150, 3), dtype=np.float32)
+
+    print(f"⏱️  Single-image latency ({runs} runs):")
+    keras_ms = time_calls("keras predict()", lambda b: keras_model.predict(b, verbose=0), batch, runs)
+    time_calls("keras __call__", lambda b: keras_model(b, training=False), batch, runs)
+    onnx_ms = time_calls("onnxruntime", lambda b: session.run(None, {input_name: b}), batch, runs)
+    print(f"✅ onnxruntime is {keras_ms / onnx_ms:.1f}x faster than keras predict()")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the condition CNN to ONNX and verify it")
+    parser.add_argument("--keras", default=os.path.join(MODEL_DIR, "cnn_final_model.h5"))
+    parser.add_argument("--output", default=os.path.join(MODEL_DIR, "cnn_final_model.onnx"))
+    parser.add_argument("--opset", type=int, default=13)
+    parser.add_argument("--samples", type=int, default=32, help="inputs used for the parity check")
+    parser.add_argument("--atol", type=float, default=1e-4, help="max allowed probability difference")
+    parser.add_argument("--runs", type=int, default=50, help="runs for the latency comparison")
+    parser.add_argument("--skip-export", action="store_true", help="only verify an existing ONNX file")
+    args = parser.parse_args()
+
+    import onnxruntime as ort
+
+    print(f"🔄 Loading Keras model: {args.keras}")
+    keras_model = load_keras_model(args.keras)
+
+    if not args.skip_export:
+        export(keras_model, args.output, args.opset)
+
+    session = ort.InferenceSession(args.output, providers=['CPUExecutionProvider'])
+    ok = check_parity(keras_model, session, parity_inputs(args.samples), args.atol)
+    compare_latency(keras_model, session, args.runs)
+
+    if not ok:
+        print("❌ ONNX model does not match Keras - do not deploy it")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# email_templates.py
+import datetime
+from collections import namedtuple
+from html import escape
+
+RenderedEmail = namedtuple('RenderedEmail', ['subject', 'html', 'text'])
+
+# One stylesheet for every email; themes only swap the header/accent colours
+SHARED_CSS = """
+body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+.container { max-width: 600px; margin: 0 auto; padding: 20px; }
+.header { color: white; padding: 30px; text-align: center; }
+.header.green { background: linear-gradient(135deg, #4CAF50, #2E7D32); }
+.header.purple { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 10px 10px 0 0; padding: 20px; }
+.content { padding: 30px; }
+.content.shaded { background: #f9f9f9; border-radius: 0 0 10px 10px; }
+.accent { color: #2E7D32; }
+.message-box { background-color: #f9f9f9; border-left: 4px solid #4CAF50; padding: 20px; margin: 20px 0; }
+.code { font-size: 32px; font-weight: bold; text-align: center; margin: 20px 0; padding: 15px; background: white; border-radius: 8px; letter-spacing: 10px; }
+.code.green { color: #16a34a; letter-spacing: 5px; }
+.code.purple { color: #667eea; }
+.warning { background: #fff3cd; border: 1px solid #ffeaa7; padding: 10px; border-radius: 5px; margin: 20px 0; }
+.footer { text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; color: #666; font-size: 12px; }
+""".strip()
+
+# [[slot]] markers are filled once when a template is compiled; {field} placeholders per render
+LAYOUT = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>[[css]]</style>
+</head>
+<body>
+<div class="container">
+<div class="header [[theme]]"><h1>[[title]]</h1></div>
+<div class="content[[content_class]]">
+[[content]]
+</div>
+<div class="footer">
+[[footer]]
+</div>
+</div>
+</body>
+</html>"""
+
+DEFAULT_FOOTER = "<p>This is an automated message. Please do not reply to this email.</p>"
+
+
+def _braces(text):
+    """Protect literal braces (CSS) from str.format"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _status_label(value):
+    return str(value).replace('_', ' ').title()
+
+
+def _lines(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.splitlines()
+    return [str(line) for line in value]
+
+
+class EmailTemplate:
+    """An email compiled once: the layout, shared CSS and static markup are merged
+    into single format strings, so a render is one escape pass plus str.format_map.
+
+    fields(context) -> extra plain-text values (e.g. a status label).
+    html_fields(escaped) -> HTML fragments built from already-escaped values.
+    text_fields(values) -> plain-text fragments for the text body.
+    """
+
+    def __init__(self, subject, title, content, text=None, theme='green', footer=DEFAULT_FOOTER,
+                 content_class='', fields=None, html_fields=None, text_fields=None):
+        self.subject = subject
+        self.text = text
+        self.fields = fields
+        self.html_fields = html_fields
+        self.text_fields = text_fields
+        self.html = (LAYOUT
+                     .replace('[[css]]', _braces(SHARED_CSS))
+                     .replace('[[theme]]', theme)
+                     .replace('[[title]]', title)
+                     .replace('[[content_class]]', f' {content_class}' if content_class else '')
+                     .replace('[[content]]', content)
+                     .replace('[[footer]]', footer))
+
+    def render(self, context):
+        values = {key: '' if value is None else value for key, value in context.items()}
+        if self.fields:
+            values.update(self.fields(context))
+
+        escaped = {key: escape(value) if isinstance(value, str) else value for key, value in values.items()}
+        if self.html_fields:
+            escaped.update(self.html_fields(escaped, context))
+
+        text = None
+        if self.text is not None:
+            text_values = dict(values, **self.text_fields(values, context)) if self.text_fields else values
+            text = self.text.format_map(text_values)
+
+        return RenderedEmail(
+            subject=self.subject.format_map(values),
+            html=self.html.format_map(escaped),
+            text=text
+        )
+
+
+# ---- admin update on a report ----
+def _admin_update_fields(context):
+    status = context.get('report_status')
+    return {'status_label': _status_label(status) if status else ''}
+
+
+def _admin_update_html(escaped, context):
+    details = _lines(context.get('report_details'))
+    return {
+        # Escape first, then newlines become the only markup user text gets
+        'admin_message_html': escaped['admin_message'].replace('\r\n', '\n').replace('\n', '<br>'),
+        'status_html': f"<p><strong>Status:</strong> {escaped['status_label']}</p>" if escaped['status_label'] else '',
+        'details_html': ('<p><strong>Details:</strong><br>' + '<br>'.join(escape(line) for line in details) + '</p>') if details else '',
+    }
+
+
+def _admin_update_text(values, context):
+    return {'status_text': f"Status: {values['status_label']}\n\n" if values['status_label'] else ''}
+
+
+# ---- OTP login code ----
+def _otp_fields(context):
+    return {'year': str(context.get('year') or datetime.datetime.now().year)}
+
+
+TEMPLATES = {
+    'admin_update': EmailTemplate(
+        subject="📢 AnimalCare+ Update: Your {report_species} Report",
+        title="🐾 AnimalCare+ Report Update",
+        content="""<h2>Hello {user_name},</h2>
+<p>Your wildlife report has been updated by our admin team.</p>
+<h3 class="accent">Report: {report_species}</h3>
+{status_html}
+<div class="message-box">
+<h4 class="accent" style="margin-top: 0;">Admin Message:</h4>
+<p>{admin_message_html}</p>
+</div>
+{details_html}
+<p>You can view your report and check for updates by logging into your AnimalCare+ dashboard.</p>
+<p>Thank you for helping protect wildlife!</p>""",
+        footer="""<p>This is an automated message from AnimalCare+ Wildlife Monitoring System.</p>
+<p>📍 Wildlife Conservation Center | 🌍 Protecting Endangered Species</p>""",
+        text="""AnimalCare+ Report Update
+
+Hello {user_name},
+
+Your wildlife report for {report_species} has been updated by our admin team.
+
+Admin Message:
+{admin_message}
+
+{status_text}You can view your report and check for updates by logging into your AnimalCare+ dashboard.
+
+Thank you for helping protect wildlife!
+
+Best regards,
+The AnimalCare+ Team
+
+This is an automated message. Please do not reply to this email.
+""",
+        fields=_admin_update_fields,
+        html_fields=_admin_update_html,
+        text_fields=_admin_update_text,
+    ),
+
+    'verification': EmailTemplate(
+        subject="Verify Your Email",
+        title="Email Verification",
+        content="""<p>Thank you for registering.</p>
+<p>Your verification code is:</p>
+<div class="code green">{token}</div>
+<p>This code will expire soon.</p>
+<p>If you did not request this, please ignore this email.</p>""",
+        text="""Thank you for registering.
+
+Your verification code is: {token}
+
+This code will expire soon. If you did not request this, please ignore this email.
+""",
+    ),
+
+    'otp_login': EmailTemplate(
+        subject="Your Wildlife Detection System Login Code",
+        title="Wildlife Detection System",
+        theme='purple',
+        content_class='shaded',
+        content="""<h2>Hello {username},</h2>
+<p>Your login verification code is:</p>
+<div class="code purple">{otp_code}</div>
+<p>This code will expire in {expiry_minutes} minutes.</p>
+<div class="warning">
+<p><strong>⚠️ Security Notice:</strong></p>
+<p>• Never share this code with anyone</p>
+<p>• Our team will never ask for your verification code</p>
+<p>• If you didn't request this code, please ignore this email</p>
+</div>
+<p>Enter this code on the login page to complete your authentication.</p>
+<p>Best regards,<br>Wildlife Detection System Team</p>""",
+        footer="""<p>This is an automated message. Please do not reply to this email.</p>
+<p>© {year} Wildlife Detection System. All rights reserved.</p>""",
+        fields=_otp_fields,
+    ),
+}
+
+
+def template_names():
+    return sorted(TEMPLATES)
+
+
+def render_email(name, **context):
+    """Render one email. Returns RenderedEmail(subject, html, text); text may be None"""
+    template = TEMPLATES.get(name)
+    if template is None:
+        raise KeyError(f"Unknown email template: {name}")
+    return template.render(context)
+
+
+def render_bulk(name, contexts):
+    """Render the same email for many recipients (e.g. a batch of resolved reports)"""
+    template = TEMPLATES.get(name)
+    if template is None:
+        raise KeyError(f"Unknown email template: {name}")
+    render = template.render
+    return [render(context) for context in contexts]
+
+
+def render_otp_email(otp_code, username, expiry_minutes):
+    return render_email('otp_login', otp_code=otp_code, username=username, expiry_minutes=expiry_minutes)
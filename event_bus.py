@@ -0,0 +1,180 @@
+# event_bus.py
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+
+
+class Subscription:
+    """One connected client. Events are buffered in a bounded queue; a client that
+    falls behind is flagged as overflowed and told to resync instead of blocking publishers."""
+
+    def __init__(self, channel, max_queue):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+    def get(self, timeout):
+        """Next event, or None when nothing arrived within timeout seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalEventBus:
+    """In-process pub/sub: publish() fans out to every subscriber of a channel on this worker"""
+
+    name = 'local'
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event_type, data):
+        self._deliver(channel, {'type': event_type, 'data': data})
+
+    def _deliver(self, channel, event):
+        event.setdefault('seq', next(self._sequence))
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        self.published += 1
+        for subscription in subscribers:
+            if subscription.offer(event):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            channels = len(self._subscribers)
+            connections = sum(len(subs) for subs in self._subscribers.values())
+        return {
+            'backend': self.name,
+            'channels': channels,
+            'connections': connections,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped
+        }
+
+
+class RedisEventBus(LocalEventBus):
+    """Redis pub/sub so events published by one gunicorn worker reach clients on all of them.
+
+    Subscribers are still local queues; a listener thread relays Redis messages into them.
+    If the Redis connection drops the listener resubscribes with exponential backoff and
+    sends every local subscriber a resync, since events published meanwhile were missed.
+    """
+
+    name = 'redis'
+
+    def __init__(self, redis_url, prefix='webanimal:events:', max_queue=100, max_backoff=30):
+        import redis
+
+        super().__init__(max_queue=max_queue)
+        self.prefix = prefix
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+        self.connected = True
+        self.client = redis.Redis.from_url(redis_url)
+        self._pubsub = self._subscribe()
+        self._listener = threading.Thread(target=self._listen, name='event-bus-redis', daemon=True)
+        self._listener.start()
+
+    def _subscribe(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{self.prefix}*")
+        return pubsub
+
+    def publish(self, channel, event_type, data):
+        payload = json.dumps({'type': event_type, 'data': data}, default=str)
+        self.client.publish(f"{self.prefix}{channel}", payload)
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self._subscribe()
+                    self.connected = True
+                    self.reconnects += 1
+                    print("✅ Event bus: redis listener reconnected")
+                    self._resync_all('event bus reconnected')
+                for message in self._pubsub.listen():
+                    backoff = 1
+                    self._relay(message)
+                raise ConnectionError("subscription closed")
+            except Exception as e:
+                self.connected = False
+                print(f"⚠️ Event bus: redis listener disconnected ({e}) - retrying in {backoff}s")
+                try:
+                    if self._pubsub is not None:
+                        self._pubsub.close()
+                except Exception:
+                    pass
+                self._pubsub = None
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _relay(self, message):
+        try:
+            channel = message['channel'].decode('utf-8')[len(self.prefix):]
+            self._deliver(channel, json.loads(message['data']))
+        except Exception as e:
+            print(f"⚠️ Event bus: dropped malformed message ({e})")
+
+    def _resync_all(self, reason):
+        with self._lock:
+            subscribers = [sub for subs in self._subscribers.values() for sub in subs]
+        for subscription in subscribers:
+            if not subscription.offer({'type': 'resync', 'data': {'reason': reason}}):
+                self.dropped += 1
+
+    def stats(self):
+        return dict(super().stats(), connected=self.connected, reconnects=self.reconnects)
+
+
+def event_bus_from_env():
+    """EVENT_BUS_BACKEND=local|redis (EVENT_BUS_REDIS_URL), EVENT_BUS_MAX_QUEUE per connection"""
+    backend = os.getenv('EVENT_BUS_BACKEND', 'local').lower()
+    max_queue = int(os.getenv('EVENT_BUS_MAX_QUEUE', 100))
+
+    if backend == 'redis':
+        try:
+            bus = RedisEventBus(os.getenv('EVENT_BUS_REDIS_URL', 'redis://localhost:6379/0'), max_queue=max_queue)
+            print("✅ Event bus: redis")
+            return bus
+        except Exception as e:
+            print(f"⚠️ Redis event bus unavailable ({e}) - using in-process bus (single worker only)")
+
+    return LocalEventBus(max_queue=max_queue)
@@ -0,0 +1,90 @@
+# frame_preprocess.py
+import cv2
+import numpy as np
+
+YOLO_INPUT_SIZE = 640
+CONDITION_INPUT_SIZE = 150
+LETTERBOX_COLOR = (114, 114, 114)  # same padding value ultralytics uses
+
+
+def letterbox(img, new_size=YOLO_INPUT_SIZE, color=LETTERBOX_COLOR):
+    """Resize keeping aspect ratio and pad to a square new_size x new_size image"""
+    h, w = img.shape[:2]
+    ratio = min(new_size / h, new_size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_w, pad_h = new_size - new_w, new_size - new_h
+    top, left = pad_h // 2, pad_w // 2
+    return cv2.copyMakeBorder(
+        img, top, pad_h - top, left, pad_w - left, cv2.BORDER_CONSTANT, value=color
+    )
+
+
+class PreparedImage:
+    """One decoded image plus the model inputs derived from it, each computed once per request.
+
+    - bgr: the decoded frame as OpenCV returns it
+    - rgb: RGB copy shared by the YOLO tensor and the condition CNN
+    - tensor(): 1x3x640x640 float tensor (letterboxed, 0-1) that every YOLO model reuses
+    - condition_input(): 1x150x150x3 float32 batch for the condition CNN
+    """
+
+    def __init__(self, bgr, imgsz=YOLO_INPUT_SIZE):
+        self.bgr = bgr
+        self.imgsz = imgsz
+        self._rgb = None
+        self._chw = None
+        self._tensor = None
+        self._condition_input = None
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def chw(self):
+        """Letterboxed, normalized 3x640x640 float32 array"""
+        if self._chw is None:
+            boxed = letterbox(self.rgb, self.imgsz)
+            self._chw = np.ascontiguousarray(boxed.transpose(2, 0, 1), dtype=np.float32) / 255.0
+        return self._chw
+
+    def tensor(self):
+        """1x3x640x640 torch tensor; ultralytics skips its own letterbox/normalize for tensors"""
+        if self._tensor is None:
+            import torch
+            self._tensor = torch.from_numpy(self.chw()).unsqueeze(0)
+        return self._tensor
+
+    def condition_input(self):
+        if self._condition_input is None:
+            resized = cv2.resize(self.rgb, (CONDITION_INPUT_SIZE, CONDITION_INPUT_SIZE))
+            self._condition_input = np.expand_dims(resized.astype(np.float32) / 255.0, axis=0)
+        return self._condition_input
+
+
+def prepare_image(img):
+    """Wrap a BGR array (or pass through an existing PreparedImage)"""
+    if isinstance(img, PreparedImage):
+        return img
+    return PreparedImage(img)
+
+
+def prepare_image_file(path):
+    """Decode an image file once. Returns None if OpenCV cannot read it."""
+    img = cv2.imread(path)
+    return PreparedImage(img) if img is not None else None
+
+
+def batch_tensor(prepared_images):
+    """Stack several prepared images into one Bx3x640x640 tensor"""
+    import torch
+    return torch.from_numpy(np.stack([p.chw() for p in prepared_images]))
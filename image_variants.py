@@ -0,0 +1,283 @@
+# image_variants.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+
+VARIANT_FORMATS = {
+    'jpg': ('.jpg', [cv2.IMWRITE_JPEG_QUALITY, 82]),
+    'webp': ('.webp', [cv2.IMWRITE_WEBP_QUALITY, 80]),
+    'png': ('.png', [cv2.IMWRITE_PNG_COMPRESSION, 6]),
+}
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.webm', '.avi', '.mkv')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS variants (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_variants_last_used ON variants (last_used_at);
+"""
+
+STALE_TEMP_SECONDS = 3600
+
+
+class VariantError(ValueError):
+    pass
+
+
+class VariantCache:
+    """Resized copies of uploads, generated on first request and kept in an LRU-bounded disk cache.
+
+    Requested widths snap up to the nearest of `widths` so arbitrary values can't fill the
+    cache; a variant is never wider than its source. Files live in
+    root/<key[:2]>/<key>.<ext> where key hashes source identity + width + format, so a changed
+    source never serves a stale variant. Concurrent requests for a variant that is still
+    being generated wait for that one generation instead of starting their own.
+    Video sources yield a resized first frame (a poster image).
+
+    Sizes and last use are kept in a sqlite index (root/.index.sqlite) shared by every worker
+    process, so max_bytes bounds the whole directory on this host rather than each process.
+    Last use is recorded at most once per touch_interval seconds per variant.
+    """
+
+    def __init__(self, root, max_bytes=256 * 1024 * 1024, widths=(160, 320, 480, 640, 960, 1280),
+                 touch_interval=60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.widths = tuple(sorted(widths))
+        self.touch_interval = touch_interval
+        self.index_path = os.path.join(root, '.index.sqlite')
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._db().executescript(SCHEMA)
+        self._load()
+
+    def _db(self):
+        if self._pid != os.getpid():
+            # sqlite connections must not cross a fork
+            self.reset_after_fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def reset_after_fork(self):
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _load(self):
+        """Reconcile the index with the files on disk, then enforce the budget"""
+        on_disk = {}
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                stat = entry.stat()
+                if entry.name.endswith('.tmp'):
+                    # Left behind by a crashed write; a recent one may belong to a live worker
+                    if stat.st_mtime < time.time() - STALE_TEMP_SECONDS:
+                        os.remove(entry.path)
+                    continue
+                on_disk[entry.path] = (stat.st_size, stat.st_atime)
+
+        db = self._db()
+        # IMMEDIATE takes the write lock first, so concurrently booting workers don't race
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            indexed = {path for (path,) in db.execute('SELECT path FROM variants')}
+            db.executemany('DELETE FROM variants WHERE path = ?', [(path,) for path in indexed - on_disk.keys()])
+            db.executemany(
+                'INSERT INTO variants (path, size, last_used_at) VALUES (?, ?, ?)',
+                [(path, size, atime) for path, (size, atime) in on_disk.items() if path not in indexed]
+            )
+            self._evict(db)
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def snap_width(self, width):
+        for allowed in self.widths:
+            if width <= allowed:
+                return allowed
+        return self.widths[-1]
+
+    def parse(self, width, fmt):
+        """Validate query parameters -> (width, format). Raises VariantError"""
+        try:
+            width = int(width)
+        except (TypeError, ValueError):
+            raise VariantError("width must be an integer")
+        if width <= 0:
+            raise VariantError("width must be positive")
+        fmt = (fmt or 'jpg').lower().replace('jpeg', 'jpg')
+        if fmt not in VARIANT_FORMATS:
+            raise VariantError(f"format must be one of {', '.join(VARIANT_FORMATS)}")
+        return self.snap_width(width), fmt
+
+    def variant_path(self, source_etag, width, fmt):
+        key = hashlib.sha256(f"{source_etag}|{width}|{fmt}".encode()).hexdigest()
+        return os.path.join(self.root, key[:2], f"{key}{VARIANT_FORMATS[fmt][0]}")
+
+    def get(self, source_path, source_etag, width, fmt):
+        """Path of the cached variant, generating it if needed. None if the source can't be decoded"""
+        path = self.variant_path(source_etag, width, fmt)
+        if os.path.exists(path):
+            self._touch(path)
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            future = self._pending.get(path)
+            owner = future is None
+            if owner:
+                future = self._pending[path] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._generate(source_path, path, width, fmt)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+
+    def _generate(self, source_path, path, width, fmt):
+        try:
+            # Another worker process may already have produced it
+            self._remember(path, os.path.getsize(path))
+            return path
+        except FileNotFoundError:
+            pass
+
+        image = self._read_source(source_path)
+        if image is None:
+            return None
+        h, w = image.shape[:2]
+        if w > width:
+            image = cv2.resize(image, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+        ext, params = VARIANT_FORMATS[fmt]
+        ok, encoded = cv2.imencode(ext, image, params)
+        if not ok:
+            return None
+
+        data = encoded.tobytes()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._remember(path, len(data))
+        return path
+
+    def _touch(self, path):
+        now = time.time()
+        self._db().execute('UPDATE variants SET last_used_at = ? WHERE path = ? AND last_used_at < ?',
+                           (now, path, now - self.touch_interval))
+
+    def _remember(self, path, size):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute(
+                'INSERT INTO variants (path, size, last_used_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(path) DO UPDATE SET size = excluded.size, last_used_at = excluded.last_used_at',
+                (path, size, time.time())
+            )
+            self._evict(db, keep=path)
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    @staticmethod
+    def _read_source(source_path):
+        if source_path.lower().endswith(VIDEO_EXTENSIONS):
+            cap = cv2.VideoCapture(source_path)
+            try:
+                ok, frame = cap.read()
+                return frame if ok else None
+            finally:
+                cap.release()
+        return cv2.imread(source_path, cv2.IMREAD_COLOR)
+
+    def _evict(self, db, keep=None):
+        """Drop least recently used variants until the directory is under max_bytes (inside a write transaction)"""
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM variants').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for path, size in db.execute('SELECT path, size FROM variants ORDER BY last_used_at'):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            victims.append(path)
+            total -= size
+        db.executemany('DELETE FROM variants WHERE path = ?', [(path,) for path in victims])
+        for path in victims:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.evictions += len(victims)
+
+    def stats(self):
+        entries, size = self._db().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM variants').fetchone()
+        with self._lock:
+            return {
+                'root': self.root,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'widths': list(self.widths),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'generating': len(self._pending)
+            }
+
+
+def variant_cache_from_env(upload_dir):
+    """UPLOAD_VARIANT_CACHE_MB / UPLOAD_VARIANT_WIDTHS (comma separated); cache under upload_dir/.variants.
+
+    UPLOAD_VARIANT_CACHE_MB is the limit for the directory, shared by all workers on the host.
+    """
+    widths = [int(w) for w in os.getenv('UPLOAD_VARIANT_WIDTHS', '160,320,480,640,960,1280').split(',') if w.strip()]
+    cache = VariantCache(
+        os.path.join(upload_dir, '.variants'),
+        max_bytes=int(float(os.getenv('UPLOAD_VARIANT_CACHE_MB', 256)) * 1024 * 1024),
+        widths=widths
+    )
+    stats = cache.stats()
+    print(f"✅ Image variant cache: {stats['entries']} cached, {stats['bytes'] // (1024 * 1024)}/"
+          f"{cache.max_bytes // (1024 * 1024)} MB, widths {widths}")
+    return cache
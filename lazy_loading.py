@@ -0,0 +1,131 @@
+# lazy_loading.py
+import os
+import threading
+import time
+
+WARMUP_MODES = ('eager', 'background', 'lazy')
+
+
+class LazyResource:
+    """Something expensive (a model, a data file) loaded once: on first get() or by the warmup thread.
+
+    loader() returns the value, or None when it is unavailable. A failed or empty load is not
+    retried on every call (the old import-time behaviour); reset() allows another attempt.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._value = None
+        self._lock = threading.Lock()
+        self.state = 'not_loaded'  # not_loaded -> loading -> ready | failed
+        self.error = None
+        self.loaded_at = None
+        self.load_seconds = None
+
+    def get(self):
+        if self.state in ('ready', 'failed'):
+            return self._value
+        with self._lock:
+            if self.state in ('ready', 'failed'):
+                return self._value
+            self.state = 'loading'
+            started = time.perf_counter()
+            try:
+                self._value = self.loader()
+                self.error = None if self._value is not None else 'not available'
+            except Exception as e:
+                self._value = None
+                self.error = str(e)
+                print(f"❌ Failed to load {self.name}: {e}")
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self.loaded_at = time.time()
+            self.state = 'ready' if self._value is not None else 'failed'
+            return self._value
+
+    def peek(self):
+        """The value if already loaded, without triggering a load"""
+        return self._value
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def reset(self):
+        """Forget the loaded value (e.g. after fork, when the session can't be shared)"""
+        self._lock = threading.Lock()
+        self._value = None
+        self.state = 'not_loaded'
+        self.error = None
+
+    def to_dict(self):
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'error': self.error,
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds
+        }
+
+
+class Warmup:
+    """Runs startup steps in order on a background thread so the app can serve requests meanwhile.
+
+    Each step is (name, fn). Requests that need something not warmed yet load it themselves
+    (LazyResource / ModelRegistry locks make sure it is only loaded once).
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.status = {name: 'pending' for name, _ in self.steps}
+        self.timings = {}
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    def run(self):
+        self.started_at = time.time()
+        for name, step in self.steps:
+            self.status[name] = 'running'
+            started = time.perf_counter()
+            try:
+                step()
+                self.status[name] = 'done'
+            except Exception as e:
+                self.status[name] = f'failed: {e}'
+                print(f"⚠️ Warmup step '{name}' failed: {e}")
+            self.timings[name] = round(time.perf_counter() - started, 3)
+        self.finished_at = time.time()
+        print(f"🔥 Warmup complete in {self.finished_at - self.started_at:.1f}s: {self.timings}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='startup-warmup', daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return not self.steps or self.finished_at is not None
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    def to_dict(self):
+        return {
+            'done': self.done,
+            'steps': dict(self.status),
+            'timings': dict(self.timings),
+            'seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None
+        }
+
+
+def startup_settings_from_env():
+    """MODEL_WARMUP=eager|background|lazy (default background); FAST_START=true also defers database init"""
+    fast_start = os.getenv('FAST_START', 'false').lower() in ('1', 'true', 'yes')
+    mode = os.getenv('MODEL_WARMUP', 'background').lower()
+    if mode not in WARMUP_MODES:
+        print(f"⚠️ Unknown MODEL_WARMUP={mode!r} - using background")
+        mode = 'background'
+    return {'model_warmup': mode, 'fast_start': fast_start}
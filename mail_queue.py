@@ -0,0 +1,208 @@
+# mail_queue.py
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+class MailJob:
+    def __init__(self, message, on_result=None, label=None):
+        self.message = message
+        self.on_result = on_result
+        self.label = label or ', '.join(getattr(message, 'recipients', None) or [])
+        self.attempts = 0
+        self.last_error = None
+
+
+class MailQueue:
+    """Outbound mail sent by a background worker instead of inside the request.
+
+    The worker keeps one SMTP connection open while there is work (closing it after
+    idle_close_seconds without mail), sends every due message over it in batches of
+    up to batch_size, and retries failures with exponential backoff. on_result(success,
+    error) is called once per message with the final outcome.
+
+    connect is a callable returning a connection context manager with .send(message)
+    (Flask-Mail's mail.connect); app_context wraps each batch (e.g. app.app_context) so
+    Flask-Mail and on_result callbacks that touch the database have an app context.
+    """
+
+    def __init__(self, connect, batch_size=20, max_retries=4, backoff_seconds=2.0,
+                 idle_close_seconds=30.0, app_context=None):
+        self.connect = connect
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.idle_close_seconds = idle_close_seconds
+        self.app_context = app_context or nullcontext
+
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._stopped = False
+        self._in_flight = 0
+        self._connection_cm = None
+        self._connection = None
+
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.connections_opened = 0
+
+    # ---- producer side ----
+    def submit(self, message, on_result=None, label=None):
+        job = MailJob(message, on_result=on_result, label=label)
+        self._schedule(job, delay=0)
+        with self._cond:
+            self.submitted += 1
+        self._ensure_worker()
+        return job
+
+    def _schedule(self, job, delay):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), job))
+            self._cond.notify()
+
+    def _ensure_worker(self):
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopped = False
+                self._worker = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+                self._worker.start()
+
+    def flush(self, timeout=None):
+        """Block until every submitted message (including retries) has a final outcome"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    # ---- worker side ----
+    def _next_batch(self):
+        """Due jobs (up to batch_size), or [] once the queue has been idle for idle_close_seconds"""
+        with self._cond:
+            idle_deadline = time.monotonic() + self.idle_close_seconds
+            while not self._stopped:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    batch = []
+                    while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                        batch.append(heapq.heappop(self._heap)[2])
+                    self._in_flight += len(batch)
+                    return batch
+                wait = idle_deadline - now
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                if wait <= 0:
+                    return []
+                self._cond.wait(wait)
+            return []
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                self._close_connection()
+                with self._cond:
+                    if self._stopped:
+                        return
+                continue
+
+            self.batches += 1
+            with self.app_context():
+                for job in batch:
+                    self._send(job)
+                    with self._cond:
+                        self._in_flight -= 1
+                        self._cond.notify_all()
+
+    def _open_connection(self):
+        if self._connection is None:
+            self._connection_cm = self.connect()
+            self._connection = self._connection_cm.__enter__()
+            self.connections_opened += 1
+        return self._connection
+
+    def _close_connection(self):
+        if self._connection_cm is None:
+            return
+        try:
+            self._connection_cm.__exit__(None, None, None)
+        except Exception as e:
+            print(f"⚠️ Mail queue: error closing SMTP connection: {e}")
+        finally:
+            self._connection_cm = None
+            self._connection = None
+
+    def _send(self, job):
+        try:
+            self._open_connection().send(job.message)
+        except Exception as e:
+            # The connection is probably unusable now - reconnect on the next attempt
+            self._close_connection()
+            job.attempts += 1
+            job.last_error = str(e)
+            if job.attempts <= self.max_retries:
+                delay = self.backoff_seconds * (2 ** (job.attempts - 1))
+                print(f"⚠️ Mail to {job.label} failed ({e}) - retry {job.attempts}/{self.max_retries} in {delay:.0f}s")
+                self.retries += 1
+                self._schedule(job, delay)
+                return
+            print(f"❌ Mail to {job.label} failed after {job.attempts} attempts: {e}")
+            self.failed += 1
+            self._report(job, False, job.last_error)
+            return
+
+        self.sent += 1
+        print(f"✅ Email sent to {job.label}")
+        self._report(job, True, None)
+
+    def _report(self, job, success, error):
+        if job.on_result is None:
+            return
+        try:
+            job.on_result(success, error)
+        except Exception as e:
+            print(f"⚠️ Mail queue: result callback for {job.label} failed: {e}")
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._heap)
+            in_flight = self._in_flight
+        return {
+            'pending': pending,
+            'in_flight': in_flight,
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'batches': self.batches,
+            'connections_opened': self.connections_opened,
+            'connection_open': self._connection is not None
+        }
+
+
+def mail_queue_from_env(connect, app_context=None):
+    """MAIL_QUEUE_BATCH_SIZE / MAIL_QUEUE_MAX_RETRIES / MAIL_QUEUE_BACKOFF_SECONDS / MAIL_QUEUE_IDLE_CLOSE_SECONDS"""
+    return MailQueue(
+        connect,
+        batch_size=int(os.getenv('MAIL_QUEUE_BATCH_SIZE', 20)),
+        max_retries=int(os.getenv('MAIL_QUEUE_MAX_RETRIES', 4)),
+        backoff_seconds=float(os.getenv('MAIL_QUEUE_BACKOFF_SECONDS', 2)),
+        idle_close_seconds=float(os.getenv('MAIL_QUEUE_IDLE_CLOSE_SECONDS', 30)),
+        app_context=app_context
+    )
@@ -0,0 +1,274 @@
+# model_registry.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ModelEntry:
+    """Bookkeeping for one long-lived YOLO model / ONNX Runtime session"""
+
+    def __init__(self, name, path, task='detect'):
+        self.name = name
+        self.path = path
+        self.task = task
+        self.model = None
+        self.lock = threading.Lock()  # ultralytics predictors are not thread-safe
+        self.loaded_at = None
+        self.last_used = None
+        self.load_count = 0
+        self.unload_count = 0
+        self.inference_count = 0
+        self.warm_hits = 0   # inferences served by an already-loaded session
+        self.cold_starts = 0  # inferences that had to (re)load the model first
+        self.supports_batch = None  # unknown until the first batched call (static ONNX exports are batch=1)
+        self.last_error = None
+        self.loading = False
+        self.load_seconds = None
+
+    @property
+    def state(self):
+        if self.model is not None:
+            return 'ready'
+        if self.loading:
+            return 'loading'
+        return 'failed' if self.last_error else 'not_loaded'
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'loaded': self.model is not None,
+            'loaded_at': self.loaded_at,
+            'last_used': self.last_used,
+            'load_count': self.load_count,
+            'unload_count': self.unload_count,
+            'inference_count': self.inference_count,
+            'session_reuse_count': self.warm_hits,
+            'cold_starts': self.cold_starts,
+            'supports_batch': self.supports_batch,
+            'state': self.state,
+            'load_seconds': self.load_seconds,
+            'last_error': self.last_error
+        }
+
+
+class ModelRegistry:
+    """Keeps YOLO models (and the ONNX sessions behind them) alive between requests.
+
+    Memory is bounded explicitly instead of tearing sessions down after every frame:
+    - max_loaded caps how many models stay resident (least recently used is evicted)
+    - idle_unload_seconds unloads models nobody has used for that long (0 = never)
+    """
+
+    def __init__(self, idle_unload_seconds=0, max_loaded=0, loader=None, inference_threads=0):
+        self.idle_unload_seconds = idle_unload_seconds
+        self.max_loaded = max_loaded
+        self.loader = loader or self._load_yolo
+        self.inference_threads = inference_threads
+        self.entries = {}
+        self.groups = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop = threading.Event()
+        self._pool = None
+
+    @staticmethod
+    def _load_yolo(entry):
+        from ultralytics import YOLO
+        return YOLO(entry.path, task=entry.task)
+
+    def register(self, name, path, task='detect'):
+        """Register a model file under a name (does not load it)"""
+        with self._lock:
+            self.entries[name] = ModelEntry(name, path, task)
+        return self.entries[name]
+
+    def register_group(self, choice, names):
+        """Map a model_choice (e.g. 'mammals') to the registered model names it runs"""
+        self.groups[choice] = list(names)
+
+    def group(self, choice):
+        return [name for name in self.groups.get(choice, []) if name in self.entries]
+
+    def has_models(self):
+        return any(entry.model is not None for entry in self.entries.values())
+
+    def _ensure_loaded(self, entry):
+        """Load the model for an entry. Caller must hold entry.lock."""
+        if entry.model is not None:
+            return False
+
+        self._evict_for(entry)
+        print(f"🔄 Loading model '{entry.name}' from {entry.path}")
+        entry.loading = True
+        started = time.perf_counter()
+        try:
+            entry.model = self.loader(entry)
+        except Exception as e:
+            entry.last_error = str(e)
+            raise
+        finally:
+            entry.loading = False
+        entry.load_seconds = round(time.perf_counter() - started, 3)
+        entry.loaded_at = time.time()
+        entry.load_count += 1
+        entry.last_error = None
+        print(f"✅ Model '{entry.name}' loaded")
+        return True
+
+    def _evict_for(self, entry):
+        """Unload least recently used idle models so loading `entry` stays within max_loaded"""
+        if not self.max_loaded:
+            return
+
+        loaded = [e for e in self.entries.values() if e.model is not None and e is not entry]
+        loaded.sort(key=lambda e: e.last_used or 0)
+        while len(loaded) >= self.max_loaded:
+            victim = loaded.pop(0)
+            # Never block on (or evict) a model that is busy serving a request
+            if victim.lock.acquire(blocking=False):
+                try:
+                    self._unload(victim, reason='max_loaded')
+                finally:
+                    victim.lock.release()
+
+    def _unload(self, entry, reason):
+        if entry.model is None:
+            return
+        entry.model = None
+        entry.unload_count += 1
+        print(f"💤 Unloaded model '{entry.name}' ({reason})")
+
+    def load(self, name):
+        """Load a model ahead of its first request (startup or the warmup thread)"""
+        entry = self.entries[name]
+        with entry.lock:
+            self._ensure_loaded(entry)
+        return entry.model
+
+    def load_all(self):
+        for name in list(self.entries):
+            try:
+                self.load(name)
+            except Exception as e:
+                print(f"❌ Failed to load model '{name}': {e}")
+
+    @contextmanager
+    def use(self, name):
+        """Borrow a warm model for one inference call"""
+        entry = self.entries[name]
+        with entry.lock:
+            cold = self._ensure_loaded(entry)
+            if cold:
+                entry.cold_starts += 1
+            else:
+                entry.warm_hits += 1
+            entry.inference_count += 1
+            try:
+                yield entry.model
+            finally:
+                entry.last_used = time.time()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                workers = self.inference_threads or max(2, len(self.entries))
+                self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='model-infer')
+            return self._pool
+
+    def map_models(self, names, fn, parallel=True):
+        """Call fn(name, model) for every named model and return [(name, result, error)].
+
+        With parallel=True and more than one model, the calls run on a thread pool;
+        ONNX Runtime releases the GIL while a session runs, so the whole call costs
+        roughly as much as the slowest model instead of the sum of all of them.
+        Results come back in the order of `names`.
+        """
+        def call(name):
+            try:
+                with self.use(name) as model:
+                    return name, fn(name, model), None
+            except Exception as e:
+                return name, None, e
+
+        if not parallel or len(names) < 2:
+            return [call(name) for name in names]
+
+        pool = self._get_pool()
+        return list(pool.map(call, names))
+
+    def unload_idle(self):
+        """Unload models idle for longer than idle_unload_seconds. Returns unloaded names."""
+        if not self.idle_unload_seconds:
+            return []
+
+        now = time.time()
+        unloaded = []
+        for entry in list(self.entries.values()):
+            last = entry.last_used or entry.loaded_at
+            if entry.model is None or last is None or now - last < self.idle_unload_seconds:
+                continue
+            if entry.lock.acquire(blocking=False):
+                try:
+                    self._unload(entry, reason=f"idle {now - last:.0f}s")
+                    unloaded.append(entry.name)
+                finally:
+                    entry.lock.release()
+        return unloaded
+
+    def start_idle_reaper(self, interval=None):
+        """Start a daemon thread that periodically unloads idle models"""
+        if not self.idle_unload_seconds or self._reaper is not None:
+            return
+
+        interval = interval or max(5, self.idle_unload_seconds / 4)
+
+        def reap():
+            while not self._stop.wait(interval):
+                self.unload_idle()
+
+        self._reaper = threading.Thread(target=reap, name='model-idle-reaper', daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def reset_after_fork(self):
+        """Drop sessions/locks inherited from a parent process (ORT sessions are not fork-safe)"""
+        for entry in self.entries.values():
+            entry.model = None
+            entry.lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop = threading.Event()
+        self._pool = None
+
+    def readiness(self):
+        """Per-model state for /health: ready, loading, not_loaded (lazy / idle-unloaded) or failed"""
+        return {
+            name: {'state': entry.state, 'ready': entry.model is not None,
+                   'error': entry.last_error, 'load_seconds': entry.load_seconds}
+            for name, entry in self.entries.items()
+        }
+
+    def stats(self):
+        return {
+            'idle_unload_seconds': self.idle_unload_seconds,
+            'max_loaded': self.max_loaded,
+            'inference_threads': self.inference_threads,
+            'loaded': sum(1 for e in self.entries.values() if e.model is not None),
+            'groups': dict(self.groups),
+            'models': {name: entry.to_dict() for name, entry in self.entries.items()}
+        }
+
+
+def registry_from_env(**kwargs):
+    """Build a ModelRegistry using MODEL_IDLE_UNLOAD_SECONDS / MODEL_MAX_LOADED / MODEL_INFERENCE_THREADS"""
+    return ModelRegistry(
+        idle_unload_seconds=float(os.getenv('MODEL_IDLE_UNLOAD_SECONDS', 0)),
+        max_loaded=int(os.getenv('MODEL_MAX_LOADED', 0)),
+        inference_threads=int(os.getenv('MODEL_INFERENCE_THREADS', 0)),
+        **kwargs
+    )
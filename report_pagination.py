@@ -0,0 +1,66 @@
+# report_pagination.py
+import base64
+from datetime import datetime, timezone
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPageRequest(ValueError):
+    """Bad limit / cursor / date parameter - reported to the client as a 400"""
+
+
+def encode_cursor(created_at, report_id):
+    """Opaque keyset cursor for the last row of a page: (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{report_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, report_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), int(report_id)
+    except Exception:
+        raise InvalidPageRequest('Invalid cursor')
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest('limit must be an integer')
+    if limit < 1:
+        raise InvalidPageRequest('limit must be at least 1')
+    return min(limit, maximum)
+
+
+def parse_date(value, name, end_of_day=False):
+    """Accept YYYY-MM-DD or a full ISO timestamp; a bare date_to covers the whole day"""
+    if value in (None, ''):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise InvalidPageRequest(f'{name} must be an ISO date (YYYY-MM-DD)')
+    # created_at is stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+
+def parse_report_filters(args):
+    """Pull the filter parameters for /api/user-reports out of request.args"""
+    filters = {
+        'status': args.get('status') or None,
+        'urgency': args.get('urgency') or None,
+        'species': (args.get('species') or '').strip() or None,
+        'detection_type': args.get('detection_type') or None,
+        'date_from': parse_date(args.get('date_from'), 'date_from'),
+        'date_to': parse_date(args.get('date_to'), 'date_to', end_of_day=True),
+    }
+    return {key: value for key, value in filters.items() if value is not None}
@@ -0,0 +1,175 @@
+# upload_retention.py
+import os
+import socket
+import threading
+import time
+from contextlib import nullcontext
+
+
+class UploadSweeper:
+    """Background garbage collection for uploads nothing points at.
+
+    Every interval_seconds the sweeper walks the upload index (not the filesystem) in batches
+    of batch_size, oldest first, picking up where the previous run stopped and wrapping around
+    at the end. Names idle for longer than grace_seconds (not uploaded or re-uploaded since) are
+    passed to referenced(names) -> set of names still in use; the rest are deleted through the
+    store, which only removes a file once no other name shares its content.
+
+    max_batches_per_run bounds the work per run so a large backlog is reclaimed over several runs.
+    A lease in the index keeps concurrent workers from sweeping at the same time.
+    With dry_run the background runs only report what they would delete.
+    """
+
+    def __init__(self, store, referenced, grace_seconds=72 * 3600, batch_size=200, max_batches_per_run=10,
+                 interval_seconds=600, app_context=None, dry_run=False):
+        self.store = store
+        self.referenced = referenced
+        self.grace_seconds = grace_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_batches_per_run = max(1, max_batches_per_run)
+        self.interval_seconds = interval_seconds
+        self.app_context = app_context or nullcontext
+        self.dry_run = dry_run
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._cursor = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.runs = 0
+        self.scanned = 0
+        self.deleted = 0
+        self.would_delete = 0
+        self.kept_referenced = 0
+        self.reclaimed_bytes = 0
+        self.errors = 0
+        self.last_run = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='upload-sweeper', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                if not self.store.acquire_lease('upload-sweeper', self.owner, self.interval_seconds * 2):
+                    continue
+                self.run_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Upload sweeper run failed: {e}")
+
+    def run_once(self, dry_run=None):
+        """One incremental pass. Returns a summary of what was (or, with dry_run, would be) deleted.
+
+        dry_run defaults to the sweeper's mode. A dry run on a deleting sweeper is a one-off
+        preview and leaves the cursor where it was.
+        """
+        if dry_run is None:
+            dry_run = self.dry_run
+        preview = dry_run and not self.dry_run
+        with self._lock:
+            cursor = self._cursor
+            started = time.time()
+            cutoff = started - self.grace_seconds
+            summary = {'scanned': 0, 'deleted': 0, 'kept_referenced': 0, 'reclaimed_bytes': 0,
+                       'dry_run': dry_run, 'candidates': []}
+
+            with self.app_context():
+                for _ in range(self.max_batches_per_run):
+                    batch = self.store.idle_since(cutoff, after=self._cursor, limit=self.batch_size)
+                    if not batch:
+                        # End of the index: the next run starts over from the oldest entries
+                        self._cursor = None
+                        break
+                    self._cursor = (batch[-1]['last_seen_at'], batch[-1]['name'])
+                    self._sweep_batch(batch, summary, dry_run)
+
+            summary['duration_ms'] = round((time.time() - started) * 1000, 1)
+            if preview:
+                self._cursor = cursor
+            else:
+                self.runs += 1
+                self.scanned += summary['scanned']
+                self.kept_referenced += summary['kept_referenced']
+                if dry_run:
+                    self.would_delete += summary['deleted']
+                else:
+                    self.deleted += summary['deleted']
+                    self.reclaimed_bytes += summary['reclaimed_bytes']
+                self.last_run = dict(summary, finished_at=time.time())
+                del self.last_run['candidates']
+            if summary['deleted'] or dry_run:
+                print(f"🧹 Upload sweep{' (dry run)' if dry_run else ''}: {summary['deleted']} of "
+                      f"{summary['scanned']} idle uploads unreferenced, {summary['reclaimed_bytes']} bytes")
+            return summary
+
+    def _sweep_batch(self, batch, summary, dry_run):
+        names = [row['name'] for row in batch]
+        in_use = self.referenced(names)
+        summary['scanned'] += len(batch)
+        for row in batch:
+            if row['name'] in in_use:
+                summary['kept_referenced'] += 1
+                continue
+            summary['deleted'] += 1
+            if dry_run:
+                summary['candidates'].append(row['name'])
+                summary['reclaimed_bytes'] += row['size']
+                continue
+            summary['reclaimed_bytes'] += self.store.delete(row['name'])
+
+    def stats(self):
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'dry_run': self.dry_run,
+            'grace_seconds': self.grace_seconds,
+            'interval_seconds': self.interval_seconds,
+            'batch_size': self.batch_size,
+            'max_batches_per_run': self.max_batches_per_run,
+            'runs': self.runs,
+            'scanned': self.scanned,
+            'deleted': self.deleted,
+            'would_delete': self.would_delete,
+            'kept_referenced': self.kept_referenced,
+            'reclaimed_bytes': self.reclaimed_bytes,
+            'reclaimed_mb': round(self.reclaimed_bytes / (1024 * 1024), 2),
+            'errors': self.errors,
+            'last_run': self.last_run
+        }
+
+
+def upload_sweeper_from_env(store, referenced, app_context=None):
+    """UPLOAD_RETENTION_ENABLED / UPLOAD_RETENTION_GRACE_HOURS / UPLOAD_RETENTION_INTERVAL_SECONDS /
+    UPLOAD_RETENTION_BATCH_SIZE / UPLOAD_RETENTION_MAX_BATCHES / UPLOAD_RETENTION_DRY_RUN.
+
+    Dry run is the default: nothing is deleted until UPLOAD_RETENTION_DRY_RUN=false, so the
+    candidates (GET /api/uploads/retention) can be checked first.
+    """
+    sweeper = UploadSweeper(
+        store,
+        referenced,
+        grace_seconds=float(os.getenv('UPLOAD_RETENTION_GRACE_HOURS', 72)) * 3600,
+        batch_size=int(os.getenv('UPLOAD_RETENTION_BATCH_SIZE', 200)),
+        max_batches_per_run=int(os.getenv('UPLOAD_RETENTION_MAX_BATCHES', 10)),
+        interval_seconds=float(os.getenv('UPLOAD_RETENTION_INTERVAL_SECONDS', 600)),
+        app_context=app_context,
+        dry_run=os.getenv('UPLOAD_RETENTION_DRY_RUN', 'true').lower() in ('1', 'true', 'yes')
+    )
+    if os.getenv('UPLOAD_RETENTION_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        sweeper.start()
+        if sweeper.dry_run:
+            print(f"✅ Upload retention (dry run): reporting uploads unreferenced for {sweeper.grace_seconds / 3600:g}h "
+                  f"- set UPLOAD_RETENTION_DRY_RUN=false to delete them")
+        else:
+            print(f"✅ Upload retention: unreferenced uploads removed after {sweeper.grace_seconds / 3600:g}h")
+    else:
+        print("⚠️ Upload retention disabled (UPLOAD_RETENTION_ENABLED=false)")
+    return sweeper
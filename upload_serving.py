@@ -0,0 +1,59 @@
+# upload_serving.py
+import os
+
+from flask import Response, request, send_file
+
+from upload_store import CONTENT_NAME
+
+# Content-addressed names never change content, so clients may cache them indefinitely
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Legacy uuid names are revalidated (cheap with the ETag) after this long
+LEGACY_MAX_AGE = int(os.getenv('UPLOAD_LEGACY_MAX_AGE', 3600))
+
+
+def upload_etag(name, stat=None):
+    """Strong ETag from file identity: the sha256 for content names, inode/size/mtime otherwise"""
+    match = CONTENT_NAME.match(name)
+    if match:
+        return match.group('sha')
+    return f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _cache_headers(response, immutable):
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE if immutable else LEGACY_MAX_AGE
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def send_upload(path, name, etag=None):
+    """Serve an upload with ETag / Cache-Control, 304 for If-None-Match and byte ranges.
+
+    For content-addressed names (or a caller-supplied etag, e.g. a resized variant) a matching
+    If-None-Match is answered without touching the file. Ranges (206) come from Werkzeug's
+    conditional send_file, so .mp4 evidence can be seeked. Returns None when the file does not exist.
+    """
+    immutable = CONTENT_NAME.match(name) is not None
+    if immutable and etag is None:
+        etag = upload_etag(name)
+    if etag is not None and request.if_none_match.contains(etag):
+        return not_modified(etag, name)
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    etag = etag or upload_etag(name, stat)
+
+    # send_file handles If-None-Match / If-Modified-Since (304), Range / If-Range (206, 416)
+    response = send_file(path, conditional=True, etag=etag, last_modified=stat.st_mtime)
+    response.accept_ranges = 'bytes'
+    return _cache_headers(response, immutable)
+
+
+def not_modified(etag, name):
+    """304 carrying the same validators and caching headers as the full response"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return _cache_headers(response, CONTENT_NAME.match(name) is not None)
@@ -0,0 +1,269 @@
+# upload_store.py
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# "<kind prefix><sha256>.<ext>", e.g. realtime_3f2a....jpg, thumb_9c1e....jpg, 77ab....mp4
+CONTENT_NAME = re.compile(r'^(?:(?P<prefix>[a-z]+)_)?(?P<sha>[0-9a-f]{64})\.(?P<ext>[a-z0-9]{1,5})$')
+
+# Kinds stored under the bare hash; every other kind (realtime, thumb, ...) becomes a name prefix
+UNPREFIXED_KINDS = ('image', 'video')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_uploads_sha256 ON uploads (sha256);
+CREATE INDEX IF NOT EXISTS ix_uploads_created_at ON uploads (created_at);
+CREATE INDEX IF NOT EXISTS ix_uploads_last_seen ON uploads (last_seen_at, name);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+MEDIA_EXTENSIONS = {'.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.webp': 'image', '.mp4': 'video'}
+
+
+class UploadStore:
+    """Content-addressed storage for uploads, thumbnails and realtime frames.
+
+    A file's public name is "<kind>_<sha256>.<ext>" (no prefix for plain image/video uploads),
+    which is what goes into Sighting.image_path / Report.evidence_images and the
+    /api/uploaded-images URLs. The bytes live once per hash+extension in
+    root/<sha[:2]>/<sha[2:4]>/<sha>.<ext>, so the same frame submitted twice is stored once
+    and no directory grows large. A small sqlite index (root/.index.sqlite) records every name
+    so listings and lookups don't touch the filesystem.
+
+    Names that don't match the content pattern (files from before the store) resolve to the
+    flat root directory as before.
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = root
+        self.index_path = index_path or os.path.join(root, '.index.sqlite')
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self.deduplicated = 0
+        os.makedirs(root, exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    # ---- index ----
+    def _db(self):
+        if self._pid != os.getpid():
+            # sqlite connections must not cross a fork
+            self.reset_after_fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def reset_after_fork(self):
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _record(self, name, sha, kind, size):
+        now = time.time()
+        self._db().execute(
+            "INSERT INTO uploads (name, sha256, kind, size, created_at, last_seen_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_seen_at = excluded.last_seen_at",
+            (name, sha, kind, size, now, now)
+        )
+
+    # ---- naming ----
+    @staticmethod
+    def content_name(sha, ext, kind):
+        return f"{sha}.{ext}" if kind in UNPREFIXED_KINDS else f"{kind}_{sha}.{ext}"
+
+    def blob_path(self, sha, ext):
+        return os.path.join(self.root, sha[:2], sha[2:4], f"{sha}.{ext}")
+
+    def path_for(self, name):
+        """Absolute path for a public upload name (sharded for content names, flat for legacy ones)"""
+        match = CONTENT_NAME.match(name)
+        if match:
+            return self.blob_path(match.group('sha'), match.group('ext'))
+        return os.path.join(self.root, name)
+
+    def exists(self, name):
+        return os.path.exists(self.path_for(name))
+
+    # ---- writes ----
+    def put_staged(self, staged, ext, kind):
+        """Keep a StagingFile from upload_streaming (already hashed while streaming).
+
+        Returns (name, deduplicated); a duplicate is discarded instead of stored twice.
+        """
+        staged.finish()
+        name = self.content_name(staged.sha256, ext, kind)
+        path = self.path_for(name)
+        if os.path.exists(path):
+            staged.discard()
+            deduplicated = True
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staged.commit(path)
+            deduplicated = False
+        self._record(name, staged.sha256, kind, staged.size)
+        return name, deduplicated
+
+    def put_bytes(self, data, ext, kind):
+        """Store encoded bytes (e.g. a thumbnail from cv2.imencode). Returns (name, deduplicated)"""
+        sha = hashlib.sha256(data).hexdigest()
+        name = self.content_name(sha, ext, kind)
+        path = self.path_for(name)
+        deduplicated = os.path.exists(path)
+        if deduplicated:
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        self._record(name, sha, kind, len(data))
+        return name, deduplicated
+
+    def delete(self, name):
+        """Drop a name from the index; the file goes once no other name shares its content.
+
+        Returns the bytes freed on disk (0 when the blob is still in use or was already gone).
+        """
+        db = self._db()
+        db.execute("DELETE FROM uploads WHERE name = ?", (name,))
+        path = self.path_for(name)
+        match = CONTENT_NAME.match(name)
+        if match:
+            # Same sha + extension -> same blob (e.g. a realtime frame also stored as an image)
+            ext = match.group('ext')
+            for (other,) in db.execute("SELECT name FROM uploads WHERE sha256 = ?", (match.group('sha'),)):
+                if other.endswith(f".{ext}"):
+                    return 0
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def index_legacy_files(self):
+        """One-time import of flat files written before the store existed.
+
+        They keep their names (and an empty sha256, so they are never deduplicated against);
+        the kind comes from the old realtime_/thumb_ prefixes. Returns the number indexed.
+        """
+        db = self._db()
+        # IMMEDIATE takes the write lock first, so concurrently booting workers import once
+        db.execute("BEGIN IMMEDIATE")
+        if db.execute("SELECT 1 FROM meta WHERE key = 'legacy_indexed'").fetchone():
+            db.execute("COMMIT")
+            return 0
+        # Idle time counts from now, not from the file's mtime, so old files get the full
+        # retention grace period after the store is introduced
+        now = time.time()
+        rows = []
+        for entry in os.scandir(self.root):
+            kind = MEDIA_EXTENSIONS.get(os.path.splitext(entry.name)[1].lower())
+            if kind is None or not entry.is_file():
+                continue
+            for prefix in ('realtime', 'thumb'):
+                if entry.name.startswith(f"{prefix}_"):
+                    kind = prefix
+            stat = entry.stat()
+            rows.append((entry.name, '', kind, stat.st_size, stat.st_mtime, now))
+        db.executemany(
+            "INSERT OR IGNORE INTO uploads (name, sha256, kind, size, created_at, last_seen_at) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        db.execute("INSERT INTO meta (key, value) VALUES ('legacy_indexed', ?)", (str(now),))
+        db.execute("COMMIT")
+        return len(rows)
+
+    # ---- reads ----
+    def lookup(self, name):
+        row = self._db().execute(
+            "SELECT name, sha256, kind, size, created_at FROM uploads WHERE name = ?", (name,)
+        ).fetchone()
+        return self._row(row) if row else None
+
+    def recent(self, limit=10, kind=None):
+        """Newest indexed uploads first"""
+        if kind:
+            rows = self._db().execute(
+                "SELECT name, sha256, kind, size, created_at FROM uploads WHERE kind = ? "
+                "ORDER BY created_at DESC LIMIT ?", (kind, limit)
+            ).fetchall()
+        else:
+            rows = self._db().execute(
+                "SELECT name, sha256, kind, size, created_at FROM uploads ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def idle_since(self, before, after=None, limit=200):
+        """Names not uploaded (or re-uploaded) since `before`, oldest first.
+
+        after=(last_seen_at, name) continues from the previous batch.
+        """
+        after_seen, after_name = after or (0, '')
+        rows = self._db().execute(
+            "SELECT name, sha256, kind, size, created_at, last_seen_at FROM uploads "
+            "WHERE last_seen_at < ? AND (last_seen_at, name) > (?, ?) ORDER BY last_seen_at, name LIMIT ?",
+            (before, after_seen, after_name, limit)
+        ).fetchall()
+        return [dict(self._row(row[:5]), last_seen_at=row[5]) for row in rows]
+
+    def acquire_lease(self, key, owner, ttl_seconds):
+        """Cross-process lease in the index (e.g. one retention sweeper per host). True if owner holds it"""
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = ?", (f"lease:{key}",)).fetchone()
+            holder, expires = row[0].rsplit('|', 1) if row else ('', '0')
+            if holder != owner and float(expires) > now:
+                return False
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                       (f"lease:{key}", f"{owner}|{now + ttl_seconds}"))
+            return True
+        finally:
+            db.execute("COMMIT")
+
+    def stats(self):
+        rows = self._db().execute(
+            "SELECT kind, COUNT(*), COUNT(DISTINCT sha256), COALESCE(SUM(size), 0) FROM uploads GROUP BY kind"
+        ).fetchall()
+        by_kind = {kind: {'names': names, 'blobs': blobs, 'bytes': size} for kind, names, blobs, size in rows}
+        return {
+            'root': self.root,
+            'names': sum(k['names'] for k in by_kind.values()),
+            'bytes': sum(k['bytes'] for k in by_kind.values()),
+            'deduplicated_this_process': self.deduplicated,
+            'by_kind': by_kind
+        }
+
+    @staticmethod
+    def _row(row):
+        name, sha, kind, size, created_at = row
+        return {'name': name, 'sha256': sha, 'kind': kind, 'size': size, 'created_at': created_at}
+
+
+def upload_store_from_env(root):
+    """UPLOAD_STORE_INDEX overrides the index location (root/.index.sqlite).
+
+    root must be the directory upload_streaming stages into, so keeping an upload is a rename.
+    """
+    store = UploadStore(root, index_path=os.getenv('UPLOAD_STORE_INDEX') or None)
+    legacy = store.index_legacy_files()
+    print(f"✅ Upload store: {root} (sharded by sha256, index {store.index_path})"
+          f"{f', indexed {legacy} existing files' if legacy else ''}")
+    return store
@@ -0,0 +1,312 @@
+# upload_streaming.py
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+import time
+from functools import wraps
+
+from flask import jsonify, request
+from flask.wrappers import Request
+
+MB = 1024 * 1024
+
+# extension -> (offset, magic bytes); checked against the first bytes written
+MEDIA_SIGNATURES = {
+    'jpg': [(0, b'\xff\xd8\xff')],
+    'png': [(0, b'\x89PNG\r\n\x1a\n')],
+    'webp': [(8, b'WEBP')],
+    'bmp': [(0, b'BM')],
+    'mp4': [(4, b'ftyp')],  # also .mov / .m4v
+    'webm': [(0, b'\x1a\x45\xdf\xa3')],  # also .mkv
+    'avi': [(8, b'AVI ')],
+}
+SNIFF_BYTES = 16
+
+# policy name -> (allowed media, env var for the cap, default cap)
+UPLOAD_POLICIES = {
+    'image': (('jpg', 'png', 'webp', 'bmp'), 'UPLOAD_MAX_IMAGE_MB', 15),
+    'frame': (('jpg', 'png', 'webp'), 'UPLOAD_MAX_FRAME_MB', 5),
+    'video': (('mp4', 'webm', 'avi'), 'UPLOAD_MAX_VIDEO_MB', 200),
+}
+# Multipart boundaries and the small form fields that travel with the file
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """Raised while streaming an upload: 413 too large, 415 unsupported media, 400 undecodable"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class UploadPolicy:
+    def __init__(self, name, media, max_bytes):
+        self.name = name
+        self.media = media
+        self.max_bytes = max_bytes
+
+    def check_part_type(self, content_type):
+        """Reject before any bytes are written when the part's declared type is clearly wrong"""
+        if not content_type or content_type == 'application/octet-stream':
+            return
+        family = 'video' if self.name == 'video' else 'image'
+        if content_type.split('/', 1)[0] != family:
+            raise UploadRejected(415, f"Unsupported media type {content_type} for {self.name} upload")
+
+
+def sniff_media(head):
+    """Media extension for the first bytes of a file, or None"""
+    for media, signatures in MEDIA_SIGNATURES.items():
+        for offset, magic in signatures:
+            if head[offset:offset + len(magic)] == magic:
+                return media
+    return None
+
+
+class StagingFile:
+    """A writable upload target on disk that hashes, size-checks and sniffs the data as it arrives.
+
+    Nothing is held in memory beyond the first SNIFF_BYTES. commit(path) moves the file into
+    place (staging lives next to UPLOAD_DIR so this is a rename, not a copy); anything not
+    committed is removed by discard().
+    """
+
+    def __init__(self, staging_dir, policy):
+        self.policy = policy
+        fd, self.path = tempfile.mkstemp(prefix='upload_', suffix='.part', dir=staging_dir)
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self.size = 0
+        self.media = None
+        self.committed = False
+
+    # ---- written by the multipart parser / base64 decoder ----
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.policy.max_bytes:
+            raise UploadRejected(413, f"{self.policy.name.capitalize()} upload exceeds {self.policy.max_bytes / MB:g} MB")
+        if self.media is None:
+            self._sniff(data)
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def _sniff(self, data):
+        self._head += data[:SNIFF_BYTES - len(self._head)]
+        if len(self._head) < SNIFF_BYTES:
+            return
+        self.media = sniff_media(self._head)
+        if self.media not in self.policy.media:
+            raise UploadRejected(415, f"Unsupported file content for {self.policy.name} upload")
+
+    def finish(self):
+        """Called once all data is written: catches files too short to sniff"""
+        if self.media is None:
+            self.media = sniff_media(self._head)
+            if self.media not in self.policy.media:
+                raise UploadRejected(415, f"Unsupported file content for {self.policy.name} upload")
+        self._file.flush()
+
+    # ---- read side, so FileStorage.save/read keep working ----
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        return self._file.flush()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        self._file.close()
+
+    def commit(self, destination):
+        """Move the staged upload to destination. Returns destination"""
+        self.finish()
+        self._file.close()
+        os.replace(self.path, destination)
+        self.committed = True
+        return destination
+
+    def discard(self):
+        if self.committed:
+            return
+        try:
+            self._file.close()
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Could not remove staged upload {self.path}: {e}")
+
+
+class StreamingRequest(Request):
+    """Request whose multipart file parts go straight to StagingFile under the active upload policy.
+
+    Endpoints without @streamed_upload keep Werkzeug's default spooling.
+    """
+
+    staging_dir = None
+    upload_policy = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        policy = self.upload_policy
+        if policy is None or self.staging_dir is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        policy.check_part_type(content_type)
+        staged = StagingFile(self.staging_dir, policy)
+        self.staged_uploads.append(staged)
+        return staged
+
+    @property
+    def staged_uploads(self):
+        return self.environ.setdefault('webanimal.staged_uploads', [])
+
+
+def reject_response(error):
+    print(f"🚫 Upload rejected ({error.status}): {error.message}")
+    return jsonify({"error": error.message}), error.status
+
+
+def check_content_length(policy_name, encoded_ratio=1.0):
+    """Refuse a request from its Content-Length alone, before the body is read.
+
+    encoded_ratio allows for encodings that inflate the payload (4/3 for base64 in JSON).
+    """
+    policy = upload_policies[policy_name]
+    length = request.content_length
+    limit = int(policy.max_bytes * encoded_ratio) + FORM_OVERHEAD_BYTES
+    if length is not None and length > limit:
+        raise UploadRejected(413, f"Request body of {length} bytes exceeds the {policy.name} upload limit")
+
+
+def streamed_upload(policy_name):
+    """Parse the request's multipart body under a named upload policy before the view runs.
+
+    The Content-Length is checked against the cap before anything is read; file parts are then
+    streamed to disk, hashed and sniffed. Oversized or unsupported uploads get a JSON 413/415.
+    request.files[...].stream is a StagingFile; use commit_upload() to keep it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request.upload_policy = upload_policies[policy_name]
+            try:
+                check_content_length(policy_name)
+                for storage in request.files.values():
+                    if isinstance(storage.stream, StagingFile):
+                        storage.stream.finish()
+            except UploadRejected as e:
+                _discard_staged()
+                return reject_response(e)
+
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _discard_staged()
+        return wrapper
+    return decorator
+
+
+def _discard_staged():
+    for staged in request.staged_uploads:
+        staged.discard()
+
+
+def staged_file(storage):
+    """The StagingFile behind a FileStorage from a @streamed_upload endpoint"""
+    return storage.stream if isinstance(storage.stream, StagingFile) else None
+
+
+def commit_upload(storage, destination):
+    """Keep an uploaded file at destination: a rename for staged uploads, FileStorage.save otherwise"""
+    staged = staged_file(storage)
+    if staged is None:
+        storage.save(destination)
+        return destination
+    return staged.commit(destination)
+
+
+def stage_base64(data, policy_name, chunk_chars=64 * 1024):
+    """Decode a base64 string (or data URL) to a StagingFile chunk by chunk.
+
+    Avoids a second full-size bytes copy of the image and applies the same size cap and
+    content check as multipart uploads. Raises UploadRejected; the caller commits or discards.
+    """
+    policy = upload_policies[policy_name]
+    if data.startswith('data:') and ',' in data:
+        data = data.split(',', 1)[1]
+    data = data.strip()
+
+    # 4 base64 chars -> 3 bytes; refuse before decoding anything
+    if len(data) * 3 // 4 > policy.max_bytes:
+        raise UploadRejected(413, f"{policy.name.capitalize()} upload exceeds {policy.max_bytes / MB:g} MB")
+
+    staged = StagingFile(staging_dir(), policy)
+    try:
+        chunk_chars -= chunk_chars % 4
+        for start in range(0, len(data), chunk_chars):
+            staged.write(base64.b64decode(data[start:start + chunk_chars]))
+        staged.finish()
+    except (binascii.Error, ValueError) as e:
+        staged.discard()
+        raise UploadRejected(400, f"Invalid base64 image data: {e}")
+    except Exception:
+        staged.discard()
+        raise
+    return staged
+
+
+def staging_dir():
+    return StreamingRequest.staging_dir
+
+
+def clear_stale_staging(directory, older_than_seconds=3600):
+    """Remove .part files left behind by a crashed worker"""
+    cutoff = time.time() - older_than_seconds
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+upload_policies = {}
+
+
+def install_streaming_uploads(app, upload_dir):
+    """UPLOAD_MAX_IMAGE_MB / UPLOAD_MAX_FRAME_MB / UPLOAD_MAX_VIDEO_MB caps; staging under upload_dir/.staging"""
+    directory = os.path.join(upload_dir, '.staging')
+    os.makedirs(directory, exist_ok=True)
+    StreamingRequest.staging_dir = directory
+    app.request_class = StreamingRequest
+
+    for name, (media, env_var, default_mb) in UPLOAD_POLICIES.items():
+        upload_policies[name] = UploadPolicy(name, media, int(float(os.getenv(env_var, default_mb)) * MB))
+
+    removed = clear_stale_staging(directory)
+    caps = ', '.join(f"{name} {policy.max_bytes / MB:g} MB" for name, policy in upload_policies.items())
+    print(f"✅ Streaming uploads: staging in {directory} ({caps}){f', removed {removed} stale' if removed else ''}")
+    return upload_policies
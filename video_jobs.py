@@ -0,0 +1,334 @@
+# video_jobs.py
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_jobs (
+    job_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_video_jobs_status ON video_jobs (status);
+CREATE INDEX IF NOT EXISTS ix_video_jobs_finished_at ON video_jobs (finished_at);
+"""
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# How often a queued job checks for a free run slot
+SLOT_POLL_INTERVAL = 0.5
+
+# Set inside worker processes by _init_worker
+_worker_state = None
+
+
+class QueueFullError(Exception):
+    """Raised when the video job queue is already at max_pending"""
+
+
+def _owner_id():
+    """The web worker that owns a job: its pool runs it and its done-callback finishes it"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname():
+        # Another host sharing the file: nothing to check here
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class JobState:
+    """Video job records in a sqlite file shared by every web worker of one host.
+
+    gunicorn runs several web worker processes, so a job submitted through one of them can
+    be polled through any other; the queue limits are counted over all of them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._pid = os.getpid()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        if self._pid != os.getpid():
+            # sqlite connections must not cross a fork
+            self.reset_after_fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def reset_after_fork(self):
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _transaction(self, fn):
+        """Run fn(conn) under the write lock, so count-then-insert is atomic across processes"""
+        conn = self._db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    def _fail_orphans(self, conn):
+        """Fail jobs whose web worker is gone (restart, OOM kill); nothing would finish them"""
+        now = time.time()
+        owners = [row['owner'] for row in conn.execute(
+            "SELECT DISTINCT owner FROM video_jobs WHERE status IN (?, ?)", ACTIVE_STATUSES)]
+        for owner in owners:
+            if not _owner_alive(owner):
+                conn.execute(
+                    "UPDATE video_jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE owner = ? AND status IN (?, ?)",
+                    ('Server restarted before the job finished', now, owner) + ACTIVE_STATUSES)
+
+    def create(self, max_pending, result_ttl):
+        """Insert a queued job, or raise QueueFullError. Returns the job record."""
+        def insert(conn):
+            conn.execute("DELETE FROM video_jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                         (time.time() - result_ttl,))
+            self._fail_orphans(conn)
+            active = conn.execute("SELECT COUNT(*) FROM video_jobs WHERE status IN (?, ?)",
+                                  ACTIVE_STATUSES).fetchone()[0]
+            if active >= max_pending:
+                raise QueueFullError(f"Video queue is full ({max_pending} jobs pending)")
+            job_id = str(uuid.uuid4())
+            conn.execute("INSERT INTO video_jobs (job_id, owner, status, created_at) VALUES (?, ?, 'queued', ?)",
+                         (job_id, _owner_id(), time.time()))
+            return job_id
+        return self.get(self._transaction(insert))
+
+    def claim_slot(self, job_id, max_running):
+        """Move a queued job to running if fewer than max_running jobs run on this host.
+
+        Returns True when claimed, False to wait and retry, None if the job is no longer queued.
+        """
+        def claim(conn):
+            row = conn.execute("SELECT status FROM video_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row or row['status'] != 'queued':
+                return None
+            running = conn.execute("SELECT COUNT(*) FROM video_jobs WHERE status = 'running'").fetchone()[0]
+            if running >= max_running:
+                # Slots held by jobs of a dead web worker are released here
+                self._fail_orphans(conn)
+                running = conn.execute("SELECT COUNT(*) FROM video_jobs WHERE status = 'running'").fetchone()[0]
+            if running >= max_running:
+                return False
+            conn.execute("UPDATE video_jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+                         (time.time(), job_id))
+            return True
+        return self._transaction(claim)
+
+    def set_progress(self, job_id, progress):
+        self._db().execute("UPDATE video_jobs SET progress = ? WHERE job_id = ? AND status = 'running'",
+                           (json.dumps(progress), job_id))
+
+    def finish(self, job_id, status, result=None, error=None):
+        # A job _fail_orphans already failed stays failed
+        self._db().execute(
+            "UPDATE video_jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE job_id = ? AND status IN (?, ?)",
+            (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id)
+            + ACTIVE_STATUSES)
+
+    def get(self, job_id):
+        row = self._db().execute(
+            "SELECT job_id, status, progress, created_at, started_at, finished_at, result, error "
+            "FROM video_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job['progress'] = json.loads(job['progress']) if job['progress'] else None
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def counts(self):
+        rows = self._db().execute("SELECT status, COUNT(*) AS n FROM video_jobs GROUP BY status")
+        return {row['status']: row['n'] for row in rows}
+
+
+def _init_worker(state_path, max_running, nice, initializer):
+    global _worker_state
+    _worker_state = (JobState(state_path), max_running)
+    if nice:
+        try:
+            # Keep video jobs from starving /detect and /detect-frame for CPU
+            os.nice(nice)
+        except (AttributeError, OSError):
+            pass
+    if initializer:
+        initializer()
+
+
+def _run_job(job_id, worker_fn, kwargs):
+    """Executed in a worker process"""
+    state, max_running = _worker_state
+    # The pool of every web worker may hold queued jobs; only max_running of them run at once
+    while True:
+        claimed = state.claim_slot(job_id, max_running)
+        if claimed is None:
+            return None
+        if claimed:
+            break
+        time.sleep(SLOT_POLL_INTERVAL)
+
+    def progress(done, total):
+        state.set_progress(job_id, {'frames_analyzed': done, 'max_frames': total})
+
+    return worker_fn(progress=progress, **kwargs)
+
+
+class VideoJobQueue:
+    """Process-based worker pool for video detection with bounded concurrency.
+
+    - max_workers processes run jobs (the GIL of the web worker is not involved)
+    - job records live in a sqlite file (state_path), so any web worker can answer a poll and
+      both limits hold for the whole host, not per gunicorn worker: at most max_pending jobs
+      may be queued or running (further submits raise QueueFullError) and at most
+      max_workers of them run at the same time
+    - finished jobs are kept for result_ttl seconds so clients can poll for the payload
+    - if a worker dies (OOM kill, segfault in a native library) the pool is broken: its jobs
+      fail and a new pool is started for the next submit; jobs of a web worker that is gone
+      are failed by the next submit on the host
+    """
+
+    def __init__(self, worker_fn, state_path, max_workers=1, max_pending=8, nice=10, result_ttl=3600,
+                 initializer=None):
+        self.worker_fn = worker_fn
+        self.state = JobState(state_path)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.nice = nice
+        self.result_ttl = result_ttl
+        self.initializer = initializer
+        self._lock = threading.Lock()
+        self._executor = None
+        self.pool_restarts = 0
+
+    def _ensure_started(self):
+        """Start the pool if there is none (caller holds the lock)"""
+        if self._executor is not None:
+            return
+
+        # fork: workers inherit the already imported app module instead of re-running its startup
+        context = multiprocessing.get_context('fork')
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.state.path, self.max_workers, self.nice, self.initializer)
+        )
+        print(f"✅ Video job pool started ({self.max_workers} workers, max {self.max_pending} pending per host)")
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool (caller holds the lock); the next submit starts a new one"""
+        if executor is None or self._executor is not executor:
+            return
+        self._executor = None
+        self.pool_restarts += 1
+        print("⚠️ Video job pool is broken (a worker died) - starting a new one for the next job")
+        # Not from this thread: the done-callbacks of a broken pool run on its management thread
+        threading.Thread(target=executor.shutdown, kwargs={'wait': False, 'cancel_futures': True},
+                         name='video-job-pool-shutdown', daemon=True).start()
+
+    def submit(self, **kwargs):
+        """Queue a job. Returns the job record."""
+        job = self.state.create(self.max_pending, self.result_ttl)
+        job_id = job['job_id']
+
+        # A pool broken since the last job is only noticed here; retry once on a new pool
+        for attempt in range(2):
+            with self._lock:
+                self._ensure_started()
+                executor = self._executor
+            try:
+                future = executor.submit(_run_job, job_id, self.worker_fn, kwargs)
+                break
+            except BrokenProcessPool as e:
+                with self._lock:
+                    self._discard_executor(executor)
+                if attempt:
+                    self._fail(job_id, e)
+                    return self.get(job_id)
+
+        future.add_done_callback(lambda f: self._finish(job_id, f, executor))
+        return job
+
+    def _finish(self, job_id, future, executor=None):
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            with self._lock:
+                self._discard_executor(executor)
+            self._fail(job_id, e)
+            return
+        except Exception as e:
+            self._fail(job_id, e)
+            traceback.print_exc()
+            return
+        self.state.finish(job_id, 'completed', result=result)
+
+    def _fail(self, job_id, error):
+        message = str(error) or error.__class__.__name__
+        self.state.finish(job_id, 'failed', error=message)
+        print(f"❌ Video job {job_id} failed: {message}")
+
+    def get(self, job_id):
+        return self.state.get(job_id)
+
+    def stats(self):
+        by_status = self.state.counts()
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'active': sum(by_status.get(status, 0) for status in ACTIVE_STATUSES),
+            'pool_restarts': self.pool_restarts,
+            'jobs_by_status': by_status
+        }
+
+
+def queue_from_env(worker_fn, state_path, **kwargs):
+    """Build a VideoJobQueue using VIDEO_JOB_WORKERS / VIDEO_JOB_MAX_PENDING / VIDEO_JOB_NICE.
+
+    Both limits are per host: every gunicorn worker (WEB_CONCURRENCY) shares state_path.
+    """
+    return VideoJobQueue(
+        worker_fn,
+        state_path,
+        max_workers=int(os.getenv('VIDEO_JOB_WORKERS', 1)),
+        max_pending=int(os.getenv('VIDEO_JOB_MAX_PENDING', 8)),
+        nice=int(os.getenv('VIDEO_JOB_NICE', 10)),
+        **kwargs
+    )
@@ -0,0 +1,120 @@
+# video_sampler.py
+import math
+import os
+
+import cv2
+
+
+class VideoFrameSampler:
+    """Yield evenly spaced frames from a cv2.VideoCapture without decoding the rest.
+
+    - sample_fps: how many frames to analyze per second of video
+    - max_frames: budget of *analyzed* frames; if the video is long enough to exceed it,
+      the samples are spread across the whole video instead of stopping early
+    - seek_min_gap: gaps of at least this many frames use CAP_PROP_POS_FRAMES seeking,
+      smaller gaps use grab() (demux only, no retrieve()/colour conversion)
+    """
+
+    def __init__(self, cap, sample_fps=1.0, max_frames=50, seek_min_gap=90):
+        self.cap = cap
+        self.sample_fps = sample_fps if sample_fps and sample_fps > 0 else 1.0
+        self.max_frames = max(1, int(max_frames))
+        self.seek_min_gap = seek_min_gap
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 and not math.isnan(fps) else 30.0
+        total = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        self.total_frames = int(total) if total and total > 0 else 0
+        self.duration = self.total_frames / self.fps if self.total_frames else None
+
+        self.step = max(1, int(round(self.fps / self.sample_fps)))
+        if self.total_frames and math.ceil(self.total_frames / self.step) > self.max_frames:
+            # Spread the budget across the whole video
+            self.step = max(1, self.total_frames // self.max_frames)
+
+        self.frames_analyzed = 0
+        self.frames_grabbed = 0
+        self.seeks = 0
+        self._position = 0  # index of the next frame the capture will return
+
+    def _skip_to(self, index):
+        gap = index - self._position
+        if gap <= 0:
+            return True
+
+        if gap >= self.seek_min_gap and self.cap.set(cv2.CAP_PROP_POS_FRAMES, index):
+            self.seeks += 1
+            self._position = index
+            return True
+
+        for _ in range(gap):
+            if not self.cap.grab():
+                return False
+            self.frames_grabbed += 1
+            self._position += 1
+        return True
+
+    def __iter__(self):
+        """Yield (frame_index, timestamp_seconds, frame) tuples"""
+        index = 0
+        while self.frames_analyzed < self.max_frames:
+            if self.total_frames and index >= self.total_frames:
+                break
+            if not self._skip_to(index):
+                break
+
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self._position += 1
+            self.frames_analyzed += 1
+
+            yield index, index / self.fps, frame
+            index += self.step
+
+    def stats(self):
+        return {
+            'fps': round(self.fps, 2),
+            'total_frames': self.total_frames,
+            'duration_seconds': round(self.duration, 2) if self.duration else None,
+            'sample_step': self.step,
+            'frames_analyzed': self.frames_analyzed,
+            'frames_skipped_with_grab': self.frames_grabbed,
+            'seeks': self.seeks
+        }
+
+
+def sampler_settings_from_env():
+    """Default sampling settings (VIDEO_SAMPLE_FPS / VIDEO_MAX_FRAMES / VIDEO_SEEK_MIN_GAP)"""
+    return {
+        'sample_fps': float(os.getenv('VIDEO_SAMPLE_FPS', 1.0)),
+        'max_frames': int(os.getenv('VIDEO_MAX_FRAMES', 50)),
+        'seek_min_gap': int(os.getenv('VIDEO_SEEK_MIN_GAP', 90))
+    }
+
+
+def sampler_limits_from_env():
+    """The most a client may ask for: VIDEO_SAMPLE_FPS_LIMIT / VIDEO_MAX_FRAMES_LIMIT (default: VIDEO_MAX_FRAMES)"""
+    return {
+        'sample_fps': float(os.getenv('VIDEO_SAMPLE_FPS_LIMIT', 5.0)),
+        'max_frames': int(os.getenv('VIDEO_MAX_FRAMES_LIMIT', os.getenv('VIDEO_MAX_FRAMES', 50)))
+    }
+
+
+def client_sampling(settings, limits, sample_fps=None, max_frames=None):
+    """Apply a request's sample_fps / max_frames to the settings, clamped to limits.
+
+    Raises ValueError for values that are not positive numbers.
+    """
+    settings = dict(settings)
+    if sample_fps not in (None, ''):
+        sample_fps = float(sample_fps)
+        if not 0 < sample_fps < math.inf:
+            raise ValueError("sample_fps must be a positive number")
+        settings['sample_fps'] = min(sample_fps, limits['sample_fps'])
+    if max_frames not in (None, ''):
+        max_frames = int(max_frames)
+        if max_frames <= 0:
+            raise ValueError("max_frames must be a positive integer")
+        settings['max_frames'] = min(max_frames, limits['max_frames'])
+    return settings